@@ -237,6 +237,30 @@ parser.add_argument('--force_fetch', action='store_true', \
 parser.add_argument('--db', type=str, metavar='<DATA_FILE>', \
                     default='sumo_data.pickle', \
                     help='All data from the SumoAPI server will be cached in this file.')
+parser.add_argument('--api_url', dest='api_url', type=str, metavar='<URL>', \
+                    default=None, \
+                    help='Base URL of the API server (e.g. a local sumo_api_server.py: http://localhost:8088/api)')
+parser.add_argument('--api_cache', dest='api_cache', type=str, metavar='<CACHE_FILE>', \
+                    default='sumo_api_cache.db', \
+                    help='Cache API responses in this file (finished basho are never downloaded twice)')
+parser.add_argument('--no_api_cache', action='store_true', \
+                    help='Do not use the API response cache')
+parser.add_argument('--api_cache_ttl', dest='api_cache_ttl', type=float, metavar='HOURS', \
+                    default=0.0, \
+                    help='Re-check cached rikishi profiles and match lists after this many hours ' + \
+                         '(default: always, so predictions during a basho use the latest results)')
+parser.add_argument('--api_cache_negative_ttl', dest='api_cache_negative_ttl', type=float, metavar='HOURS', \
+                    default=0.0, \
+                    help='Re-check requests that returned nothing (for a basho in progress) after this many hours')
+parser.add_argument('--record', dest='record', type=str, metavar='<ARCHIVE_FILE>', \
+                    help='Record all API traffic into this archive (implies --no_api_cache)')
+parser.add_argument('--replay', dest='replay', type=str, metavar='<ARCHIVE_FILE>', \
+                    help='Answer all API requests from an archive made with --record, without network access (implies --no_api_cache)')
+parser.add_argument('--replay_latency', dest='replay_latency', type=float, metavar='SECONDS', \
+                    default=0.0, \
+                    help='Simulated latency of each replayed API request')
+parser.add_argument('--api_stats', dest='api_stats', type=str, metavar='<FILE>', \
+                    help='Write per-endpoint API request metrics (json) to this file')
 parser.add_argument('-v', '--verbose', dest='verbose', action='count', \
                     default=0, \
                     help='Increase verbosity of output (specify multiple times to increase verbosity)')
@@ -262,6 +286,15 @@ try:
     sumodata = SumoData.load_data(args.db)
 except:
     sumodata = SumoData()
+cache = None
+if not args.no_api_cache and not args.record and not args.replay:
+    cache = SumoResponseCache(args.api_cache, rikishi_ttl=args.api_cache_ttl*60*60, \
+                              negative_ttl=args.api_cache_negative_ttl*60*60)
+sumodata.set_api(SumoAPI(apiurl=args.api_url, cache=cache))
+if args.record:
+    sumodata.api.record(args.record)
+elif args.replay:
+    sumodata.api.replay(args.replay, latency=args.replay_latency)
 
 #
 # Create a predictor instance based on a config file, or default to a fixed set of comarators and weights
@@ -307,8 +340,12 @@ for b in args.basho:
 
 # save the data we just fetched
 sumodata.save_data(args.db)
+if args.api_stats:
+    sumodata.api.dump_stats(args.api_stats)
+# we're done talking to the API server
+sumodata.close()
 if args.verbose > 0:
-    sumodata.print_table_stats()
+    sumodata.print_table_stats(api_stats=True)
 
 
 on_day = -1
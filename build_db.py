@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
 import os
 import sys
 
@@ -40,11 +41,73 @@ parser.add_argument('--db', dest='dbfile', type=str, metavar='FILE', \
                     action='store', default='sumo_data.pickle', \
                     help='Save (and load) sumo db from this file.')
 
+parser.add_argument('--api_url', dest='api_url', type=str, metavar='URL', \
+                    default=None, \
+                    help='Base URL of the API server (e.g. a local sumo_api_server.py: http://localhost:8088/api)')
+parser.add_argument('--api_connections', dest='api_connections', type=int, metavar='N', \
+                    default=10, \
+                    help='Maximum number of pooled (keep-alive) connections to the API server')
+parser.add_argument('--api_timeout', dest='api_timeout', type=float, metavar='SECONDS', \
+                    default=30.0, \
+                    help='Timeout for each API request')
+parser.add_argument('-j', '--concurrency', dest='concurrency', type=int, metavar='N', \
+                    default=0, \
+                    help='Fetch data from the API with up to N concurrent requests (default: one request at a time)')
+parser.add_argument('--adaptive_concurrency', action='store_true', \
+                    help='Adapt the number of concurrent requests (up to -j N, default 32) to the latency ' + \
+                         'and throttling of the API server')
+parser.add_argument('--api_hedge', dest='api_hedge', type=float, metavar='PERCENTILE', \
+                    default=None, \
+                    help='Send a duplicate of any API request slower than this latency percentile (e.g. 95); ' + \
+                         'the first response wins')
+parser.add_argument('--api_hedge_max', dest='api_hedge_max', type=float, metavar='FRACTION', \
+                    default=0.05, \
+                    help='Maximum fraction of API requests which may be duplicated by --api_hedge')
+parser.add_argument('--api_retries', dest='api_retries', type=int, metavar='N', \
+                    default=4, \
+                    help='Maximum number of attempts for each API request (with exponential backoff)')
+parser.add_argument('--api_error_budget', dest='api_error_budget', type=int, metavar='N', \
+                    default=200, \
+                    help='Maximum number of API request retries in this run')
+parser.add_argument('--http2', action='store_true', \
+                    help='Use HTTP/2 to talk to the API server (requires the "h2" package)')
+
+parser.add_argument('--prefetch_rikishi', action='store_true', \
+                    help='Load every rikishi profile up front with a few bulk requests (always done for a new db)')
+
+parser.add_argument('--api_cache', dest='api_cache', type=str, metavar='FILE', \
+                    default='sumo_api_cache.db', \
+                    help='Cache API responses in this file (finished basho are never downloaded twice)')
+parser.add_argument('--no_api_cache', action='store_true', \
+                    help='Do not use the API response cache')
+parser.add_argument('--api_cache_ttl', dest='api_cache_ttl', type=float, metavar='HOURS', \
+                    default=24.0, \
+                    help='Re-check cached rikishi profiles and match lists after this many hours')
+parser.add_argument('--api_cache_negative_ttl', dest='api_cache_negative_ttl', type=float, metavar='HOURS', \
+                    default=1.0, \
+                    help='Re-check requests that returned nothing (for a basho in progress) after this many hours')
+
+parser.add_argument('--record', dest='record', type=str, metavar='FILE', \
+                    help='Record all API traffic into this archive (implies --no_api_cache)')
+parser.add_argument('--replay', dest='replay', type=str, metavar='FILE', \
+                    help='Answer all API requests from an archive made with --record, without network access (implies --no_api_cache)')
+parser.add_argument('--replay_latency', dest='replay_latency', type=float, metavar='SECONDS', \
+                    default=0.0, \
+                    help='Simulated latency of each replayed API request')
+parser.add_argument('--json_backend', dest='json_backend', type=str, metavar='NAME', \
+                    choices=SumoJSON._BACKENDS, default=None, \
+                    help=f'Decode API responses with this json library (default: fastest installed of {SumoJSON._BACKENDS})')
+parser.add_argument('--lenient_decoding', action='store_true', \
+                    help='Ignore unknown fields in API responses (default: fail on any field the classes do not know)')
+parser.add_argument('--api_stats', dest='api_stats', type=str, metavar='FILE', \
+                    help='Write per-endpoint API request metrics (json) to this file')
 parser.add_argument('-v', '--verbose', dest='verbose', action='count', \
                     default=0, \
                     help='Increase verbosity of output')
 parser.add_argument('--debug_api', action='store_true', \
                     help='Turn on API debuging')
+parser.add_argument('--verify_matches', action='store_true', \
+                    help='Check each per-opponent match list against the API (one extra request per opponent)')
 
 args = parser.parse_args()
 
@@ -52,6 +115,12 @@ args = parser.parse_args()
 # enable API debugging if we want
 if args.debug_api:
     SumoAPI._DEBUG=True
+if args.json_backend:
+    SumoJSON.set_backend(args.json_backend)
+if args.lenient_decoding:
+    SumoDecoder.set_strict(False)
+if args.verify_matches:
+    SumoData._VERIFY_OPPONENT_MATCHES = True
 if args.verbose > 1:
     SumoData._VERBOSE = args.verbose - 1
 if args.verbose > 2:
@@ -83,6 +152,38 @@ if not sumodata:
     sys.stderr.write(f'ERROR loading sumo data from {args.dbfile}\n')
     sys.exit(-1)
 
+# use a single pooled HTTP client for every API request made in this run
+cache = None
+if not args.no_api_cache and not args.record and not args.replay:
+    cache = SumoResponseCache(args.api_cache, rikishi_ttl=args.api_cache_ttl*60*60, \
+                              negative_ttl=args.api_cache_negative_ttl*60*60)
+concurrency = None
+if args.adaptive_concurrency:
+    if args.concurrency <= 0:
+        args.concurrency = 32
+    concurrency = SumoConcurrencyController(max_window=args.concurrency)
+sumodata.set_api(SumoAPI(apiurl=args.api_url, timeout=args.api_timeout, \
+                         max_connections=args.api_connections, \
+                         max_keepalive=args.api_connections, \
+                         http2=args.http2, cache=cache, \
+                         retry=SumoRetryPolicy(max_attempts=args.api_retries), \
+                         error_budget=args.api_error_budget, \
+                         concurrency=concurrency, \
+                         hedge=SumoHedgePolicy(percentile=args.api_hedge, max_extra=args.api_hedge_max) \
+                               if args.api_hedge else None))
+if args.record:
+    sumodata.api.record(args.record)
+elif args.replay:
+    sumodata.api.replay(args.replay, latency=args.replay_latency)
+
+# a new db needs (almost) every profile: fetch them in bulk instead of one at a time
+if args.prefetch_rikishi or sumodata.total_rikishi() == 0:
+    print('Prefetching rikishi profiles...')
+    if args.concurrency > 0:
+        asyncio.run(sumodata.prefetch_rikishi_async(concurrency=args.concurrency))
+    else:
+        sumodata.prefetch_rikishi()
+
 if args.verbose > 0:
     sumodata.print_table_stats()
 print('')
@@ -103,12 +204,26 @@ while curDate < endDate:
             bEnd = endDate
 
         # This function will only fetch data when it needs to
-        sumodata.add_basho_by_date_range(bStart, bEnd, divisions)
+        if args.concurrency > 0:
+            asyncio.run(sumodata.add_basho_by_date_range_async(bStart, bEnd, divisions, \
+                                                               concurrency=args.concurrency))
+        else:
+            sumodata.add_basho_by_date_range(bStart, bEnd, divisions)
         if args.verbose > 1:
             sys.stdout.write(f'{startDate} - {bEnd}: ')
             sumodata.print_table_stats()
         sumodata.save_data(args.dbfile)
         curDate = bEnd + relativedelta(months=1)
 
+if cache and args.verbose > 0:
+    print(cache)
+if concurrency and args.verbose > 0:
+    print(concurrency)
+if args.replay and args.verbose > 0:
+    print(sumodata.api.transport)
+if args.api_stats:
+    sumodata.api.dump_stats(args.api_stats)
+sumodata.close()
+
 print(f'Sumo Data ready in {args.dbfile}')
-sumodata.print_table_stats()
+sumodata.print_table_stats(api_stats=args.verbose > 0)
@@ -181,6 +181,9 @@ else:
         if _basho:
             LearnAboutBasho(args, sumodata, predictor, _basho, division, prediction_stats)
 
+# we're done talking to the API server
+sumodata.close()
+
 
 if args.verbose > 0:
     ch = predictor.get_comp_history()
@@ -25,6 +25,8 @@ basho = sumodata.get_basho('202503', [SumoDivision.Makuuchi], fetch=True)
 
 # save the data we just fetched
 sumodata.save_data('./sumo_data.pickle')
+# we're done talking to the API server
+sumodata.close()
 #sumodata.print_table_stats()
 
 # get a list of upcoming bouts (the first day where no bout has a listed winner)
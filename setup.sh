@@ -11,3 +11,7 @@ chmod 755 .venv/bin/activate
 pip3 install httpx
 pip3 install dataclasses_json
 pip3 install python-dateutil
+# optional: HTTP/2 support for the API client (build_db.py --http2)
+#pip3 install 'httpx[http2]'
+# optional: faster json decoding of API responses (see sumostats/sumojson.py)
+#pip3 install orjson
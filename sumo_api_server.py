@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+# sumo_api_server.py
+#
+# A local stand-in for the sumo-api.com service which serves API responses
+# recorded with build_db.py --record (or bout_predictor.py --record).
+# Use it to load-test the data ingestion code, e.g.:
+#
+#   ./build_db.py --start 202401 --end 202412 --record sumo_api.jsonl.gz
+#   ./sumo_api_server.py --fixture sumo_api.jsonl.gz --latency 0.05 --error_rate 0.01 &
+#   ./build_db.py --start 202401 --end 202412 --db test.pickle --no_api_cache \
+#                 --api_url http://localhost:8088/api
+#
+
+import os
+import sys
+cdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(cdir)
+
+import argparse
+
+from sumostats.sumoserver import *
+
+
+########################################################################
+#
+# Main
+#
+########################################################################
+if not __name__ == '__main__':
+    sys.exit(0)
+
+parser = argparse.ArgumentParser()
+
+parser.add_argument('--fixture', dest='fixture', type=str, metavar='<ARCHIVE_FILE>', \
+                    required=True, \
+                    help='API archive (from --record) with the responses to serve')
+parser.add_argument('--host', dest='host', type=str, default='localhost', \
+                    help='Address to listen on')
+parser.add_argument('--port', dest='port', type=int, default=8088, \
+                    help='Port to listen on')
+parser.add_argument('--latency', dest='latency', type=float, metavar='SECONDS', default=0.0, \
+                    help='Delay every response by this many seconds')
+parser.add_argument('--jitter', dest='jitter', type=float, metavar='SECONDS', default=0.0, \
+                    help='Delay every response by an additional random amount, up to this many seconds')
+parser.add_argument('--slow_rate', dest='slow_rate', type=float, metavar='FRACTION', default=0.0, \
+                    help='Fraction of responses delayed by another --slow_latency seconds')
+parser.add_argument('--slow_latency', dest='slow_latency', type=float, metavar='SECONDS', default=1.0, \
+                    help='Extra delay of the slow responses (see --slow_rate)')
+parser.add_argument('--error_rate', dest='error_rate', type=float, metavar='FRACTION', default=0.0, \
+                    help='Fraction of requests answered with a 500/503 error')
+parser.add_argument('--throttle_rate', dest='throttle_rate', type=float, metavar='FRACTION', default=0.0, \
+                    help='Fraction of requests answered with a 429 (Too Many Requests)')
+parser.add_argument('--rate_limit', dest='rate_limit', type=float, metavar='REQUESTS', default=0.0, \
+                    help='Answer 429 when more than this many requests arrive per second')
+parser.add_argument('--retry_after', dest='retry_after', type=int, metavar='SECONDS', default=1, \
+                    help='Retry-After value sent with each 429 response')
+parser.add_argument('--seed', dest='seed', type=int, default=None, \
+                    help='Random seed for reproducible fault injection')
+parser.add_argument('-v', '--verbose', dest='verbose', action='count', default=0, \
+                    help='Log every request')
+
+args = parser.parse_args()
+
+fixture = SumoAPIFixture(args.fixture)
+server = SumoAPIServer(fixture, host=args.host, port=args.port, \
+                       latency=args.latency, jitter=args.jitter, \
+                       error_rate=args.error_rate, throttle_rate=args.throttle_rate, \
+                       rate_limit=args.rate_limit, retry_after=args.retry_after, \
+                       slow_rate=args.slow_rate, slow_latency=args.slow_latency, \
+                       seed=args.seed, verbose=args.verbose)
+
+print(f'Serving {len(fixture)} responses from {args.fixture} at {server.url()}')
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
+server.server_close()
+print(f'\n{server.counters}')
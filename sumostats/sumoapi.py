@@ -1,40 +1,480 @@
 #!/usr/bin/env python3
 
+import asyncio
 import httpx
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from email.utils import parsedate_to_datetime
 from .sumoclasses import *
+from .sumocache import SumoResponseCache, SumoCacheEntry
+from .sumometrics import SumoAPIMetrics
+from .sumoconcurrency import SumoConcurrencyController
+from .sumojson import SumoJSON
+from .sumodecode import SumoDecoder
+from .sumoreplay import SumoRecordTransport, SumoReplayTransport
 
-class SumoAPI:
-    """ Object wrapper around sumo-api.com API calls """
-    # set to True to verbose-log received json
-    _DEBUG = False
-    _VERBOSE=0
+class SumoAPIError(Exception):
+    """
+    Raised when an API request fails (after all retries) with a network
+    error, a server (5xx) error, or too many (429) responses. This is
+    different from a request for data that doesn't exist, which returns
+    None / an empty result: a failed request must never be mistaken for
+    (and saved as) valid empty data.
+    """
+    def __init__(self, message, url = None, status_code = None):
+        super().__init__(message)
+        self.url = url
+        self.status_code = status_code
 
-    def __init__(self):
-        self.apiurl = "https://sumo-api.com/api"
 
-    def _get_json(self, url, params):
-        r = None
+class SumoRetryPolicy:
+    """
+    How (and how many times) to retry a failed API request.
+
+      max_attempts: total number of attempts, including the first one
+      backoff: delay (seconds) before the first retry, doubled on each retry
+      max_backoff: upper limit of the (exponential) delay between attempts
+      jitter: randomly shorten each delay by up to this fraction [0, 1]
+      max_retry_after: give up instead of honoring a longer 'Retry-After' header
+      retry_statuses: HTTP status codes which are worth retrying
+    """
+    def __init__(self, max_attempts = 4, backoff = 0.5, max_backoff = 30.0, jitter = 0.5, \
+                 max_retry_after = 120.0, retry_statuses = (429, 500, 502, 503, 504)):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = min(max(0.0, jitter), 1.0)
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = tuple(retry_statuses)
+
+    def __str__(self):
+        return f'SumoRetryPolicy[attempts={self.max_attempts}, backoff={self.backoff}s-{self.max_backoff}s, jitter={self.jitter}]'
+
+    def retryable(self, exc: Exception) -> bool:
+        """ True if the request that raised 'exc' may succeed when retried """
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in self.retry_statuses
+        return isinstance(exc, httpx.RequestError)
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """ seconds to wait after failed attempt number 'attempt' (1, 2, ...) """
+        _delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        _delay *= 1.0 - self.jitter * random.random()
+        if retry_after is not None:
+            _delay = max(_delay, retry_after)
+        return _delay
+
+    # Static method
+    def retry_after(response: httpx.Response) -> float:
+        """ parse a 'Retry-After' header (seconds, or an HTTP date) """
+        if response is None:
+            return None
+        value = response.headers.get('retry-after')
+        if not value:
+            return None
         try:
-            # do the API call, catch errors 
-            r = httpx.get(url, params=params).raise_for_status()
-        except httpx.RequestError as exc:
-            sys.stderr.write(f'An error occurred while requesting {exc.request.url!r}.\n')
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+        except (TypeError, ValueError):
             return None
-        except httpx.HTTPStatusError as exc:
-            sys.stderr.write(f'Error response {exc.response.status_code} while requesting {exc.request.url!r}.\n')
+
+
+class SumoHedgePolicy:
+    """
+    When to send a duplicate ("hedged") request: a request still waiting
+    for its response after the 'percentile' latency of its endpoint (from
+    the API's own metrics) is sent a second time, and the first response
+    to arrive wins. A small amount of extra load trades for a much shorter
+    tail, e.g. one slow basho_torikumi response no longer holds up a live
+    refresh.
+
+      percentile: hedge requests slower than this latency percentile
+      max_extra: hedged requests allowed, as a fraction of all requests
+                 (per endpoint) [0, 1]
+      min_delay: never hedge requests younger than this (seconds)
+      min_samples: don't hedge until an endpoint has this many latencies
+      endpoints: only hedge these endpoints (default: every endpoint)
+    """
+    def __init__(self, percentile = 95.0, max_extra = 0.05, min_delay = 0.005, \
+                 min_samples = 20, endpoints = None):
+        self.percentile = min(max(0.0, percentile), 100.0)
+        self.max_extra = min(max(0.0, max_extra), 1.0)
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.endpoints = tuple(endpoints) if endpoints else None
+
+    def __str__(self):
+        return f'SumoHedgePolicy[p{self.percentile:g}, max_extra={self.max_extra:.0%}, min_delay={self.min_delay}s]'
+
+    def delay(self, metrics: SumoAPIMetrics, endpoint: str) -> float:
+        """ seconds to wait for a response before hedging a request, or None to never hedge it """
+        if self.endpoints is not None and not endpoint in self.endpoints:
+            return None
+        m = metrics.endpoint(endpoint)
+        if m.samples() < self.min_samples:
             return None
+        return max(self.min_delay, m.percentile(self.percentile))
+
+    def allow(self, metrics: SumoAPIMetrics, endpoint: str) -> bool:
+        """ True if one more hedged request stays within the 'max_extra' budget """
+        m = metrics.endpoint(endpoint)
+        return m.hedges + 1 <= self.max_extra * m.requests
+
+
+class SumoAPIBase:
+    """
+    Configuration, request construction and response decoding shared by
+    the synchronous SumoAPI and the asyncio based AsyncSumoAPI.
+
+    Each API call is split in two: a _<call>_request() method which returns
+    the (url, params) to GET, and a _<call>_result() method which turns the
+    received json into sumostats objects. The two client classes only differ
+    in how they perform the HTTP GET in between.
+    """
+
+    # default location of the sumo-api.com service
+    _API_URL = "https://sumo-api.com/api"
+    # error responses which mean "this doesn't exist" (see SumoResponseCache.store_negative())
+    _NEGATIVE_STATUS = (404, 410)
+
+    def __init__(self, apiurl = None, timeout = 30.0, connect_timeout = 10.0, \
+                 max_connections = 10, max_keepalive = 10, keepalive_expiry = 30.0, \
+                 http2 = False, cache: SumoResponseCache = None, \
+                 retry: SumoRetryPolicy = None, error_budget = 200, \
+                 transport: httpx.BaseTransport = None, metrics: SumoAPIMetrics = None, \
+                 concurrency: SumoConcurrencyController = None, hedge: SumoHedgePolicy = None):
+        """
+        Create an API wrapper that owns a single, long-lived HTTP client.
+
+        The client keeps connections to the server alive between calls
+        (connection pooling), so a long run of API calls only pays the
+        TCP+TLS handshake cost once per pooled connection.
+
+          apiurl: base URL of the API (defaults to sumo-api.com)
+          timeout: read/write/pool timeout in seconds
+          connect_timeout: connection timeout in seconds
+          max_connections: maximum number of connections in the pool
+          max_keepalive: maximum number of idle keep-alive connections
+          keepalive_expiry: seconds an idle connection is kept open
+          http2: use HTTP/2 if the optional 'h2' package is installed
+          cache: SumoResponseCache used to avoid re-downloading responses
+          retry: default SumoRetryPolicy (see also set_retry_policy())
+          error_budget: maximum number of retries in the lifetime of this
+                        object, after which failed requests are not retried
+          transport: custom httpx transport, e.g. to record or replay API
+                     traffic (see record() and replay())
+          metrics: SumoAPIMetrics collecting per-endpoint request metrics
+                   (can be shared by several API objects, see stats())
+          concurrency: SumoConcurrencyController adapting the number of
+                       requests in flight to the server's latency and
+                       throttling (default: a fixed limit)
+          hedge: SumoHedgePolicy to duplicate slow requests (default: never)
+        """
+        self.apiurl = apiurl if apiurl else SumoAPIBase._API_URL
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.cache = cache
+        self.retry = retry if retry else SumoRetryPolicy()
+        # per-endpoint retry policies, e.g. 'basho_torikumi'
+        self.retry_policies: dict[str, SumoRetryPolicy] = {}
+        self.error_budget = error_budget
+        self.retries = 0
+        self.failures = 0
+        self.transport = transport
+        self.metrics = metrics if metrics else SumoAPIMetrics()
+        self.concurrency = concurrency
+        self.hedge = hedge
+        # (SumoAPI) threads sending the requests which may be hedged
+        self._executor = None
+        # guards the lazy creation of the client and executor (paginate() threads share them)
+        self._lock = threading.Lock()
+        if concurrency:
+            # there's no point in a window larger than the connection pool
+            self.max_connections = max(self.max_connections, concurrency.max_window)
+            self.max_keepalive = max(self.max_keepalive, concurrency.max_window)
+        self._client = None
+
+    def __getstate__(self):
+        # never pickle the live HTTP client (or its open sockets / files)
+        state = self.__dict__.copy()
+        state['_client'] = None
+        state['_executor'] = None
+        state['transport'] = None
+        state.pop('_lock', None)
+        return state
+
+    def __setstate__(self, state):
+        # objects saved by older versions only carried the 'apiurl'
+        self.__init__(apiurl=state.get('apiurl'))
+        for k, v in state.items():
+            self.__dict__[k] = v
+        self._client = None
+        self._executor = None
+
+    def config(self) -> dict:
+        """ keyword arguments which re-create an API object with the same configuration """
+        return {
+            'apiurl': self.apiurl,
+            'timeout': self.timeout,
+            'connect_timeout': self.connect_timeout,
+            'max_connections': self.max_connections,
+            'max_keepalive': self.max_keepalive,
+            'keepalive_expiry': self.keepalive_expiry,
+            'http2': self.http2,
+            'cache': self.cache,
+            'retry': self.retry,
+            'error_budget': self.error_budget,
+            'transport': self.transport,
+            'metrics': self.metrics,
+            'concurrency': self.concurrency,
+            'hedge': self.hedge,
+        }
+
+    def stats(self) -> dict:
+        """
+        Per-endpoint request metrics: call counts, latency percentiles,
+        bytes received, 204/empty responses, errors and retries, e.g.
+            api.stats()['rikishi_matches']['latency']['p95']
+        """
+        return self.metrics.stats()
+
+    def dump_stats(self, path):
+        """ write stats() to a json file """
+        self.metrics.dump(path)
+        return
+
+    def set_retry_policy(self, endpoint: str, policy: SumoRetryPolicy):
+        """
+        Use a specific retry policy for one endpoint, where the endpoint is the
+        name of the API method, e.g. 'rikishi_matches' or 'basho_torikumi'
+        """
+        self.retry_policies[endpoint] = policy
+        return
+
+    def retry_policy(self, endpoint: str) -> SumoRetryPolicy:
+        if endpoint in self.retry_policies:
+            return self.retry_policies[endpoint]
+        return self.retry
+
+    def error_budget_left(self) -> int:
+        return max(0, self.error_budget - self.retries)
+
+    def reset_error_budget(self):
+        """ start a new run: forget previous retries and failures """
+        self.retries = 0
+        self.failures = 0
+        return
+
+    def _use_http2(self) -> bool:
+        if not self.http2:
+            return False
+        try:
+            import h2
+        except ImportError:
+            if SumoAPI._VERBOSE > 0:
+                sys.stderr.write('HTTP/2 requested, but the "h2" package is not installed: using HTTP/1.1\n')
+            return False
+        return True
+
+    def _transport_config(self) -> dict:
+        """ keyword arguments for the httpx transport (connection pool) """
+        return {
+            'http2': self._use_http2(),
+            'limits': httpx.Limits(max_connections=self.max_connections, \
+                                   max_keepalive_connections=self.max_keepalive, \
+                                   keepalive_expiry=self.keepalive_expiry),
+        }
+
+    def _client_config(self) -> dict:
+        """ keyword arguments used to construct the pooled httpx client """
+        config = { 'timeout': httpx.Timeout(self.timeout, connect=self.connect_timeout) }
+        if self.transport:
+            config['transport'] = self.transport
+        else:
+            config.update(self._transport_config())
+        return config
+
+    def record(self, path):
+        """
+        Record every request/response pair from now on into an archive at
+        'path', which can be replayed later with replay()
+        """
+        self._set_transport(SumoRecordTransport(path, **self._transport_config()))
+        return
 
+    def replay(self, path, latency = 0.0, jitter = 0.0, recorded_latency = 0.0):
+        """
+        Answer every request from an archive made by record(), without any
+        network access. Each request is delayed by 'latency' seconds plus a
+        random 'jitter', plus 'recorded_latency' times the time the request
+        originally took.
+        """
+        self._set_transport(SumoReplayTransport(path, latency=latency, jitter=jitter, \
+                                                recorded_latency=recorded_latency))
+        return
+
+    def _set_transport(self, transport):
+        # the next request creates a new client with this transport
+        self.transport = transport
+        self._client = None
+        return
+
+    def _cache_lookup(self, url, params) -> SumoCacheEntry:
+        """ find a cached response (possibly stale) for the request """
+        if not self.cache:
+            return None
+        return self.cache.lookup(url, params)
+
+    def _negative_lookup(self, url, params, endpoint = '') -> bool:
+        """ True if the request is known to return nothing (see SumoResponseCache) """
+        if not self.cache or not self.cache.lookup_negative(url, params):
+            return False
+        self.metrics.cached(endpoint)
+        if SumoAPI._DEBUG:
+            sys.stderr.write(f'GET {url} params:{params} (known to be empty)\n')
+        return True
+
+    def _cached_json(self, url, params, entry: SumoCacheEntry, endpoint = ''):
+        self.metrics.cached(endpoint)
+        if SumoAPI._DEBUG:
+            sys.stderr.write(f'GET {url} params:{params} (cached)\n')
+        return entry.json()
+
+    def _revalidated_json(self, url, params, entry: SumoCacheEntry, r: httpx.Response):
+        """ a stale cache entry was confirmed by a 304 Not Modified response """
+        self.cache.revalidate(entry, url, r.headers)
+        if SumoAPI._DEBUG:
+            sys.stderr.write(f'GET {url} params:{params} (not modified)\n')
+        return entry.json()
+
+    def _response_json(self, url, params, r: httpx.Response):
+        """ check a successful response for a valid json body """
         # check to see if this is valid json (takes at least 2 bytes)
-        if r.status_code == 204 or len(r.text) < 2:
+        if r.status_code == 204 or len(r.content) < 2:
             if SumoAPI._DEBUG:
                 sys.stderr.write(f'GET {url} params:{params} received 204: text="{r.text}"\n')
+            if self.cache:
+                self.cache.store_negative(url, params, r.status_code)
             return None
         if SumoAPI._DEBUG:
             sys.stderr.write(f'GET {url} params:{params}\nRESPONSE:{r.text}\n')
-        return r.json()
+        j = SumoJSON.loads(r.content)
+        if self.cache:
+            self.cache.store(url, params, r.text, r.headers)
+        return j
+
+    def _observe(self, endpoint: str, start: float, r: httpx.Response = None, error = False):
+        """ record the metrics of a single request which started at time.perf_counter() 'start' """
+        elapsed = time.perf_counter() - start
+        nbytes = len(r.content) if r is not None else 0
+        if error:
+            self.metrics.error(endpoint, elapsed, nbytes)
+        else:
+            self.metrics.response(endpoint, elapsed, nbytes, \
+                                  empty=r.status_code == 204 or (r.status_code != 304 and nbytes < 2), \
+                                  not_modified=r.status_code == 304)
+        return
+
+    # Static method
+    def _congested(exc: Exception) -> bool:
+        """ a failure which means the server is overloaded (throttled or timed out) """
+        if isinstance(exc, httpx.TimeoutException):
+            return True
+        return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in (429, 503)
+
+    def _release_slot(self, start: float, error: Exception = None, cancelled = False):
+        """ give back the concurrency slot of a request which started at 'start' (see SumoConcurrencyController) """
+        if cancelled:
+            # e.g. a hedged request which lost the race: nothing to learn from it
+            self.concurrency.release()
+        elif error is None:
+            self.concurrency.release(time.perf_counter() - start)
+        else:
+            self.concurrency.release(congested=SumoAPIBase._congested(error))
+        self.metrics.gauge('concurrency_window', round(self.concurrency.window, 2))
+        return
+
+    def _retry_delay(self, endpoint: str, attempt: int, exc: Exception) -> float:
+        """
+        Decide if a failed request should be retried: returns the number of
+        seconds to wait before the next attempt, or None to give up.
+        """
+        policy = self.retry_policy(endpoint)
+        if not policy.retryable(exc) or attempt >= policy.max_attempts:
+            return None
+        if self.error_budget_left() <= 0:
+            if SumoAPI._VERBOSE > 0:
+                sys.stderr.write(f'API error budget ({self.error_budget} retries) exhausted: not retrying {exc.request.url!r}\n')
+            return None
+        retry_after = None
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = SumoRetryPolicy.retry_after(exc.response)
+            if retry_after is not None and retry_after > policy.max_retry_after:
+                return None
+        self.retries += 1
+        self.metrics.retry(endpoint)
+        delay = policy.delay(attempt, retry_after)
+        if SumoAPI._VERBOSE > 0:
+            sys.stderr.write(f'Retrying {exc.request.url!r} in {delay:.2f}s (attempt {attempt+1}/{policy.max_attempts}): {exc!r}\n')
+        return delay
+
+    def _request_error(self, endpoint: str, exc: Exception, url = None, params = None):
+        """
+        report a failed request: requests for things that don't exist (4xx)
+        return None, everything else raises SumoAPIError
+        """
+        if isinstance(exc, httpx.HTTPStatusError):
+            sys.stderr.write(f'Error response {exc.response.status_code} while requesting {exc.request.url!r}.\n')
+            if self.cache and url and exc.response.status_code in SumoAPIBase._NEGATIVE_STATUS:
+                self.cache.store_negative(url, params, exc.response.status_code)
+        else:
+            sys.stderr.write(f'An error occurred while requesting {exc.request.url!r}.\n')
+        if self.retry_policy(endpoint).retryable(exc):
+            self.failures += 1
+            status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+            raise SumoAPIError(f'{endpoint}: request failed: {exc!r}', url=str(exc.request.url), \
+                               status_code=status_code) from exc
+        return None
+
+    #
+    # Paged API calls
+    #
 
-    def rikishis(self, limit = 1000, skip = 0, retired = False, **query):
+    # Static method
+    def _page_records(j, listname) -> list:
+        """ the records (json dicts) in one page of a paged API call """
+        if not j or not listname in j or not j[listname]:
+            return []
+        return j[listname]
+
+    # Static method
+    def _page_skips(j, records, limit, skip) -> list[int]:
+        """
+        Use the 'total' in the first page of a paged API call to find the
+        'skip' of every remaining page
+        """
+        if not j or not isinstance(j.get('total'), int) or not records:
+            return []
+        # the server may return fewer than 'limit' records per page
+        step = min(limit, len(records)) if limit > 0 else len(records)
+        return list(range(skip + step, j['total'], step))
+
+    #
+    # Request construction and response decoding for each API call
+    #
+
+    def _rikishis_request(self, limit, skip, retired, query):
         """ GET /rikishis """
         url = self.apiurl + "/rikishis"
         # shikonaEn: search for a rikishi by English shikona
@@ -54,8 +494,9 @@ class SumoAPI:
                 params[name] = val
             else:
                 raise Exception('invalid parameter:', name)
+        return url, params
 
-        j = self._get_json(url, params)
+    def _rikishis_result(self, j, query):
         if not j or not "total" in j or j["total"] < 1:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find rikishi from query parameters: {query}\n')
@@ -64,9 +505,9 @@ class SumoAPI:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'"records" not in json response"\n{j}\n')
             return []
-        return list(map(Rikishi.from_dict, j["records"]))
+        return list(map(SumoDecoder.decoder(Rikishi), j["records"]))
 
-    def rikishi(self, rikishiId, measurements = False, ranks = False, shikonas = False):
+    def _rikishi_request(self, rikishiId, measurements, ranks, shikonas):
         """ GET /api/rikishi/:rikishiId """
         url = self.apiurl + f'/rikishi/{rikishiId}'
         # measurements: if true, the changes in a rikishi's measurements over time will be included in the response
@@ -79,25 +520,27 @@ class SumoAPI:
             params['ranks']='true'
         if shikonas:
             params['shikonas']='true'
+        return url, params
 
-        j = self._get_json(url, params)
+    def _rikishi_result(self, j, rikishiId):
         if not j:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find rikishi:{rikishiId}\n')
             return None
-        return Rikishi.from_dict(j)
+        return SumoDecoder.decode(Rikishi, j)
 
-    def rikishi_stats(self, rikishiId):
+    def _rikishi_stats_request(self, rikishiId):
         """ GET /api/rikishi/:rikishiId/stats """
-        url = self.apiurl + f'/rikishi/{rikishiId}/stats'
-        j = self._get_json(url, {})
+        return self.apiurl + f'/rikishi/{rikishiId}/stats', {}
+
+    def _rikishi_stats_result(self, j, rikishiId):
         if not j:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find stats for rikishi:{rikishiId}\n')
             return None
-        return RikishiStats.from_dict(j)
+        return SumoDecoder.decode(RikishiStats, j)
 
-    def rikishi_matches(self, rikishiId, bashoId = None, opponentId = None, limit = 0, skip = 0):
+    def _rikishi_matches_request(self, rikishiId, bashoId, opponentId, limit, skip):
         """
         GET /api/rikishi/:rikishiId/matches
         GET /api/rikishi/:rikishiId/matches/:opponentId
@@ -108,8 +551,9 @@ class SumoAPI:
             params["bashoId"] = bashoId
         if opponentId:
             url += f'/{int(opponentId)}'
-        # print(url, params)
-        j = self._get_json(url, params)
+        return url, params
+
+    def _rikishi_matches_result(self, j, rikishiId, bashoId, opponentId):
         if not j or not "total" in j or j["total"] < 1:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find Rikishi matches for R:{rikishiId} (basho:{bashoId}, opponent:{opponentId})\n')
@@ -117,15 +561,16 @@ class SumoAPI:
                 sys.stderr.write(f'json:{j}\n')
             return [], None
         if opponentId:
-            matchup = RikishiMatchup.from_dict(j)
+            matchup = SumoDecoder.decode(RikishiMatchup, j)
             return matchup.matches, matchup
         else:
-            return list(map(BashoMatch.from_dict, j["records"])), None
+            return list(map(SumoDecoder.decoder(BashoMatch), j["records"])), None
 
-    def basho(self, bashoId):
+    def _basho_request(self, bashoId):
         """ GET /api/basho/:bashoId """
-        url = self.apiurl + f'/basho/{bashoId}'
-        j = self._get_json(url, {})
+        return self.apiurl + f'/basho/{bashoId}', {}
+
+    def _basho_result(self, j, bashoId):
         if not j or not "date" in j:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find basho:{bashoId}\n')
@@ -133,15 +578,16 @@ class SumoAPI:
                 sys.stderr.write(f'json:{j}\n')
             return None
         try:
-            return Basho.from_dict(j)
+            return SumoDecoder.decode(Basho, j)
         except KeyError as ke:
             sys.stderr.write(f'KeyError in basho json:\n{j}\n')
             raise ke
 
-    def basho_banzuke(self, bashoId, division: SumoDivision):
+    def _basho_banzuke_request(self, bashoId, division: SumoDivision):
         """ GET /api/basho/:bashoId/banzuke/:division """
-        url = self.apiurl + f'/basho/{bashoId}/banzuke/{division}'
-        j = self._get_json(url, {})
+        return self.apiurl + f'/basho/{bashoId}/banzuke/{division}', {}
+
+    def _basho_banzuke_result(self, j, bashoId, division: SumoDivision):
         if not j or not "bashoId" in j:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find {division} banzuke for basho:{bashoId} -- Creating empty banzuke.\n')
@@ -151,7 +597,7 @@ class SumoAPI:
             b.division = division
             return b
         try:
-            b = Banzuke.from_dict(j)
+            b = SumoDecoder.decode(Banzuke, j)
             if not b or not b.isValid():
                 if SumoAPI._VERBOSE > 0:
                     sys.stderr.write(f'Error parsing {division} banzuke for basho:{bashoId} -- Creating empty banzuke\n')
@@ -165,26 +611,515 @@ class SumoAPI:
             sys.stderr.write(f'ValueError in banzuke json:\n{j}\n')
             raise ve
 
-    def basho_torikumi(self, bashoId, division: SumoDivision, day: int):
+    def _basho_torikumi_request(self, bashoId, division: SumoDivision, day: int):
         """ GET /api/basho/:bashoId/torikumi/:division/:day """
-        url = self.apiurl + f'/basho/{bashoId}/torikumi/{division}/{day}'
-        j = self._get_json(url, {})
+        return self.apiurl + f'/basho/{bashoId}/torikumi/{division}/{day}', {}
+
+    def _basho_torikumi_result(self, j, bashoId, division: SumoDivision, day: int):
         if not j or not "torikumi" in j:
             if SumoAPI._VERBOSE > 0:
                 sys.stderr.write(f'Could not find torikumi for basho:{bashoId}\n')
             if SumoAPI._DEBUG:
                 sys.stderr.write(f'{j}\n')
             return None
-        t = BashoTorikumi.from_dict(j)
+        t = SumoDecoder.decode(BashoTorikumi, j)
         t.division = division
         t.day = day
         return t
 
+    def _history_request(self, name, rikishiId, bashoId, sortOrder):
+        """
+        GET /api/measurements
+        GET /api/ranks
+        GET /api/shikonas
+        """
+        # rikishiId: only return the history of a single rikishi
+        # bashoId: only return the entries for a single basho (YYYYMM)
+        # sortOrder: 'asc' or 'desc' by bashoId
+        # (either rikishiId or bashoId is required)
+        if not rikishiId and not bashoId:
+            raise Exception(f'{name}: rikishiId or bashoId is required')
+        params = {}
+        if rikishiId:
+            params['rikishiId'] = int(rikishiId)
+        if bashoId:
+            params['bashoId'] = bashoId if isinstance(bashoId, str) else BashoIdStr(bashoId)
+        if sortOrder:
+            params['sortOrder'] = sortOrder
+        return self.apiurl + f'/{name}', params
+
+    def _history_result(self, j, cls, name, rikishiId, bashoId) -> list:
+        # the response is a plain list (be lenient with a paged response)
+        records = j if isinstance(j, list) else SumoAPIBase._page_records(j, 'records')
+        if not records:
+            if SumoAPI._VERBOSE > 0:
+                sys.stderr.write(f'Could not find {name} for rikishi:{rikishiId} basho:{bashoId}\n')
+            return []
+        return SumoDecoder.decode_list(cls, records)
+
+
+class SumoAPI(SumoAPIBase):
+    """ Object wrapper around sumo-api.com API calls """
+    # set to True to verbose-log received json
+    _DEBUG = False
+    _VERBOSE=0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def client(self) -> httpx.Client:
+        """ Get (and lazily create) the pooled HTTP client """
+        if not self._client:
+            with self._lock:
+                if not self._client:
+                    self._client = httpx.Client(**self._client_config())
+        return self._client
+
+    def executor(self) -> ThreadPoolExecutor:
+        """ Get (and lazily create) the threads used to hedge requests """
+        if not self._executor:
+            with self._lock:
+                if not self._executor:
+                    # room for a request and its duplicate on every pooled connection
+                    self._executor = ThreadPoolExecutor(max_workers=2*self.max_connections)
+        return self._executor
+
+    def close(self):
+        """ Close the HTTP client, all pooled connections, and the response cache """
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._client:
+            self._client.close()
+            self._client = None
+        if self.cache:
+            self.cache.close()
+        return
+
+    def _get_json(self, url, params, endpoint = ''):
+        entry = self._cache_lookup(url, params)
+        if entry and entry.fresh():
+            return self._cached_json(url, params, entry, endpoint)
+        if not entry and self._negative_lookup(url, params, endpoint):
+            return None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                r = self._hedged_send(url, params, entry, endpoint)
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                delay = self._retry_delay(endpoint, attempt, exc)
+                if delay is None:
+                    return self._request_error(endpoint, exc, url, params)
+                time.sleep(delay)
+                continue
+            if r.status_code == 304 and entry:
+                return self._revalidated_json(url, params, entry, r)
+            return self._response_json(url, params, r)
+
+    def _send(self, url, params, entry: SumoCacheEntry, endpoint, started: threading.Event = None) -> httpx.Response:
+        """
+        Send a single request (conditionally, if we have a stale cache entry)
+        and record its metrics: returns a successful (or 304) response, raises
+        httpx.RequestError or httpx.HTTPStatusError. 'started' is set once the
+        request is sent, i.e. it no longer waits for a concurrency slot.
+        """
+        r = None
+        error = None
+        if self.concurrency:
+            self.concurrency.acquire()
+        if started:
+            started.set()
+        start = time.perf_counter()
+        try:
+            r = self.client().get(url, params=params, headers=entry.validators() if entry else None)
+            if r.status_code != 304 or not entry:
+                r.raise_for_status()
+            self._observe(endpoint, start, r)
+            return r
+        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+            self._observe(endpoint, start, r, error=True)
+            error = exc
+            raise
+        finally:
+            if self.concurrency:
+                self._release_slot(start, error)
+
+    def _hedged_send(self, url, params, entry: SumoCacheEntry, endpoint) -> httpx.Response:
+        """ _send(), plus a duplicate request if the response is slow (see SumoHedgePolicy) """
+        delay = self.hedge.delay(self.metrics, endpoint) if self.hedge else None
+        if delay is None:
+            return self._send(url, params, entry, endpoint)
+        # time the request from when it is sent, not from when it was queued
+        started = threading.Event()
+        first = self.executor().submit(self._send, url, params, entry, endpoint, started)
+        started.wait()
+        done, _ = wait([first], timeout=delay)
+        if done or not self.hedge.allow(self.metrics, endpoint):
+            return first.result()
+        if SumoAPI._DEBUG:
+            sys.stderr.write(f'GET {url} params:{params} hedged after {delay*1000:.1f}ms\n')
+        self.metrics.hedge(endpoint)
+        second = self.executor().submit(self._send, url, params, entry, endpoint)
+        # the first successful response wins (the other one is left to finish on its own)
+        error = None
+        for f in as_completed([first, second]):
+            if f.exception() is None:
+                if f is second:
+                    self.metrics.hedge(endpoint, won=True)
+                return f.result()
+            error = f.exception()
+        raise error
+
+    def paginate(self, request, listname = 'records', limit = 1000, skip = 0, endpoint = ''):
+        """
+        Iterate over every record (json dict) of a paged API call, where
+        'request(limit, skip)' returns the (url, params) of a single page.
+        The 'total' in the first page is used to fetch all the remaining
+        pages at once (up to max_connections, or the concurrency window, in
+        parallel); records are
+        returned in order. e.g.:
+
+            for m in api.paginate(lambda l, s: api._rikishi_matches_request(1, None, None, l, s)):
+        """
+        j = self._get_json(*request(limit, skip), endpoint=endpoint)
+        records = SumoAPIBase._page_records(j, listname)
+        yield from records
+        skips = SumoAPIBase._page_skips(j, records, limit, skip)
+        if not skips:
+            return
+        with ThreadPoolExecutor(max_workers=min(len(skips), self.max_connections)) as pool:
+            pages = pool.map(lambda s: self._get_json(*request(limit, s), endpoint=endpoint), skips)
+            for page in pages:
+                yield from SumoAPIBase._page_records(page, listname)
+        return
+
+    def rikishis(self, limit = 1000, skip = 0, retired = False, all_pages = False, **query):
+        """
+        GET /rikishis
+        (all_pages=True returns every matching rikishi, 'limit' at a time)
+        """
+        if all_pages:
+            return list(map(SumoDecoder.decoder(Rikishi), \
+                            self.paginate(lambda l, s: self._rikishis_request(l, s, retired, query), \
+                                          'records', limit, skip, endpoint='rikishis')))
+        j = self._get_json(*self._rikishis_request(limit, skip, retired, query), endpoint='rikishis')
+        return self._rikishis_result(j, query)
+
+    def rikishi(self, rikishiId, measurements = False, ranks = False, shikonas = False):
+        """ GET /api/rikishi/:rikishiId """
+        j = self._get_json(*self._rikishi_request(rikishiId, measurements, ranks, shikonas), endpoint='rikishi')
+        return self._rikishi_result(j, rikishiId)
+
+    def rikishi_stats(self, rikishiId):
+        """ GET /api/rikishi/:rikishiId/stats """
+        j = self._get_json(*self._rikishi_stats_request(rikishiId), endpoint='rikishi_stats')
+        return self._rikishi_stats_result(j, rikishiId)
+
+    def rikishi_matches(self, rikishiId, bashoId = None, opponentId = None, limit = 0, skip = 0, all_pages = False, \
+                        decode = True):
+        """
+        GET /api/rikishi/:rikishiId/matches
+        GET /api/rikishi/:rikishiId/matches/:opponentId
+        (all_pages=True returns every match, 'limit' at a time, and no RikishiMatchup;
+         with decode=False the matches are the json dicts, see SumoMatchStore.add_record())
+        """
+        if all_pages:
+            return list(map(SumoDecoder.decoder(BashoMatch) if decode else dict, \
+                            self.paginate(lambda l, s: self._rikishi_matches_request(rikishiId, bashoId, opponentId, l, s), \
+                                          'matches' if opponentId else 'records', limit, skip, \
+                                          endpoint='rikishi_matches'))), None
+        j = self._get_json(*self._rikishi_matches_request(rikishiId, bashoId, opponentId, limit, skip), endpoint='rikishi_matches')
+        return self._rikishi_matches_result(j, rikishiId, bashoId, opponentId)
+
+    def basho(self, bashoId):
+        """ GET /api/basho/:bashoId """
+        j = self._get_json(*self._basho_request(bashoId), endpoint='basho')
+        return self._basho_result(j, bashoId)
+
+    def basho_banzuke(self, bashoId, division: SumoDivision):
+        """ GET /api/basho/:bashoId/banzuke/:division """
+        j = self._get_json(*self._basho_banzuke_request(bashoId, division), endpoint='basho_banzuke')
+        return self._basho_banzuke_result(j, bashoId, division)
+
+    def basho_torikumi(self, bashoId, division: SumoDivision, day: int):
+        """ GET /api/basho/:bashoId/torikumi/:division/:day """
+        j = self._get_json(*self._basho_torikumi_request(bashoId, division, day), endpoint='basho_torikumi')
+        return self._basho_torikumi_result(j, bashoId, division, day)
+
+    def measurements(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiMeasurement]:
+        """ GET /api/measurements: every rikishi's measurements in a basho (or one rikishi's history) """
+        j = self._get_json(*self._history_request('measurements', rikishiId, bashoId, sortOrder), endpoint='measurements')
+        return self._history_result(j, RikishiMeasurement, 'measurements', rikishiId, bashoId)
+
+    def ranks(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiRank]:
+        """ GET /api/ranks: every rikishi's rank in a basho (or one rikishi's history) """
+        j = self._get_json(*self._history_request('ranks', rikishiId, bashoId, sortOrder), endpoint='ranks')
+        return self._history_result(j, RikishiRank, 'ranks', rikishiId, bashoId)
+
+    def shikonas(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiShikona]:
+        """ GET /api/shikonas: every rikishi's shikona in a basho (or one rikishi's history) """
+        j = self._get_json(*self._history_request('shikonas', rikishiId, bashoId, sortOrder), endpoint='shikonas')
+        return self._history_result(j, RikishiShikona, 'shikonas', rikishiId, bashoId)
+
+
+class AsyncSumoAPI(SumoAPIBase):
+    """
+    asyncio version of SumoAPI
+
+    Every API method is a coroutine with the same arguments and return
+    values as its SumoAPI counterpart. At most 'max_concurrency' requests
+    are in flight at any time, no matter how many coroutines are awaiting
+    a response, e.g.:
+
+        async with AsyncSumoAPI(max_concurrency=8) as api:
+            days = await asyncio.gather(*[api.basho_torikumi('202501', SumoDivision.Makuuchi, d) for d in range(1, 16)])
+
+    With a SumoConcurrencyController ('concurrency'), the limit is its
+    adaptive window instead, which never exceeds its 'max_window'.
+    """
+
+    def __init__(self, max_concurrency = 8, **kwargs):
+        super().__init__(**kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+        if self.concurrency:
+            self.max_concurrency = self.concurrency.max_window
+        # there's no point in more concurrent requests than pooled connections
+        self.max_connections = max(self.max_connections, self.max_concurrency)
+        self.max_keepalive = max(self.max_keepalive, self.max_concurrency)
+        self._semaphore = None
+
+    # Static method
+    def from_api(api: SumoAPIBase, max_concurrency = 8):
+        """ Create an AsyncSumoAPI with the same configuration as an existing API object """
+        return AsyncSumoAPI(max_concurrency=max_concurrency, **api.config())
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_semaphore'] = None
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+        return False
+
+    def client(self) -> httpx.AsyncClient:
+        """ Get (and lazily create) the pooled asynchronous HTTP client """
+        if not self._client:
+            self._client = httpx.AsyncClient(**self._client_config())
+        return self._client
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """ Get (and lazily create) the semaphore bounding concurrent requests """
+        if not self._semaphore:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _acquire_slot(self):
+        """ wait for one of the (fixed or adaptive) concurrency slots """
+        if self.concurrency:
+            await self.concurrency.acquire_async()
+        else:
+            await self.semaphore().acquire()
+        return
+
+    async def aclose(self):
+        """ Close the HTTP client and all pooled connections """
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        self._semaphore = None
+        return
+
+    async def _get_json(self, url, params, endpoint = ''):
+        entry = self._cache_lookup(url, params)
+        if entry and entry.fresh():
+            return self._cached_json(url, params, entry, endpoint)
+        if not entry and self._negative_lookup(url, params, endpoint):
+            return None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                r = await self._hedged_send(url, params, entry, endpoint)
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                # wait for the retry without holding on to a concurrency slot
+                delay = self._retry_delay(endpoint, attempt, exc)
+                if delay is None:
+                    return self._request_error(endpoint, exc, url, params)
+                await asyncio.sleep(delay)
+                continue
+            if r.status_code == 304 and entry:
+                return self._revalidated_json(url, params, entry, r)
+            return self._response_json(url, params, r)
+
+    async def _send(self, url, params, entry: SumoCacheEntry, endpoint, started: asyncio.Event = None) -> httpx.Response:
+        """ asyncio version of SumoAPI._send() """
+        r = None
+        error = None
+        cancelled = False
+        await self._acquire_slot()
+        if started:
+            started.set()
+        start = time.perf_counter()
+        try:
+            r = await self.client().get(url, params=params, headers=entry.validators() if entry else None)
+            if r.status_code != 304 or not entry:
+                r.raise_for_status()
+            self._observe(endpoint, start, r)
+            return r
+        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+            self._observe(endpoint, start, r, error=True)
+            error = exc
+            raise
+        except asyncio.CancelledError:
+            self.metrics.cancelled(endpoint)
+            cancelled = True
+            raise
+        finally:
+            if self.concurrency:
+                self._release_slot(start, error, cancelled)
+            else:
+                self.semaphore().release()
+
+    async def _hedged_send(self, url, params, entry: SumoCacheEntry, endpoint) -> httpx.Response:
+        """ asyncio version of SumoAPI._hedged_send(): the losing request is cancelled """
+        delay = self.hedge.delay(self.metrics, endpoint) if self.hedge else None
+        if delay is None:
+            return await self._send(url, params, entry, endpoint)
+        # time the request from when it is sent, not from when it was queued
+        started = asyncio.Event()
+        first = asyncio.ensure_future(self._send(url, params, entry, endpoint, started))
+        pending = { first }
+        second = None
+        try:
+            await started.wait()
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self.hedge.allow(self.metrics, endpoint):
+                return await first
+            if SumoAPI._DEBUG:
+                sys.stderr.write(f'GET {url} params:{params} hedged after {delay*1000:.1f}ms\n')
+            self.metrics.hedge(endpoint)
+            second = asyncio.ensure_future(self._send(url, params, entry, endpoint))
+            pending.add(second)
+            # the first successful response wins
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        if f is second:
+                            self.metrics.hedge(endpoint, won=True)
+                        return f.result()
+                    error = f.exception()
+            raise error
+        finally:
+            for f in (first, second):
+                if f and not f.done():
+                    f.cancel()
+
+    async def paginate(self, request, listname = 'records', limit = 1000, skip = 0, endpoint = ''):
+        """
+        Iterate (async for) over every record (json dict) of a paged API
+        call, where 'request(limit, skip)' returns the (url, params) of a
+        single page. The 'total' in the first page is used to request all
+        the remaining pages concurrently; records are returned in order.
+        """
+        j = await self._get_json(*request(limit, skip), endpoint=endpoint)
+        records = SumoAPIBase._page_records(j, listname)
+        for r in records:
+            yield r
+        skips = SumoAPIBase._page_skips(j, records, limit, skip)
+        if not skips:
+            return
+        pages = await asyncio.gather(*[self._get_json(*request(limit, s), endpoint=endpoint) for s in skips])
+        for page in pages:
+            for r in SumoAPIBase._page_records(page, listname):
+                yield r
+
+    async def rikishis(self, limit = 1000, skip = 0, retired = False, all_pages = False, **query):
+        """
+        GET /rikishis
+        (all_pages=True returns every matching rikishi, 'limit' at a time)
+        """
+        if all_pages:
+            return [SumoDecoder.decode(Rikishi, r) async for r in \
+                    self.paginate(lambda l, s: self._rikishis_request(l, s, retired, query), \
+                                  'records', limit, skip, endpoint='rikishis')]
+        j = await self._get_json(*self._rikishis_request(limit, skip, retired, query), endpoint='rikishis')
+        return self._rikishis_result(j, query)
+
+    async def rikishi(self, rikishiId, measurements = False, ranks = False, shikonas = False):
+        """ GET /api/rikishi/:rikishiId """
+        j = await self._get_json(*self._rikishi_request(rikishiId, measurements, ranks, shikonas), endpoint='rikishi')
+        return self._rikishi_result(j, rikishiId)
+
+    async def rikishi_stats(self, rikishiId):
+        """ GET /api/rikishi/:rikishiId/stats """
+        j = await self._get_json(*self._rikishi_stats_request(rikishiId), endpoint='rikishi_stats')
+        return self._rikishi_stats_result(j, rikishiId)
+
+    async def rikishi_matches(self, rikishiId, bashoId = None, opponentId = None, limit = 0, skip = 0, all_pages = False, \
+                              decode = True):
+        """
+        GET /api/rikishi/:rikishiId/matches
+        GET /api/rikishi/:rikishiId/matches/:opponentId
+        (all_pages=True returns every match, 'limit' at a time, and no RikishiMatchup;
+         with decode=False the matches are the json dicts, see SumoMatchStore.add_record())
+        """
+        if all_pages:
+            return [SumoDecoder.decode(BashoMatch, m) if decode else m async for m in \
+                    self.paginate(lambda l, s: self._rikishi_matches_request(rikishiId, bashoId, opponentId, l, s), \
+                                  'matches' if opponentId else 'records', limit, skip, \
+                                  endpoint='rikishi_matches')], None
+        j = await self._get_json(*self._rikishi_matches_request(rikishiId, bashoId, opponentId, limit, skip), endpoint='rikishi_matches')
+        return self._rikishi_matches_result(j, rikishiId, bashoId, opponentId)
+
+    async def basho(self, bashoId):
+        """ GET /api/basho/:bashoId """
+        j = await self._get_json(*self._basho_request(bashoId), endpoint='basho')
+        return self._basho_result(j, bashoId)
+
+    async def basho_banzuke(self, bashoId, division: SumoDivision):
+        """ GET /api/basho/:bashoId/banzuke/:division """
+        j = await self._get_json(*self._basho_banzuke_request(bashoId, division), endpoint='basho_banzuke')
+        return self._basho_banzuke_result(j, bashoId, division)
+
+    async def basho_torikumi(self, bashoId, division: SumoDivision, day: int):
+        """ GET /api/basho/:bashoId/torikumi/:division/:day """
+        j = await self._get_json(*self._basho_torikumi_request(bashoId, division, day), endpoint='basho_torikumi')
+        return self._basho_torikumi_result(j, bashoId, division, day)
+
+    async def measurements(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiMeasurement]:
+        """ GET /api/measurements: every rikishi's measurements in a basho (or one rikishi's history) """
+        j = await self._get_json(*self._history_request('measurements', rikishiId, bashoId, sortOrder), endpoint='measurements')
+        return self._history_result(j, RikishiMeasurement, 'measurements', rikishiId, bashoId)
+
+    async def ranks(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiRank]:
+        """ GET /api/ranks: every rikishi's rank in a basho (or one rikishi's history) """
+        j = await self._get_json(*self._history_request('ranks', rikishiId, bashoId, sortOrder), endpoint='ranks')
+        return self._history_result(j, RikishiRank, 'ranks', rikishiId, bashoId)
+
+    async def shikonas(self, bashoId = None, rikishiId = None, sortOrder = None) -> list[RikishiShikona]:
+        """ GET /api/shikonas: every rikishi's shikona in a basho (or one rikishi's history) """
+        j = await self._get_json(*self._history_request('shikonas', rikishiId, bashoId, sortOrder), endpoint='shikonas')
+        return self._history_result(j, RikishiShikona, 'shikonas', rikishiId, bashoId)
+
 
 
 #GET /api/kimarite
 #GET /api/kimarite/:kimarite
 
-#GET /api/measurements
-#GET /api/ranks
-#GET /api/shikonas
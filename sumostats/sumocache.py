@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from .sumojson import SumoJSON
+
+class SumoCacheEntry:
+    """ A single cached API response """
+    def __init__(self, key, body, etag, last_modified, stored, is_fresh = False):
+        self.key: str = key
+        self.body: str = body
+        self.etag: str = etag
+        self.last_modified: str = last_modified
+        # time.time() when the response was received (or last revalidated)
+        self.stored: float = stored
+        self.is_fresh: bool = is_fresh
+
+    def fresh(self) -> bool:
+        """ True if the entry can be used without asking the server """
+        return self.is_fresh
+
+    def validators(self) -> dict[str, str]:
+        """ HTTP headers used to conditionally re-request this entry """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def json(self):
+        return SumoJSON.loads(self.body)
+
+
+class SumoResponseCache:
+    """
+    Persistent (sqlite) cache of sumo-api.com responses, keyed by URL + query parameters.
+
+    Freshness depends on the endpoint:
+      /basho/:id, /basho/:id/banzuke/*, /basho/:id/torikumi/*,
+      /ranks, /measurements, /shikonas (with a 'bashoId' parameter)
+          cached forever if received after the basho ended (the API's endDate
+          is the start of the final day: the basho counts as finished once
+          that day is over, plus a grace period for late result updates),
+          otherwise revalidated after 'live_ttl' seconds
+      /rikishi/*, /rikishis, /ranks, /measurements, /shikonas (by 'rikishiId')
+          revalidated after 'rikishi_ttl' seconds
+
+    Revalidation is a conditional GET (If-None-Match / If-Modified-Since),
+    so an unchanged response costs a '304 Not Modified' instead of a full
+    download.
+
+    Requests for things that don't exist (404 / 204 / empty responses, e.g.
+    a division without a banzuke, or the torikumi of the day after a basho)
+    are remembered in a negative cache: forever for finished basho,
+    'rikishi_ttl' seconds for rikishi lookups, and 'negative_ttl' seconds for
+    everything else (e.g. a basho in progress). The total size of cached bodies is capped at 'max_bytes', and
+    the least recently used entries are evicted first.
+
+    The cache can be shared by threads (e.g. SumoAPI.paginate()).
+    """
+    _BASHO_RE = re.compile(r'/basho/(\d{6})(/|$)')
+    _RIKISHI_RE = re.compile(r'/rikishis?(/|$)')
+    _HISTORY_RE = re.compile(r'/(ranks|measurements|shikonas)$')
+
+    # the endDate of a basho is the start of its final day (00:00 UTC)
+    _DAY = 24*60*60
+    # time after the final day for results / yusho to be settled
+    _BASHO_END_GRACE = 24*60*60
+
+    def __init__(self, path, rikishi_ttl = 24*60*60, live_ttl = 0, negative_ttl = 60*60, \
+                 max_bytes = 512*1024*1024):
+        self.path = path
+        self.rikishi_ttl = rikishi_ttl
+        self.live_ttl = live_ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self._db = None
+        self._size = -1
+        self._lock = threading.RLock()
+        self.reset_counters()
+
+    def __getstate__(self):
+        # never pickle the sqlite connection
+        state = self.__dict__.copy()
+        state['_db'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        if not 'negative_ttl' in state:
+            self.negative_ttl = 60*60
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+        self.negative_hits = 0
+        self.negative_stores = 0
+
+    def counters(self) -> dict[str, int]:
+        return { 'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated, \
+                 'stores': self.stores, 'evictions': self.evictions, \
+                 'negative_hits': self.negative_hits, 'negative_stores': self.negative_stores }
+
+    def __str__(self):
+        lookups = self.hits + self.misses
+        pct = float(self.hits) / float(lookups) if lookups > 0 else 0.0
+        return f'SumoResponseCache[{self.path}: hits={self.hits} ({pct:.2%}), misses={self.misses}, ' + \
+               f'revalidated={self.revalidated}, stores={self.stores}, evictions={self.evictions}, ' + \
+               f'negative_hits={self.negative_hits}, negative_stores={self.negative_stores}, ' + \
+               f'size={self.size()/(1024*1024):.1f}MB]'
+
+    def db(self) -> sqlite3.Connection:
+        """ Get (and lazily open) the cache database """
+        with self._lock:
+            if not self._db:
+                dirname = os.path.dirname(self.path)
+                if dirname:
+                    os.makedirs(dirname, exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS response (' \
+                                 'key TEXT PRIMARY KEY, body TEXT, etag TEXT, last_modified TEXT, ' \
+                                 'stored REAL, accessed REAL, size INTEGER)')
+                self._db.execute('CREATE INDEX IF NOT EXISTS response_accessed ON response (accessed)')
+                # end dates of each basho we've seen: decides if a basho's data can still change
+                self._db.execute('CREATE TABLE IF NOT EXISTS basho_end (bashoId TEXT PRIMARY KEY, endDate REAL)')
+                # requests known to return nothing
+                self._db.execute('CREATE TABLE IF NOT EXISTS negative (key TEXT PRIMARY KEY, status INTEGER, stored REAL)')
+                self._db.commit()
+                self._size = -1
+            return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.commit()
+                self._db.close()
+                self._db = None
+            return
+
+    def size(self) -> int:
+        """ total size (in bytes) of cached response bodies """
+        with self._lock:
+            if self._size < 0:
+                row = self.db().execute('SELECT SUM(size) FROM response').fetchone()
+                self._size = row[0] if row[0] else 0
+            return self._size
+
+    def clear(self):
+        with self._lock:
+            self.db().execute('DELETE FROM response')
+            self.db().execute('DELETE FROM basho_end')
+            self.db().execute('DELETE FROM negative')
+            self.db().commit()
+            self._size = 0
+            return
+
+    # Static method
+    def key(url, params) -> str:
+        if not params:
+            return url
+        return url + '?' + urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+
+    def lookup(self, url, params) -> SumoCacheEntry:
+        """
+        Find a cached response. The entry may be stale: check entry.fresh()
+        and revalidate using entry.validators() if it is not.
+        """
+        with self._lock:
+            key = SumoResponseCache.key(url, params)
+            row = self.db().execute('SELECT body, etag, last_modified, stored FROM response WHERE key = ?', \
+                                    (key,)).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            entry = SumoCacheEntry(key, row[0], row[1], row[2], row[3])
+            entry.is_fresh = self._fresh(url, entry.stored, params)
+            if entry.fresh():
+                self.hits += 1
+                self._touch(key)
+            else:
+                self.misses += 1
+            return entry
+
+    def revalidate(self, entry: SumoCacheEntry, url, headers = {}) -> SumoCacheEntry:
+        """ The server confirmed (304 Not Modified) a stale entry is still valid """
+        with self._lock:
+            self.revalidated += 1
+            entry.stored = time.time()
+            entry.is_fresh = True
+            if headers.get('etag'):
+                entry.etag = headers.get('etag')
+            self.db().execute('UPDATE response SET stored = ?, etag = ?, accessed = ? WHERE key = ?', \
+                              (entry.stored, entry.etag, entry.stored, entry.key))
+            self.db().commit()
+            return entry
+
+    def store(self, url, params, body: str, headers = {}):
+        """ Save a (valid, 200 OK) response """
+        with self._lock:
+            key = SumoResponseCache.key(url, params)
+            m = SumoResponseCache._BASHO_RE.search(url)
+            if m and m.group(2) == '':
+                # this is the /basho/:id response itself
+                self._set_basho_end(m.group(1), body)
+            size = len(body.encode('utf-8'))
+            if size > self.max_bytes:
+                return
+            db = self.db()
+            now = time.time()
+            # (the total before this entry is added or replaced)
+            total = self.size()
+            old = db.execute('SELECT size FROM response WHERE key = ?', (key,)).fetchone()
+            db.execute('INSERT OR REPLACE INTO response (key, body, etag, last_modified, stored, accessed, size) ' \
+                       'VALUES (?, ?, ?, ?, ?, ?, ?)', \
+                       (key, body, headers.get('etag'), headers.get('last-modified'), now, now, size))
+            self._size = total + size - (old[0] if old else 0)
+            self.stores += 1
+            db.execute('DELETE FROM negative WHERE key = ?', (key,))
+            self._evict()
+            db.commit()
+            return
+
+    def lookup_negative(self, url, params) -> bool:
+        """ True if the request is known (and still expected) to return nothing """
+        with self._lock:
+            key = SumoResponseCache.key(url, params)
+            row = self.db().execute('SELECT stored FROM negative WHERE key = ?', (key,)).fetchone()
+            if not row or not self._fresh_negative(url, row[0], params):
+                return False
+            self.negative_hits += 1
+            return True
+
+    def store_negative(self, url, params, status: int):
+        """ Remember a request that returned nothing (404, 204, empty body) """
+        with self._lock:
+            key = SumoResponseCache.key(url, params)
+            self.db().execute('INSERT OR REPLACE INTO negative (key, status, stored) VALUES (?, ?, ?)', \
+                              (key, status, time.time()))
+            self.db().commit()
+            self.negative_stores += 1
+            return
+
+    def _touch(self, key):
+        self.db().execute('UPDATE response SET accessed = ? WHERE key = ?', (time.time(), key))
+        return
+
+    def _evict(self):
+        """ drop the least recently used entries until the cache fits in max_bytes """
+        db = self.db()
+        while self._size > self.max_bytes:
+            rows = db.execute('SELECT key, size FROM response ORDER BY accessed LIMIT 64').fetchall()
+            if not rows:
+                self._size = 0
+                break
+            for key, size in rows:
+                db.execute('DELETE FROM response WHERE key = ?', (key,))
+                self._size -= size
+                self.evictions += 1
+                if self._size <= self.max_bytes:
+                    break
+        return
+
+    def _basho_end(self, bashoId: str) -> float:
+        """ time.time() at the end of the basho (None if unknown / not scheduled) """
+        row = self.db().execute('SELECT endDate FROM basho_end WHERE bashoId = ?', (bashoId,)).fetchone()
+        if not row:
+            return None
+        return row[0]
+
+    def _set_basho_end(self, bashoId: str, body: str):
+        """ remember the endDate from a /basho/:id response """
+        endDate = None
+        try:
+            j = json.loads(body)
+            if j.get('endDate'):
+                endDate = datetime.fromisoformat(j['endDate'].replace('Z', '+00:00'))
+                if not endDate.tzinfo:
+                    endDate = endDate.replace(tzinfo=timezone.utc)
+                endDate = endDate.timestamp()
+        except (ValueError, TypeError, AttributeError):
+            endDate = None
+        self.db().execute('INSERT OR REPLACE INTO basho_end (bashoId, endDate) VALUES (?, ?)', (bashoId, endDate))
+        return
+
+    def _basho_id(self, url, params = None) -> str:
+        """ the bashoId (YYYYMM) of a request for a single basho's data, or None """
+        m = SumoResponseCache._BASHO_RE.search(url)
+        if m:
+            return m.group(1)
+        if params and params.get('bashoId') and SumoResponseCache._HISTORY_RE.search(url):
+            return str(params['bashoId'])
+        return None
+
+    def _finished(self, bashoId: str, stored: float) -> bool:
+        """ True if 'stored' is after the end of the basho: its data will never change """
+        endDate = self._basho_end(bashoId)
+        if endDate is None:
+            return False
+        # endDate is the start of the final day, not its end
+        return endDate + SumoResponseCache._DAY + SumoResponseCache._BASHO_END_GRACE < stored
+
+    def _fresh_negative(self, url, stored: float, params = None) -> bool:
+        """ Check if a request that returned nothing at time 'stored' still can't return anything """
+        now = time.time()
+        bashoId = self._basho_id(url, params)
+        if bashoId and self._finished(bashoId, stored):
+            return True
+        if not bashoId and (SumoResponseCache._RIKISHI_RE.search(url) or SumoResponseCache._HISTORY_RE.search(url)):
+            return now < stored + self.rikishi_ttl
+        return now < stored + self.negative_ttl
+
+    def _fresh(self, url, stored: float, params = None) -> bool:
+        """ Check if a response received at time 'stored' can be used without revalidation """
+        now = time.time()
+        bashoId = self._basho_id(url, params)
+        if bashoId:
+            # data received after the basho ended will never change
+            if self._finished(bashoId, stored):
+                return True
+            return now < stored + self.live_ttl
+        if SumoResponseCache._RIKISHI_RE.search(url) or SumoResponseCache._HISTORY_RE.search(url):
+            return now < stored + self.rikishi_ttl
+        # unknown endpoint: always revalidate
+        return False
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+from datetime import date, datetime
+
+class SumoBashoCalendar:
+    """
+    Interned basho ids ('YYYYMM') and dates. There are only a few hundred
+    distinct basho, so every conversion is parsed / formatted once and then
+    answered with a dict lookup, in both directions:
+
+        SumoBashoCalendar.basho_date('202501')          -> date(2025, 1, 1)
+        SumoBashoCalendar.basho_id(date(2025, 1, 1))    -> '202501'
+
+    The same (canonical) date and str objects are returned every time, so
+    the many matches of a basho share a single bashoId object.
+    """
+    _EMPTY_DATE = date(1,1,1)
+    _DATE_RE = re.compile(r'(\d{4})(\d{2})(\d{2})')
+
+    # don't let unexpected input (e.g. full timestamps) grow the tables forever
+    _MAX_ENTRIES = 100000
+
+    # input string -> date
+    _dates: dict[str, date] = {}
+    # date -> canonical date object
+    _canonical: dict[date, date] = {}
+    # date -> 'YYYYMM'
+    _ids: dict[date, str] = {}
+    # iso timestamp -> datetime
+    _datetimes: dict[str, datetime] = {}
+    # date ordinal -> canonical date object
+    _ordinals: dict[int, date] = {}
+
+    # Static method
+    def basho_date(bashoId) -> date:
+        """
+        the date of a basho id string ('YYYYMM' or 'YYYYMMDD'), the empty
+        date (1-1-1) if it can't be parsed. A date is returned as its
+        canonical (interned) object.
+        """
+        if isinstance(bashoId, date):
+            return SumoBashoCalendar.canonical(bashoId)
+        d = SumoBashoCalendar._dates.get(bashoId)
+        if d is None:
+            d = SumoBashoCalendar.canonical(SumoBashoCalendar._parse(bashoId))
+            if len(SumoBashoCalendar._dates) < SumoBashoCalendar._MAX_ENTRIES:
+                SumoBashoCalendar._dates[bashoId] = d
+        return d
+
+    # Static method
+    def basho_id(bashoDate: date) -> str:
+        """ the 'YYYYMM' basho id of a date """
+        s = SumoBashoCalendar._ids.get(bashoDate)
+        if s is None:
+            s = sys.intern(f'{bashoDate.year:04}{bashoDate.month:02}')
+            if len(SumoBashoCalendar._ids) < SumoBashoCalendar._MAX_ENTRIES:
+                SumoBashoCalendar._ids[bashoDate] = s
+        return s
+
+    # Static method
+    def canonical(d: date) -> date:
+        """ the interned date object equal to 'd' """
+        c = SumoBashoCalendar._canonical.get(d)
+        if c is None:
+            c = d
+            if len(SumoBashoCalendar._canonical) < SumoBashoCalendar._MAX_ENTRIES:
+                SumoBashoCalendar._canonical[d] = d
+        return c
+
+    # Static method
+    def basho_ordinal(bashoId) -> int:
+        """ the (proleptic Gregorian) ordinal of a basho id string or date: ordinals sort like dates """
+        return SumoBashoCalendar.basho_date(bashoId).toordinal()
+
+    # Static method
+    def ordinal_date(ordinal: int) -> date:
+        """ the canonical date of an ordinal from basho_ordinal() """
+        d = SumoBashoCalendar._ordinals.get(ordinal)
+        if d is None:
+            d = SumoBashoCalendar.canonical(date.fromordinal(ordinal))
+            if len(SumoBashoCalendar._ordinals) < SumoBashoCalendar._MAX_ENTRIES:
+                SumoBashoCalendar._ordinals[ordinal] = d
+        return d
+
+    # Static method
+    def parse_datetime(datestr: str) -> datetime:
+        """ an iso timestamp (with or without a trailing 'Z') as a datetime """
+        dt = SumoBashoCalendar._datetimes.get(datestr)
+        if dt is None:
+            # older python versions don't like the 'Z' in the iso format
+            dt = datetime.fromisoformat(datestr.replace('Z', '+00:00'))
+            if len(SumoBashoCalendar._datetimes) < SumoBashoCalendar._MAX_ENTRIES:
+                SumoBashoCalendar._datetimes[datestr] = dt
+        return dt
+
+    # Static method
+    def size() -> int:
+        """ number of interned dates """
+        return len(SumoBashoCalendar._canonical)
+
+    # Static method
+    def _parse(bashoStr: str) -> date:
+        # older python versions only like YYYY-MM-DD
+        while len(bashoStr) < 8:
+            bashoStr += '01'
+        m = SumoBashoCalendar._DATE_RE.match(bashoStr)
+        if not m:
+            return SumoBashoCalendar._EMPTY_DATE
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
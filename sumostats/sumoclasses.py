@@ -1,52 +1,48 @@
 #!/usr/bin/env python3
 
 import json
-import re
+import sys
+from array import array
 from enum import Enum
 from datetime import datetime, date, MINYEAR
 from dataclasses import dataclass, field
 from dataclasses_json import dataclass_json, Undefined, config as dcjson_config
 from .sumoclassdata import _RikishiRankValue
+from .sumocalendar import SumoBashoCalendar
+from .sumolazy import SumoLazyList
 
 __EMPTY_BASHO_DATE__: date = date(1,1,1)
 
 def _decode_datetime(datestr:str) -> datetime:
     """ custom decoder for older python versions that don't like the 'Z' in for iso date format """
-    #print(f'INPUT:{datestr}')
-    return datetime.fromisoformat(datestr.replace('Z', '+00:00'))
+    return SumoBashoCalendar.parse_datetime(datestr)
 
 def _decode_date(datestr:str) -> date:
     """ custom decoder for older python versions that only like YYYY-MM-DD """
-    #print(f'INPUT:{datestr}')
-    while len(datestr) < 8:
-        datestr  += '01'
-    m = re.match(r'(\d{4})(\d{2})(\d{2})', datestr)
-    if not m:
-        return __EMPTY_BASHO_DATE__
-    return date.fromisoformat(f'{m.group(1)}-{m.group(2)}-{m.group(3)}')
+    return SumoBashoCalendar.basho_date(datestr)
 
 def BashoIdStr(bashoId: date) -> str:
-    return f'{bashoId.year:04}{bashoId.month:02}'
+    return SumoBashoCalendar.basho_id(bashoId)
 
 def BashoDate(bashoStr: str) -> date:
-    while len(bashoStr) < 8:
-        bashoStr += '01'
-    m = re.match(r'(\d{4})(\d{2})(\d{2})', bashoStr)
-    if not m:
-        return __EMPTY_BASHO_DATE__
-    return date.fromisoformat(f'{m.group(1)}-{m.group(2)}-{m.group(3)}')
-
-
-class SumoDivision(Enum):
-    Makuuchi = 'Makuuchi'
-    Juryo = 'Juryo'
-    Makushita = 'Makushita'
-    Sandanme = 'Sandanme'
-    Jonidan = 'Jonidan'
-    Jonokuchi = 'Jonokuchi'
-    MaeZumo = 'Mae-zumo'
-
-    UNKNOWN = ''
+    return SumoBashoCalendar.basho_date(bashoStr)
+
+
+class SumoOrdinalEnum(Enum):
+    """
+    Enum with a precomputed 'ordinal' on each member (its position in the
+    class, usable as an index into per-member arrays), and constant time
+    hashing, equality and (total) ordering. Subclasses call _set_ordinals()
+    once their members exist.
+    """
+    # Static method
+    def _set_ordinals(cls, order = None):
+        """ number the members of 'cls': 'order' is the comparison order (default: the ordinals) """
+        for ordinal, member in enumerate(cls):
+            member.ordinal = ordinal
+            member._order = order(ordinal) if order else ordinal
+            member._hash = hash(member.value)
+        return
 
     def __repr__(self):
         return self.value
@@ -54,110 +50,65 @@ class SumoDivision(Enum):
     def __str__(self):
         return str(self.value)
 
-    def __contains__(self, val):
-        try:
-            SumoDivision(val)
-        except ValueError:
-            return False
-        return True
-
     def __hash__(self):
-        return hash(str(self.value))
+        return self._hash
 
-    # compare divisions
     def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is type(self):
+            return False
         try:
             return self.value == other.value
-        except:
+        except AttributeError:
             pass
         return NotImplemented
     def __ne__(self, other):
-        try:
-            return self.value != other.value
-        except:
-            pass
-        return NotImplemented
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
     def __lt__(self, other):
-        try:
-            o = SumoDivision(str(other.value))
-            if o == SumoDivision.Makuuchi:
-                if self.value == SumoDivision.Makuuchi:
-                    return False
-                else:
-                    return True
-            elif o == SumoDivision.Juryo:
-                if self.value == SumoDivision.Makuuchi or \
-                        self.value == SumoDivision.Juryo:
-                    return False
-                elif self.value == SumoDivision.Makushita or \
-                     self.value == SumoDivision.Sandanme or \
-                     self.value == SumoDivision.Jonidan or \
-                     self.value == SumoDivision.Jonokuchi or \
-                     self.value == SumoDivision.MaeZumo:
-                    return True
-                else:
-                    return True
-            elif o == SumoDivision.Makushita:
-                if self.value == SumoDivision.Makuuchi or \
-                        self.value == SumoDivision.Juryo or \
-                        self.value == SumoDivision.Makushita:
-                    return False
-                elif self.value == SumoDivision.Sandanme or \
-                     self.value == SumoDivision.Jonidan or \
-                     self.value == SumoDivision.Jonokuchi or \
-                     self.value == SumoDivision.MaeZumo:
-                    return True
-                else:
-                    return True
-            elif o == SumoDivision.Sandanme:
-                if self.value == SumoDivision.Makuuchi or \
-                        self.value == SumoDivision.Juryo or \
-                        self.value == SumoDivision.Makushita or \
-                        self.value == SumoDivision.Sandanme:
-                    return False
-                elif self.value == SumoDivision.Jonidan or \
-                     self.value == SumoDivision.Jonokuchi or \
-                     self.value == SumoDivision.MaeZumo:
-                    return True
-                else:
-                    return True
-            elif o == SumoDivision.Jonidan:
-                if self.value == SumoDivision.Makuuchi or \
-                        self.value == SumoDivision.Juryo or \
-                        self.value == SumoDivision.Makushita or \
-                        self.value == SumoDivision.Sandanme or \
-                        self.value == SumoDivision.Jonidan:
-                    return False
-                elif self.value == SumoDivision.Jonokuchi or \
-                     self.value == SumoDivision.MaeZumo:
-                    return True
-                else:
-                    return True
-            elif o == SumoDivision.Jonokuchi:
-                if self.value == SumoDivision.Makuuchi or \
-                        self.value == SumoDivision.Juryo or \
-                        self.value == SumoDivision.Makushita or \
-                        self.value == SumoDivision.Sandanme or \
-                        self.value == SumoDivision.Jonidan or \
-                        self.value == SumoDivision.Jonokuchi:
-                    return False
-                elif self.value == SumoDivision.MaeZumo:
-                    return True
-                else:
-                    return True
-            else:
-                return False
-        except:
-            pass
+        if type(other) is type(self):
+            return self._order < other._order
         return NotImplemented
     def __le__(self, other):
-        return self.__lt__(other) or self.__eq__(other)
+        if type(other) is type(self):
+            return self._order <= other._order
+        return NotImplemented
     def __gt__(self, other):
-        return not self.__lt(other)
+        if type(other) is type(self):
+            return self._order > other._order
+        return NotImplemented
     def __ge__(self, other):
-        return self.__gt__(other) or self.__eq__(other)
+        if type(other) is type(self):
+            return self._order >= other._order
+        return NotImplemented
+
+class SumoDivision(SumoOrdinalEnum):
+    """
+    Divisions, from the top: a lower division compares less than a higher
+    one (UNKNOWN is the lowest). The ordinals go down the banzuke
+    (Makuuchi is 0).
+    """
+    Makuuchi = 'Makuuchi'
+    Juryo = 'Juryo'
+    Makushita = 'Makushita'
+    Sandanme = 'Sandanme'
+    Jonidan = 'Jonidan'
+    Jonokuchi = 'Jonokuchi'
+    MaeZumo = 'Mae-zumo'
+
+    UNKNOWN = ''
 
-class SumoResult(Enum):
+    def __contains__(self, val):
+        try:
+            SumoDivision(val)
+        except ValueError:
+            return False
+        return True
+
+SumoOrdinalEnum._set_ordinals(SumoDivision, order = lambda ordinal: len(SumoDivision) - ordinal)
+
+class SumoResult(SumoOrdinalEnum):
     WIN = 'win'
     LOSS = 'loss'
     ABSENT = 'absent'
@@ -167,12 +118,6 @@ class SumoResult(Enum):
 
     UNKNOWN = ''
 
-    def __repr__(self):
-        return self.value
-
-    def __str__(self):
-        return str(self.value)
-
     def __contains__(self, val):
         try:
             SumoResult(val)
@@ -180,6 +125,47 @@ class SumoResult(Enum):
             return False
         return True
 
+SumoOrdinalEnum._set_ordinals(SumoResult)
+
+class SumoInterned:
+    """
+    Base of the dataclasses holding strings which are repeated across many
+    objects (shikona, rank, kimarite): the '_INTERNED' fields are interned
+    (sys.intern) when an object is created (from_dict(), SumoDecoder or the
+    constructor) and when it's unpickled, so every object shares the one
+    copy of each distinct string instead of keeping its own.
+    """
+    _INTERNED: tuple = ()
+
+    def __post_init__(self):
+        self._intern()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._intern()
+
+    def _intern(self):
+        d = self.__dict__
+        for name in self._INTERNED:
+            s = d[name]
+            if type(s) is str:
+                d[name] = sys.intern(s)
+        return
+
+    def interned_values(self):
+        """ the values of the interned fields """
+        d = self.__dict__
+        return (d[name] for name in self._INTERNED)
+
+    # Static method
+    def saved_bytes(counts: dict) -> int:
+        """
+        memory saved by interning, given how many times each string is used
+        ({ str: count }): every use but the first would otherwise be a copy
+        (strings of 0-1 characters are shared by python anyway)
+        """
+        return sum((n - 1) * sys.getsizeof(s) for s, n in counts.items() if type(s) is str and len(s) > 1)
+
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
 class RikishiMeasurement:
@@ -202,31 +188,155 @@ class RikishiMeasurement:
     def isValid(self):
         return id != '' and height != 0.0 and weight != 0.0
 
+class SumoRank:
+    """
+    A parsed rank string, e.g. "Maegashira 12 West", "Jonidan 149 East" or
+    "Makushita 15 TD":
+        rank        the rank string
+        title       Yokozuna, Ozeki, ... Jonokuchi, Mae-zumo, Banzuke-gai ('' if unknown)
+        division    SumoDivision of the title
+        number      rank number (0 if there is none)
+        side        East, West, TD (tsukedashi), ... ('' if there is none)
+        value       rank value: the API's rankValue for the ranks in the
+                    _RikishiRankValue table, computed the same way for the
+                    ones it doesn't have (lower is better)
+        ordinal     orders ranks like the banzuke (lower is better), small
+                    enough to index an array (see ORDINALS)
+    Parse with SumoRank.parse(rankStr): every rank string is parsed once,
+    and the same (immutable) object is returned every time.
+    """
+    __slots__ = ('rank', 'title', 'division', 'number', 'side', 'value', 'ordinal')
+
+    # titles in banzuke order: (title, division, rank value of number 0)
+    _TITLES = (('Yokozuna', SumoDivision.Makuuchi, 100), ('Ozeki', SumoDivision.Makuuchi, 200), \
+               ('Sekiwake', SumoDivision.Makuuchi, 300), ('Komusubi', SumoDivision.Makuuchi, 400), \
+               ('Maegashira', SumoDivision.Makuuchi, 500), ('Juryo', SumoDivision.Juryo, 600), \
+               ('Makushita', SumoDivision.Makushita, 700), ('Sandanme', SumoDivision.Sandanme, 800), \
+               ('Jonidan', SumoDivision.Jonidan, 900), ('Jonokuchi', SumoDivision.Jonokuchi, 1000), \
+               ('Mae-zumo', SumoDivision.MaeZumo, 2000), ('Banzuke-gai', SumoDivision.UNKNOWN, 3000), \
+               ('', SumoDivision.UNKNOWN, 999999))
+    _TITLE_INDEX = { t[0]: i for i, t in enumerate(_TITLES) }
+    _SIDES = ('East', 'West', 'TD')
+    # ordinal = title index * _TITLE_SPAN + number * _NUMBER_SPAN + side index
+    _NUMBER_SPAN = len(_SIDES) + 1
+    _MAX_NUMBER = 255
+    _TITLE_SPAN = (_MAX_NUMBER + 1) * _NUMBER_SPAN
+    # size of an array indexed by ordinal
+    ORDINALS = len(_TITLES) * _TITLE_SPAN
+
+    # don't let unexpected input grow the cache forever
+    _MAX_ENTRIES = 100000
+    _ranks: dict = {}
+
+    def __init__(self, rank: str, title: str, number: int, side: str):
+        i = SumoRank._TITLE_INDEX[title]
+        _, division, base = SumoRank._TITLES[i]
+        sideIndex = SumoRank._SIDES.index(side) if side in SumoRank._SIDES else len(SumoRank._SIDES)
+        self.rank = rank
+        self.title = title
+        self.division = division
+        self.number = number
+        self.side = side
+        if rank in _RikishiRankValue:
+            self.value = _RikishiRankValue[rank]
+        elif title == '' or number == 0:
+            self.value = base
+        else:
+            self.value = base + number + (1 if side == 'East' else 2)
+        self.ordinal = i * SumoRank._TITLE_SPAN + min(number, SumoRank._MAX_NUMBER) * SumoRank._NUMBER_SPAN + sideIndex
+
+    # Static method
+    def parse(rankStr: str):
+        """ the (cached) SumoRank of a rank string """
+        r = SumoRank._ranks.get(rankStr)
+        if r is None:
+            r = SumoRank._parse(rankStr)
+            if len(SumoRank._ranks) < SumoRank._MAX_ENTRIES:
+                SumoRank._ranks[rankStr] = r
+        return r
+
+    # Static method
+    def values(ranks) -> array:
+        """ the rank values of a list of rank strings """
+        return array('i', (SumoRank.parse(r).value for r in ranks))
+
+    # Static method
+    def ordinals(ranks) -> array:
+        """ the ordinals of a list of rank strings """
+        return array('i', (SumoRank.parse(r).ordinal for r in ranks))
+
+    # Static method
+    def _parse(rankStr: str):
+        words = rankStr.split() if type(rankStr) is str else []
+        if not words or not words[0] in SumoRank._TITLE_INDEX:
+            return SumoRank(rankStr, '', 0, '')
+        number = 0
+        if len(words) > 1 and words[1].isdigit():
+            number = int(words[1])
+            words = words[:1] + words[2:]
+        return SumoRank(rankStr, words[0], number, ' '.join(words[1:]))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'ordinal'):
+            raise AttributeError(f'SumoRank is immutable')
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        return (SumoRank.parse, (self.rank,))
+
+    def __repr__(self):
+        return f'SumoRank({self.rank!r}, value={self.value}, ordinal={self.ordinal})'
+
+    def __str__(self):
+        return self.rank
+
+    def __hash__(self):
+        return hash(self.ordinal)
+
+    def __eq__(self, other):
+        if isinstance(other, SumoRank):
+            return self.ordinal == other.ordinal
+        return NotImplemented
+    def __lt__(self, other):
+        return self.ordinal < other.ordinal
+    def __le__(self, other):
+        return self.ordinal <= other.ordinal
+    def __gt__(self, other):
+        return self.ordinal > other.ordinal
+    def __ge__(self, other):
+        return self.ordinal >= other.ordinal
+
+
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
-class RikishiRank:
+class RikishiRank(SumoInterned):
     id: str = ''
     bashoId: date = field(default=__EMPTY_BASHO_DATE__, metadata=dcjson_config(decoder=_decode_date))
     rikishiId: int = -1
     rankValue: int = -1
     rank: str = ''
 
+    _INTERNED = ('rank',)
+
+    # Static method
     def RankValue(rankStr):
-        if rankStr in _RikishiRankValue:
-            return _RikishiRankValue[rankStr]
-        return _RikishiRankValue['']
+        return SumoRank.parse(rankStr).value
 
     def __post_init__(self):
+        self._intern()
         # Make sure this is always set
         if self.rankValue < 0:
-            self.rankValue = RankValue(self.rank)
+            self.rankValue = RikishiRank.RankValue(self.rank)
         return
 
     def __str__(self):
         return f'{BashoIdStr(self.bashoId)}:{self.rank}({self.rankValue})'
 
     def isValid(self):
-        return rankValue > 0
+        return self.rankValue > 0
+
+    def parsed(self) -> SumoRank:
+        return SumoRank.parse(self.rank)
 
     def __eq__(self, other):
         return self.rankValue == other.rankValue
@@ -244,13 +354,15 @@ class RikishiRank:
 
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
-class RikishiShikona:
+class RikishiShikona(SumoInterned):
     id: str = ''
     bashoId: date = field(default=__EMPTY_BASHO_DATE__, metadata=dcjson_config(decoder=_decode_date))
     rikishiId: int = -1
     shikonaEn: str = ''
     shikonaJp: str = ''
 
+    _INTERNED = ('shikonaEn', 'shikonaJp')
+
     def __str__(self):
         return f'{BashoIdStr(self.bashoId)}:{self.shikonaEn}'
 
@@ -292,15 +404,18 @@ class Rikishi:
     updatedAt: datetime = field(default=datetime(1,1,1), metadata=dcjson_config(decoder=_decode_datetime))
     createdAt: datetime = field(default=datetime(1,1,1), metadata=dcjson_config(decoder=_decode_datetime))
     intai: datetime = field(default=datetime(1,1,1), metadata=dcjson_config(decoder=_decode_datetime))
-    measurementHistory: list[RikishiMeasurement] = field(default_factory=list)
-    rankHistory: list[RikishiRank]  = field(default_factory=list)
-    shikonaHistory: list[RikishiShikona] = field(default_factory=list)
+    # the history lists are only decoded when they're used (see SumoLazyList)
+    measurementHistory: list[RikishiMeasurement] = field(default_factory=list, \
+                        metadata=dcjson_config(decoder=SumoLazyList.decoder(RikishiMeasurement)))
+    rankHistory: list[RikishiRank]  = field(default_factory=list, \
+                 metadata=dcjson_config(decoder=SumoLazyList.decoder(RikishiRank)))
+    shikonaHistory: list[RikishiShikona] = field(default_factory=list, \
+                    metadata=dcjson_config(decoder=SumoLazyList.decoder(RikishiShikona)))
 
     def __post_init__(self):
         # always make sure currentRankValue is set
         if self.currentRankValue < 0:
-            if self.currentRank in _RikishiRankValue:
-                self.currentRankValue = _RikishiRankValue[self.currentRank]
+            self.currentRankValue = SumoRank.parse(self.currentRank).value
         if self.bmi == 0.0 and self.height > 0.0:
             self.bmi = self.weight / ((self.height/100.0) * (self.height/100.0))
         return
@@ -364,7 +479,7 @@ class SpecialPrize:
 
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
-class BashoMatch:
+class BashoMatch(SumoInterned):
     bashoId: date = field(default=__EMPTY_BASHO_DATE__, metadata=dcjson_config(decoder=_decode_date))
     division: SumoDivision = SumoDivision.UNKNOWN
     day: int = -1
@@ -381,7 +496,10 @@ class BashoMatch:
     westRank: str = ''
     kimarite: str = ''
 
+    _INTERNED = ('eastShikona', 'westShikona', 'winnerEn', 'winnerJp', 'eastRank', 'westRank', 'kimarite')
+
     def __post_init__(self):
+        self._intern()
         if self.matchId == '':
             # matchId format is:
             #   [bashoId (YYYYMM)]-[day]-[matchNo - 1]-[eastId]-[westId]
@@ -396,6 +514,144 @@ class BashoMatch:
             return True
         return False
 
+class CompactBashoMatch:
+    """
+    Memory-efficient BashoMatch, used for the (very large) match table of
+    SumoData. It has the same attributes and methods as BashoMatch, but:
+      - no per-object __dict__ (__slots__)
+      - the division is kept as a small int
+      - ids and strings (shikona, rank, kimarite) are interned, so they are
+        shared by every match instead of being copied from each response
+      - the matchId string is only kept if it can't be derived from the
+        other fields
+    and it pickles as a plain tuple. Convert with CompactBashoMatch.from_match()
+    and to_match().
+    """
+    __slots__ = ('bashoId', '_division', 'day', 'matchNo', 'eastId', 'eastShikona', 'westId', 'westShikona', \
+                 'winnerId', 'winnerEn', 'winnerJp', '_matchId', 'eastRank', 'westRank', 'kimarite')
+
+    # indexed by SumoDivision.ordinal
+    _DIVISIONS = tuple(SumoDivision)
+    # shared int objects for rikishi ids
+    _IDS: dict[int, int] = {}
+
+    def __init__(self, bashoId: date = __EMPTY_BASHO_DATE__, division: SumoDivision = SumoDivision.UNKNOWN, \
+                 day: int = -1, matchNo: int = -1, eastId: int = -1, eastShikona: str = '', \
+                 westId: int = -1, westShikona: str = '', winnerId: int = -1, winnerEn: str = '', \
+                 winnerJp: str = '', matchId: str = '', eastRank: str = '', westRank: str = '', kimarite: str = ''):
+        _id = CompactBashoMatch._intern_id
+        _str = CompactBashoMatch._intern_str
+        self.bashoId = SumoBashoCalendar.canonical(bashoId) if bashoId else bashoId
+        self.division = division
+        self.day = day
+        self.matchNo = matchNo
+        self.eastId = _id(eastId)
+        self.eastShikona = _str(eastShikona)
+        self.westId = _id(westId)
+        self.westShikona = _str(westShikona)
+        self.winnerId = _id(winnerId)
+        self.winnerEn = _str(winnerEn)
+        self.winnerJp = _str(winnerJp)
+        self.eastRank = _str(eastRank)
+        self.westRank = _str(westRank)
+        self.kimarite = _str(kimarite)
+        self._matchId = None
+        self.matchId = matchId
+        return
+
+    # Static method
+    def from_match(m):
+        """ a CompactBashoMatch with the same values as a BashoMatch (or 'm' itself if it's compact) """
+        if isinstance(m, CompactBashoMatch):
+            return m
+        return CompactBashoMatch(m.bashoId, m.division, m.day, m.matchNo, m.eastId, m.eastShikona, \
+                                 m.westId, m.westShikona, m.winnerId, m.winnerEn, m.winnerJp, \
+                                 m.matchId, m.eastRank, m.westRank, m.kimarite)
+
+    def to_match(self) -> BashoMatch:
+        return BashoMatch(*self._values())
+
+    # Static method
+    def _intern_id(rikishiId):
+        return CompactBashoMatch._IDS.setdefault(rikishiId, rikishiId)
+
+    # Static method
+    def _intern_str(s):
+        return sys.intern(s) if type(s) is str else s
+
+    def interned_values(self):
+        """ the values of the interned strings (see SumoInterned) """
+        return (self.eastShikona, self.westShikona, self.winnerEn, self.winnerJp, \
+                self.eastRank, self.westRank, self.kimarite)
+
+    def _default_match_id(self) -> str:
+        # same format as BashoMatch.__post_init__()
+        return f'{BashoIdStr(self.bashoId)}-{self.day}-{self.matchNo - 1}-{self.eastId}-{self.westId}'
+
+    @property
+    def division(self) -> SumoDivision:
+        return CompactBashoMatch._DIVISIONS[self._division]
+
+    @division.setter
+    def division(self, division: SumoDivision):
+        if not isinstance(division, SumoDivision):
+            division = SumoDivision(division) if division else SumoDivision.UNKNOWN
+        self._division = division.ordinal
+
+    @property
+    def matchId(self) -> str:
+        if self._matchId is None:
+            return self._default_match_id()
+        return self._matchId
+
+    @matchId.setter
+    def matchId(self, matchId: str):
+        # only keep ids which can't be re-created from the other fields
+        self._matchId = None
+        if matchId and matchId != self._default_match_id():
+            self._matchId = matchId
+
+    def _values(self) -> tuple:
+        """ the BashoMatch field values, in order """
+        return (self.bashoId, self.division, self.day, self.matchNo, self.eastId, self.eastShikona, \
+                self.westId, self.westShikona, self.winnerId, self.winnerEn, self.winnerJp, \
+                self.matchId, self.eastRank, self.westRank, self.kimarite)
+
+    def __getstate__(self):
+        return (self.bashoId, self._division, self.day, self.matchNo, self.eastId, self.eastShikona, \
+                self.westId, self.westShikona, self.winnerId, self.winnerEn, self.winnerJp, \
+                self._matchId, self.eastRank, self.westRank, self.kimarite)
+
+    def __setstate__(self, state):
+        (self.bashoId, self._division, self.day, self.matchNo, self.eastId, self.eastShikona, \
+         self.westId, self.westShikona, self.winnerId, self.winnerEn, self.winnerJp, \
+         self._matchId, self.eastRank, self.westRank, self.kimarite) = state
+        _str = CompactBashoMatch._intern_str
+        self.eastShikona, self.westShikona = _str(self.eastShikona), _str(self.westShikona)
+        self.winnerEn, self.winnerJp = _str(self.winnerEn), _str(self.winnerJp)
+        self.eastRank, self.westRank, self.kimarite = _str(self.eastRank), _str(self.westRank), _str(self.kimarite)
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactBashoMatch, BashoMatch)):
+            return self._values() == CompactBashoMatch.from_match(other)._values()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'CompactBashoMatch(' + ', '.join(f'{k}={v!r}' for k, v in zip(BashoMatch.__dataclass_fields__, self._values())) + ')'
+
+    def isValid(self):
+        return self.bashoId.year > 1000
+
+    def upcoming(self):
+        if self.winnerId <= 0:
+            return True
+        return False
+
+    def to_dict(self, encode_json = False) -> dict:
+        return self.to_match().to_dict(encode_json=encode_json)
+
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
 class RikishiMatchup:
@@ -434,16 +690,18 @@ class BashoTorikumi(Basho):
 
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
-class BanzukeMatchRecord:
+class BanzukeMatchRecord(SumoInterned):
     opponentID: int = -1
     result: SumoResult = SumoResult.UNKNOWN
     kimarite: str = ''
     opponentShikonaEn: str = ''
     opponentShikonaJp: str = ''
 
+    _INTERNED = ('kimarite', 'opponentShikonaEn', 'opponentShikonaJp')
+
 @dataclass_json(undefined=Undefined.RAISE)
 @dataclass()
-class BanzukeRikishi:
+class BanzukeRikishi(SumoInterned):
     rikishiId: int = field(metadata=dcjson_config(field_name="rikishiID"))
     side: str = ''
     rankValue: int = -1
@@ -455,6 +713,8 @@ class BanzukeRikishi:
     shikonaEn: str = ''
     shikonaJp: str = ''
 
+    _INTERNED = ('side', 'rank', 'shikonaEn', 'shikonaJp')
+
     def desc(self):
         return f'{self.shikonaEn}({self.rikishiId})'
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+import time
+
+class SumoConcurrencyController:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on the number of
+    API requests in flight, like TCP congestion control:
+
+      - every request that completes without trouble grows the window by
+        'increase / window' (i.e. about +1 for each window's worth of requests)
+      - a throttled (429/503) or timed out request, or a response slower than
+        'spike' times the usual latency, multiplies the window by 'decrease'
+        (at most once per usual latency, so a burst of failures from the same
+        window only backs off once)
+
+    The window stays between 'min_window' and 'max_window'. Works with both
+    threads (acquire/release) and asyncio (acquire_async/release), and can be
+    shared by several API objects, e.g.:
+
+        api = SumoAPI(concurrency=SumoConcurrencyController(max_window=32))
+    """
+    def __init__(self, initial = 4, min_window = 1, max_window = 32, \
+                 increase = 1.0, decrease = 0.5, spike = 2.0, alpha = 0.1, min_samples = 10):
+        self.min_window = max(1, min_window)
+        self.max_window = max(self.min_window, max_window)
+        self.window = float(min(max(initial, self.min_window), self.max_window))
+        self.increase = increase
+        self.decrease = decrease
+        self.spike = spike
+        # weight of each new sample in the (moving average) latency
+        self.alpha = alpha
+        # latency spikes are only detected after this many samples
+        self.min_samples = min_samples
+        self.latency = None
+        self.samples = 0
+        self.inflight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ('_lock', '_cond', '_async_waiters'):
+            del state[k]
+        state['inflight'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters = []
+
+    def __str__(self):
+        latency = f'{self.latency*1000:.1f}ms' if self.latency is not None else '-'
+        return f'SumoConcurrencyController[window={self.window:.2f} ({self.min_window}-{self.max_window}), ' + \
+               f'inflight={self.inflight}, latency={latency}, increases={self.increases}, decreases={self.decreases}]'
+
+    def limit(self) -> int:
+        """ the number of requests allowed in flight right now """
+        return max(self.min_window, int(self.window))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return { 'window': round(self.window, 2), 'limit': self.limit(), 'inflight': self.inflight, \
+                     'latency': round(self.latency, 6) if self.latency is not None else None, \
+                     'increases': self.increases, 'decreases': self.decreases }
+
+    def acquire(self):
+        """ wait (blocking the thread) for a free slot """
+        with self._cond:
+            while self.inflight >= self.limit():
+                self._cond.wait()
+            self.inflight += 1
+        return
+
+    async def acquire_async(self):
+        """ wait (without blocking the event loop) for a free slot """
+        while True:
+            with self._lock:
+                if self.inflight < self.limit():
+                    self.inflight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._async_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                    # pass on a wake up we may have received
+                    self._wake()
+                raise
+
+    def release(self, latency: float = None, congested = False):
+        """
+        Free a slot, and adjust the window: 'latency' is the time the request
+        took, 'congested' means it was throttled or timed out. A request that
+        failed for other reasons should pass neither.
+        """
+        with self._lock:
+            self.inflight -= 1
+            spiked = latency is not None and self.latency is not None and \
+                     self.samples >= self.min_samples and latency > self.spike * self.latency
+            if congested or spiked:
+                now = time.monotonic()
+                if now - self._last_decrease > (self.latency or 0.0):
+                    self.window = max(float(self.min_window), self.window * self.decrease)
+                    self.decreases += 1
+                    self._last_decrease = now
+            elif latency is not None:
+                self.window = min(float(self.max_window), self.window + self.increase / self.window)
+                self.increases += 1
+            if latency is not None and not congested:
+                self.latency = latency if self.latency is None else \
+                               (1.0 - self.alpha) * self.latency + self.alpha * latency
+                self.samples += 1
+            self._wake()
+        return
+
+    def _wake(self):
+        """ wake up as many waiters as there are free slots (holding the lock) """
+        self._cond.notify_all()
+        free = self.limit() - self.inflight
+        while free > 0 and self._async_waiters:
+            waiter = self._async_waiters.pop(0)
+            if waiter.done():
+                continue
+            waiter.get_loop().call_soon_threadsafe(SumoConcurrencyController._set_waiter, waiter)
+            free -= 1
+        return
+
+    # Static method
+    def _set_waiter(waiter):
+        if not waiter.done():
+            waiter.set_result(None)
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
 from .sumoapi import *
+from .sumomatchstore import SumoMatchKey, SumoMatchStore, SumoMatchView
+from .sumotimeline import SumoTimeline
 from .version import __data_version__
 
+from array import array
+import asyncio
 from datetime import date
 from dateutil.relativedelta import *
 import pickle
@@ -11,15 +15,34 @@ import os
 import tempfile
 
 class SumoWrestler():
+    # timeline name -> (Rikishi history list, value of each entry)
+    _TIMELINES = {
+        'rank': ('rankHistory', lambda r: r.rank),
+        'rankValue': ('rankHistory', lambda r: r.rankValue),
+        'shikona': ('shikonaHistory', lambda s: s.shikonaEn),
+        'measurement': ('measurementHistory', None),
+    }
+
     def __init__(self, r: Rikishi, s: RikishiStats):
         self.rikishi: Rikishi = r
         self.stats: RikishiStats = s
 
-        # 'str' is the matchId: data can be found in the SumoData.matches
-        self.all_matches: list[str] = []
-        self.matches_by_opponent: dict[int, list[str]] = {}
+        # each 'int' is a row of the SumoData.matches store
+        self.all_matches: array = array('i')
+        self.matches_by_opponent: dict[int, array] = {}
+        # sorted history (see timeline()), rebuilt when the history changes
+        self._timelines: dict[str, SumoTimeline] = {}
         return
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_timelines', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._timelines = {}
+
     def __str__(self):
         return f'{self.shikonaEn()}({self.rikishi.id})'
 
@@ -41,41 +64,46 @@ class SumoWrestler():
     def shikonaEn(self, bashoDate:date = None):
         if not bashoDate:
             return self.rikishi.shikonaEn
-
-        bashoShikona = self.rikishi.shikonaEn
-        for shikona in sorted(self.rikishi.shikonaHistory, key=lambda s: s.bashoId):
-            if shikona.bashoId < bashoDate:
-                bashoShikona = shikona
-        return bashoShikona
+        return self.timeline('shikona').before(bashoDate, self.rikishi.shikonaEn)
 
     def rank(self, bashoId = None):
+        """ rank in a basho ('bashoId' is a basho id string or date), or the current rank """
         if not bashoId:
             return self.rikishi.currentRank
-
-        _bashoDate = BashoDate(bashoId)
-        bashoRank = self.rikishi.currentRank
-        for rank in sorted(self.rikishi.rankHistory, key=lambda r: r.bashoId):
-            if rank.bashoId < _bashoDate:
-                bashoRank = rank.rank
-        return bashoRank
+        return self.timeline('rank').before(bashoId, self.rikishi.currentRank)
 
     def rankValue(self, bashoId = None):
         if not bashoId:
             return self.rikishi.currentRankValue
+        return self.timeline('rankValue').before(bashoId, self.rikishi.currentRankValue)
 
-        _bashoDate = BashoDate(bashoId)
-        bashoRank = self.rikishi.currentRankValue
-        for rank in sorted(self.rikishi.rankHistory, key=lambda r: r.bashoId):
-            if rank.bashoId < _bashoDate:
-                bashoRank = rank.rankValue
-        return bashoRank
+    def measurement(self, bashoId = None) -> RikishiMeasurement:
+        """ the measurement taken before a basho, or the latest one (None if there is none) """
+        if not bashoId:
+            return self.timeline('measurement').latest()
+        return self.timeline('measurement').before(bashoId)
+
+    def timeline(self, name) -> SumoTimeline:
+        """ the sorted 'rank', 'rankValue', 'shikona' or 'measurement' history """
+        history, value = SumoWrestler._TIMELINES[name]
+        history = getattr(self.rikishi, history)
+        t = self._timelines.get(name)
+        if t is None or not t.is_current(history):
+            t = SumoTimeline(history, value)
+            self._timelines[name] = t
+        return t
+
+    def invalidate_timelines(self):
+        """ forget the sorted history (call after changing a history entry in place) """
+        self._timelines = {}
+        return
 
     def get_rank_history(self) -> list[RikishiRank]:
         return sorted(self.rikishi.rankHistory)
 
     def each_match(self, data):
-        for mstr in self.all_matches:
-            yield data.get_match(mstr)
+        for row in self.all_matches:
+            yield data.matches.view(row)
 
 
 class SumoMatchup():
@@ -86,8 +114,11 @@ class SumoMatchup():
         self.last_meeting = date(1,1,1)
 
         self._overall = RikishiMatchup()
-        self._by_division: dict[SumoDivision, RikishiMatchup] = {}
+        # indexed by SumoDivision.ordinal
+        self._by_division: list[RikishiMatchup] = [None] * len(SumoDivision)
         self._by_rank: dict[str, RikishiMatchup] = {}
+        # all matches, most recent first (see each_match())
+        self._newest_first: list[SumoMatchView] = None
 
         if not opponent.id() in self.rikishi.matches_by_opponent:
             return
@@ -96,21 +127,19 @@ class SumoMatchup():
 
         overall = self._overall
 
-        # map each matchId string to a BashoMatch object and collect them into a list
-        all_matches = list(map(lambda m: data.matches.get(m), matchlist))
+        # map each row of the match store to a (BashoMatch-like) view
+        all_matches = list(map(data.matches.view, matchlist))
 
         for m in all_matches:
-            if not m:
-                continue
             # keep track of first and last meeting dates (basho)
             if m.bashoId < self.first_meeting:
                 self.first_meeting = m.bashoId
             if m.bashoId > self.last_meeting:
                 self.last_meeting = m.bashoId
 
-            if not m.division in self._by_division:
-                self._by_division[m.division] = RikishiMatchup()
-            division = self._by_division[m.division]
+            division = self._by_division[m.division.ordinal]
+            if not division:
+                division = self._by_division[m.division.ordinal] = RikishiMatchup()
 
             rank = ''
             if m.eastId == rikishi.id():
@@ -151,13 +180,15 @@ class SumoMatchup():
         return self._overall
 
     def matchup_by_division(self, division:SumoDivision) -> RikishiMatchup:
-        if not division in self._by_division:
+        matchup = self._by_division[SumoDivision(division).ordinal]
+        if not matchup:
             return RikishiMatchup()
-        return self._by_division[division]
+        return matchup
 
     def each_division(self):
-        for matchup in self._by_division.items():
-            yield matchup[0], matchup[1]
+        for division, matchup in zip(SumoDivision, self._by_division):
+            if matchup:
+                yield division, matchup
 
     def matchup_by_rank(self, rank:str) -> RikishiMatchup:
         if not rank in self._by_rank:
@@ -172,17 +203,24 @@ class SumoMatchup():
         """
         Generator to iterate over each match the rikishi and opponent have fought.
         You can filter the matches to iterate over using the
-        'beforeBasho', 'in_division', and 'at_rank' parameters
+        'beforeBasho' (a date or basho id string), 'in_division', and
+        'at_rank' parameters
         """
         # Allow ranks to be passed as strings or ints
         rankVal = -1
-        if at_rank and is_instance(at_rank, str):
+        if at_rank and isinstance(at_rank, str):
             rankVal = RikishiRank.RankValue(at_rank)
         elif at_rank:
             rankVal = int(at_rank)
+        if beforeBasho:
+            beforeBasho = BashoDate(beforeBasho)
+
+        # the matches don't change: sort them once
+        if self._newest_first is None:
+            self._newest_first = sorted(self._overall.matches, key=lambda m: m.bashoId, reverse=True)
 
         # run through all matches, and filter/yield based on the input
-        for match in sorted(self._overall.matches, key=lambda m: m.bashoId, reverse=True):
+        for match in self._newest_first:
             # set this to false if a one of the inputs would 
             # filter out the current match
             should_yield = True
@@ -499,13 +537,81 @@ class SumoData:
     """ Build a database of sumo wrestlers and match data """
 
     _VERBOSE = 0
+    # compare each locally derived matches_by_opponent list with the API's
+    # per-opponent match list (one extra request per opponent)
+    _VERIFY_OPPONENT_MATCHES = False
 
-    def __init__(self):
-        self.api = SumoAPI()
+    def __init__(self, api: SumoAPI = None):
+        self.api = api if api else SumoAPI()
         self.rikishi: dict[int, SumoWrestler] = {}
         self.basho: dict[date, SumoTournament] = {}
-        self.matches: dict[str, BashoMatch] = {}
+        self.matches: SumoMatchStore = SumoMatchStore()
         self.version: str = __data_version__
+        # rikishiIds whose all_matches list was downloaded by this object
+        self._matches_fetched: set[int] = set()
+        # rikishiIds whose all_matches list disagreed with the API (see _verify_opponent_matches)
+        self._matches_stale: set[int] = set()
+        # profiles loaded by prefetch_rikishi() for wrestlers not (yet) in the table
+        self._rikishi_profiles: dict[int, Rikishi] = {}
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __getstate__(self):
+        # the API object (and its HTTP connections) is not part of the saved data
+        state = self.__dict__.copy()
+        del state['api']
+        state.pop('_matches_fetched', None)
+        state.pop('_matches_stale', None)
+        state.pop('_rikishi_profiles', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if not 'api' in state:
+            self.api = SumoAPI()
+        # match lists saved in a previous run may be missing recent bouts
+        self._matches_fetched = set()
+        self._matches_stale = set()
+        self._rikishi_profiles = {}
+        self._compact_matches()
+
+    def _compact_matches(self):
+        """
+        convert the match table of older versions (a { matchId: match } dict,
+        with matchId lists in each wrestler) into a SumoMatchStore, and replace
+        their BashoMatch objects with CompactBashoMatch
+        """
+        if isinstance(self.matches, dict):
+            store = SumoMatchStore()
+            for m in self.matches.values():
+                store.add(m)
+            self.matches = store
+            for w in self.rikishi.values():
+                w.all_matches = store.rows(w.all_matches)
+                w.matches_by_opponent = { opponentId: store.rows(matchIds) \
+                                          for opponentId, matchIds in w.matches_by_opponent.items() }
+        # the same match may be in a torikumi and a banzuke
+        compact = {}
+        def _compact(m):
+            if not isinstance(m, BashoMatch):
+                return m
+            if not id(m) in compact:
+                compact[id(m)] = CompactBashoMatch.from_match(m)
+            return compact[id(m)]
+        for t in self.basho.values():
+            for torikumi in t.torikumi_by_day.values():
+                for matches in torikumi.values():
+                    matches[:] = map(_compact, matches)
+            for banzuke in t.banzuke.values():
+                for r in banzuke.rikishi.values():
+                    for day, m in r.match_on_day.items():
+                        r.match_on_day[day] = _compact(m)
         return
 
     """
@@ -528,6 +634,19 @@ class SumoData:
             raise Exception(f'Saved data version {table.version} is not compatible with this version {__data_version__}')
         return table
 
+    def set_api(self, api: SumoAPI):
+        """ Replace the API object used to fetch data (closes the previous one) """
+        if self.api and self.api is not api:
+            self.api.close()
+        self.api = api
+        return
+
+    def close(self):
+        """ Release any network resources held by the API object """
+        if self.api:
+            self.api.close()
+        return
+
     def save_data(self, path):
         """ Save SumoData instance to a file """
 
@@ -543,10 +662,46 @@ class SumoData:
             raise
         return
 
-    def print_table_stats(self):
-        print(f'SumoData[rikishi={len(self.rikishi.values())}, basho={len(self.basho.values())}, matches={len(self.matches.values())}]')
+    def print_table_stats(self, api_stats = False):
+        print(f'SumoData[rikishi={len(self.rikishi.values())}, basho={len(self.basho.values())}, matches={len(self.matches)}]')
+        counts = self.string_counts()
+        print(f'Interned strings: {len(counts)} distinct, {sum(counts.values())} uses, ' + \
+              f'{SumoInterned.saved_bytes(counts)/(1024*1024):.1f} MB saved')
+        if api_stats and self.api:
+            # where the time went while fetching data from the API
+            print(self.api.metrics)
         return
 
+    def string_counts(self) -> dict[str, int]:
+        """
+        how many times each interned string (shikona, rank, kimarite, see
+        SumoInterned) is used by the tables: { str: count }
+        """
+        counts: dict[str, int] = {}
+        def _count(values):
+            for s in values:
+                counts[s] = counts.get(s, 0) + 1
+        self.matches.count_strings(counts)
+        for t in self.basho.values():
+            # (the banzuke records share the torikumi matches)
+            for torikumi in t.torikumi_by_day.values():
+                for matches in torikumi.values():
+                    for m in matches:
+                        _count(m.interned_values())
+            for banzuke in t.banzuke.values():
+                for r in banzuke.rikishi.values():
+                    _count((r.rank, r.side))
+                    for record in r.match_record:
+                        _count(record.interned_values())
+        for w in self.rikishi.values():
+            # undecoded histories don't hold any strings yet
+            for history in (w.rikishi.rankHistory, w.rikishi.shikonaHistory):
+                if isinstance(history, SumoLazyList) and not history.decoded():
+                    continue
+                for h in history:
+                    _count(h.interned_values())
+        return counts
+
     def get_basho(self, bashoStr, division: [SumoDivision] = [], fetch=False) -> SumoTournament:
         d = BashoDate(bashoStr)
         if fetch:
@@ -555,10 +710,26 @@ class SumoData:
             return None
         return self.basho[d]
 
-    def get_match(self, matchStr) -> BashoMatch:
-        if not matchStr in self.matches:
-            return None
-        return self.matches[matchStr]
+    def get_match(self, matchStr) -> SumoMatchView:
+        """ a match by matchId string or SumoMatchKey """
+        return self.matches.get(matchStr)
+
+    def select_matches(self, rikishiId, opponentId = None, division: SumoDivision = None, \
+                       before = None, since = None) -> list[SumoMatchView]:
+        """
+        A wrestler's matches (optionally vs. an opponent, in a division, before
+        and/or since a basho), e.g. all of Hoshoryu's Makuuchi bouts before 2025:
+            data.select_matches(hoshoryu.id(), division=SumoDivision.Makuuchi, before='202501')
+        """
+        w = self.get_rikishi(rikishiId)
+        if not w:
+            return []
+        rows = w.all_matches
+        if opponentId is not None:
+            rows = w.matches_by_opponent.get(opponentId, rows)
+        rows = self.matches.select(rows, rikishiId=rikishiId, opponentId=opponentId, \
+                                   division=division, before=before, since=since)
+        return list(map(self.matches.view, rows))
 
     def get_rikishi(self, rikishiId) -> SumoWrestler:
         if not rikishiId in self.rikishi:
@@ -594,11 +765,11 @@ class SumoData:
         Returns a pair: list[SumoBanzukeRikishi], SumoDivision
         """
         if not rikishiId in self.rikishi:
-            return [], SumoDivision.Unknown
+            return [], SumoDivision.UNKNOWN
 
         bashoDate = BashoDate(bashoStr)
         if not bashoDate in self.basho:
-            return [], SumoDivision.Unknown
+            return [], SumoDivision.UNKNOWN
 
         return self.basho[bashoDate].get_rikishi_record(rikishiId)
 
@@ -618,7 +789,8 @@ class SumoData:
             lastDate = startDate + relativedelta(years=1)
         basho = None
         while True:
-            basho = self.api.basho(BashoIdStr(bashoDate))
+            # a failed request is reported, and the month skipped
+            basho = self._query_basho(bashoDate)
             if (basho and basho.isValid()) or bashoDate > lastDate:
                 break
             bashoDate = bashoDate + relativedelta(months=1)
@@ -634,7 +806,7 @@ class SumoData:
         Update information in the table with date pulled fresh from the API data source.
         This is most useful for in-progress tournaments.
         """
-        basho = self.api.basho(BashoIdStr(bashoDate))
+        basho = self._query_basho(bashoDate)
         if not basho or not basho.isValid():
             sys.stderr.write(f'Error when querying basho:{bashoDate}\n')
             return
@@ -650,7 +822,7 @@ class SumoData:
         bashoDate = startDate.replace(day=1)
         basho = None
         while True:
-            basho = self.api.basho(BashoIdStr(bashoDate))
+            basho = self._query_basho(bashoDate)
             if (basho and basho.isValid()) or bashoDate > endDate:
                 break
             bashoDate = bashoDate + relativedelta(months=1)
@@ -670,9 +842,84 @@ class SumoData:
             # tournaments are held every 2 months, but let's increment by one
             # month just in case things got offset
             bashoDate = bashoDate + relativedelta(months=1)
-            basho = self.api.basho(BashoIdStr(bashoDate))
+            basho = self._query_basho(bashoDate)
+        return
+
+    async def update_basho_async(self, bashoDate: date, division: [SumoDivision] = [], concurrency = 8):
+        """
+        asyncio version of update_basho(): banzuke, torikumi and wrestler
+        data are fetched with up to 'concurrency' requests in flight.
+        """
+        async with AsyncSumoAPI.from_api(self.api, max_concurrency=concurrency) as api:
+            basho = None
+            try:
+                basho = await api.basho(BashoIdStr(bashoDate))
+            except SumoAPIError as e:
+                sys.stderr.write(f'ERROR: could not query basho:{BashoIdStr(bashoDate)}: {e}\n')
+            if not basho or not basho.isValid():
+                sys.stderr.write(f'Error when querying basho:{bashoDate}\n')
+                return
+            await self._add_basho_async(api, basho, division, forceUpdate=True)
+        return
+
+    async def add_basho_by_date_range_async(self, startDate: date, endDate: date, division: [SumoDivision] = [], concurrency = 8):
+        """
+        asyncio version of add_basho_by_date_range(): each basho is added
+        with up to 'concurrency' API requests in flight.
+        """
+        # sanity check the dates
+        if endDate < startDate:
+            raise Exception('endDate:{endDate} must be later than startDate:{startDate}')
+
+        async with AsyncSumoAPI.from_api(self.api, max_concurrency=concurrency) as api:
+            # query every month in the range at once: basho that don't exist come back as None
+            bashoDate = startDate.replace(day=1)
+            dates = []
+            while bashoDate < endDate:
+                dates.append(bashoDate)
+                bashoDate = bashoDate + relativedelta(months=1)
+            basho_list = await asyncio.gather(*[api.basho(BashoIdStr(d)) for d in dates], return_exceptions=True)
+            for d, b in zip(dates, basho_list):
+                if isinstance(b, SumoAPIError):
+                    sys.stderr.write(f'ERROR: could not query basho:{BashoIdStr(d)}: {b}\n')
+                elif isinstance(b, BaseException):
+                    raise b
+            basho_list = [b for b in basho_list if b and not isinstance(b, BaseException) and b.isValid()]
+            if len(basho_list) == 0:
+                sys.stderr.write(f'Could not find a basho between {startDate} and {endDate}\n')
+                return
+
+            for basho in basho_list:
+                await self._add_basho_async(api, basho, division)
         return
 
+    def prefetch_rikishi(self) -> int:
+        """
+        Load the profile (with measurement, rank and shikona history) of every
+        active and retired rikishi with a few paged /rikishis requests. Wrestlers
+        found later in a banzuke or torikumi are added without a profile request
+        of their own, and wrestlers already in the table get a fresh profile.
+        Returns the number of profiles loaded.
+        """
+        try:
+            profiles = self.api.rikishis(limit=1000, retired=True, all_pages=True, \
+                                         measurements=True, ranks=True, shikonas=True)
+        except SumoAPIError as e:
+            sys.stderr.write(f'WARNING: could not prefetch rikishi profiles: {e}\n')
+            return 0
+        return self._set_rikishi_profiles(profiles)
+
+    async def prefetch_rikishi_async(self, concurrency = 8) -> int:
+        """ asyncio version of prefetch_rikishi(): all pages are requested at once """
+        async with AsyncSumoAPI.from_api(self.api, max_concurrency=concurrency) as api:
+            try:
+                profiles = await api.rikishis(limit=1000, retired=True, all_pages=True, \
+                                              measurements=True, ranks=True, shikonas=True)
+            except SumoAPIError as e:
+                sys.stderr.write(f'WARNING: could not prefetch rikishi profiles: {e}\n')
+                return 0
+        return self._set_rikishi_profiles(profiles)
+
     """
     Iteration Methods
 
@@ -696,9 +943,27 @@ class SumoData:
 
     """
 
-    def _add_basho(self, b: Basho, division: [SumoDivision], forceUpdate = False):
+    def _query_basho(self, bashoDate: date) -> Basho:
+        """ query basho info, reporting (and skipping) a failed request """
+        try:
+            return self.api.basho(BashoIdStr(bashoDate))
+        except SumoAPIError as e:
+            sys.stderr.write(f'ERROR: could not query basho:{BashoIdStr(bashoDate)}: {e}\n')
+        return None
+
+    def _basho_divisions(self, division: [SumoDivision]) -> list[SumoDivision]:
+        """ the list of divisions to query for a basho """
+        if len(division) == 0:
+            return [div for div in (SumoDivision) if div != SumoDivision.UNKNOWN]
+        return list(division)
+
+    def _tournament_for_update(self, b: Basho, division: [SumoDivision], forceUpdate = False) -> SumoTournament:
+        """
+        Find (or create) the SumoTournament object for a basho that needs to be
+        added or updated. Returns None if the table already has the basho.
+        """
         if not b or not b.isValid():
-            return
+            return None
 
         tournament = None
         if b.bashoDate in self.basho:
@@ -722,36 +987,146 @@ class SumoData:
                 else:
                     sys.stderr.write(f' Skip SumoTournament: {b.id_str()}\r')
                     sys.stderr.flush()
-                return
+                return None
 
             tournament.basho = b
         else:
             sys.stdout.write(f'\nAdd New SumoTournament: {b.id_str()}\n')
             # Add this basho to our table as a set of Tournament objects
             tournament = SumoTournament(b)
+        return tournament
+
+    def _add_basho(self, b: Basho, division: [SumoDivision], forceUpdate = False):
+        tournament = self._tournament_for_update(b, division, forceUpdate)
+        if not tournament:
+            return
 
         # retrieve the set of banzuke for this basho
-        if len(division) == 0:
-            for div in (SumoDivision):
-                if div != SumoDivision.UNKNOWN:
-                    self._add_banzuke(tournament, div, forceUpdate)
-        else:
-            for div in division:
+        for div in self._basho_divisions(division):
+            try:
                 self._add_banzuke(tournament, div, forceUpdate)
+            except SumoAPIError as e:
+                self._banzuke_failed(tournament, div, e)
+
+        # bring every wrestler's rank/measurement/shikona history up to date
+        self._hydrate_history(tournament)
 
         # add the tournament to our table
         self.basho[b.bashoDate] = tournament
         return
 
-    def _add_banzuke(self, tournament: SumoTournament, division: SumoDivision, forceUpdate = False):
-        sys.stdout.write(f'Query Banzuke for {division} (in {tournament.id_str()})\n')
-        # Use the API to grab banzuke info
-        banzuke = self.api.basho_banzuke(tournament.id_str(), division)
-        if not banzuke:
-            if SumoData._VERBOSE > 1:
-                sys.stderr.write(f'    ERROR: No {division} banzuke found for basho:{tournament.id_str()}')
+    async def _add_basho_async(self, api: AsyncSumoAPI, b: Basho, division: [SumoDivision], forceUpdate = False):
+        tournament = self._tournament_for_update(b, division, forceUpdate)
+        if not tournament:
+            return
+
+        # retrieve the set of banzuke for this basho, all divisions at once
+        divisions = self._basho_divisions(division)
+        banzuke_list = await asyncio.gather(*[api.basho_banzuke(tournament.id_str(), div) for div in divisions], \
+                                            return_exceptions=True)
+        for div, banzuke in zip(divisions, banzuke_list):
+            try:
+                if isinstance(banzuke, BaseException):
+                    raise banzuke
+                await self._add_banzuke_async(api, tournament, div, banzuke, forceUpdate)
+            except SumoAPIError as e:
+                self._banzuke_failed(tournament, div, e)
+
+        # bring every wrestler's rank/measurement/shikona history up to date
+        await self._hydrate_history_async(api, tournament)
+
+        # add the tournament to our table
+        self.basho[b.bashoDate] = tournament
+        return
+
+    def _hydrate_history(self, tournament: SumoTournament):
+        """
+        Add a basho's rank, measurement and shikona entries to the history of
+        every wrestler we know, with one bulk request for each type of history
+        (instead of re-fetching every wrestler's profile)
+        """
+        try:
+            ranks = self.api.ranks(bashoId=tournament.id_str())
+            measurements = self.api.measurements(bashoId=tournament.id_str())
+            shikonas = self.api.shikonas(bashoId=tournament.id_str())
+        except SumoAPIError as e:
+            sys.stderr.write(f'WARNING: could not update rikishi history for basho:{tournament.id_str()}: {e}\n')
             return
+        self._set_history(ranks, measurements, shikonas)
+        return
+
+    async def _hydrate_history_async(self, api: AsyncSumoAPI, tournament: SumoTournament):
+        try:
+            ranks, measurements, shikonas = await SumoData._gather( \
+                    api.ranks(bashoId=tournament.id_str()), \
+                    api.measurements(bashoId=tournament.id_str()), \
+                    api.shikonas(bashoId=tournament.id_str()))
+        except SumoAPIError as e:
+            sys.stderr.write(f'WARNING: could not update rikishi history for basho:{tournament.id_str()}: {e}\n')
+            return
+        self._set_history(ranks, measurements, shikonas)
+        return
+
+    def _set_history(self, ranks: list[RikishiRank], measurements: list[RikishiMeasurement], \
+                     shikonas: list[RikishiShikona]):
+        """ merge bulk history entries into each (known) wrestler's history """
+        updated = 0
+        for name, entries in (('rankHistory', ranks), ('measurementHistory', measurements), \
+                              ('shikonaHistory', shikonas)):
+            for entry in entries:
+                w = self.get_rikishi(entry.rikishiId)
+                if not w:
+                    continue
+                SumoData._merge_history(getattr(w.rikishi, name), entry)
+                w.invalidate_timelines()
+                updated += 1
+        if SumoData._VERBOSE > 1:
+            sys.stderr.write(f'    Updated {updated} rikishi history entries\n')
+        return
+
+    # Static method
+    def _merge_history(history: list, entry):
+        """ add (or replace) a single basho's entry in a rank/measurement/shikona history list """
+        key = entry.id if entry.id else entry.bashoId
+        for i, h in enumerate(history):
+            if (h.id if h.id else h.bashoId) == key:
+                history[i] = entry
+                return
+        history.append(entry)
+        return
 
+    def _banzuke_failed(self, tournament: SumoTournament, division: SumoDivision, error: SumoAPIError):
+        """
+        An API request failed while adding a division's banzuke: make sure the
+        division is not saved with partial or empty data. The tournament will
+        be 'missing' the division, so it is fetched again on the next update.
+        """
+        sys.stderr.write(f'ERROR: could not load {division} banzuke for basho:{tournament.id_str()}: {error}\n')
+        if SumoDivision(division) in tournament.banzuke:
+            del tournament.banzuke[SumoDivision(division)]
+        for torikumi in tournament.torikumi_by_day.values():
+            torikumi.pop(division, None)
+        tournament.torikumi_by_division.pop(division, None)
+        return
+
+    # Static method
+    async def _gather(*aws):
+        """
+        asyncio.gather() that waits for every awaitable to finish before
+        raising the first exception (so no request is left running)
+        """
+        results = await asyncio.gather(*aws, return_exceptions=True)
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+        return results
+
+    def _set_banzuke(self, tournament: SumoTournament, division: SumoDivision, banzuke: Banzuke, \
+                     forceUpdate = False, rikishi_matches = None) -> int:
+        """
+        Add a banzuke (and each rikishi's banzuke record) to a tournament.
+        Returns the number of torikumi days to query.
+        """
         # Updates will just replace the banzuke
         tournament.banzuke[SumoDivision(division)] = SumoBanzuke(banzuke)
 
@@ -759,27 +1134,25 @@ class SumoData:
         max_days = 1
 
         # iterate over banzuke Rikishi
-        if banzuke.east:
-            for rikishi in banzuke.east:
-                self._add_rikishi_banzuke_record(rikishi, tournament, forceUpdate)
-                if max_days < len(rikishi.record):
-                    max_days = len(rikishi.record) + 1 # try to also grab the _next_ day
-                #bouts = rikishi.wins + rikishi.losses + rikishi.absences
-                #if bouts > max_days:
-                #    max_days = bouts
-        #else:
-        #    sys.stderr.write(f'WARNING: No east side in banzuke:{banzuke}\n')
-
-        if banzuke.west:
-            for rikishi in banzuke.west:
-                self._add_rikishi_banzuke_record(rikishi, tournament, forceUpdate)
-                if max_days < len(rikishi.record):
-                    max_days = len(rikishi.record) + 1 # try to also grab the _next_ day
-                #bouts = rikishi.wins + rikishi.losses + rikishi.absences
-                #if bouts > max_days:
-                #    max_days = bouts
-        #else:
-        #    sys.stderr.write(f'No west side in banzuke:{banzuke}\n')
+        for rikishi in banzuke.east + banzuke.west:
+            self._add_rikishi_banzuke_record(rikishi, tournament, forceUpdate, rikishi_matches)
+            if max_days < len(rikishi.record):
+                max_days = len(rikishi.record) + 1 # try to also grab the _next_ day
+            #bouts = rikishi.wins + rikishi.losses + rikishi.absences
+            #if bouts > max_days:
+            #    max_days = bouts
+        return max_days
+
+    def _add_banzuke(self, tournament: SumoTournament, division: SumoDivision, forceUpdate = False):
+        sys.stdout.write(f'Query Banzuke for {division} (in {tournament.id_str()})\n')
+        # Use the API to grab banzuke info
+        banzuke = self.api.basho_banzuke(tournament.id_str(), division)
+        if not banzuke:
+            if SumoData._VERBOSE > 1:
+                sys.stderr.write(f'    ERROR: No {division} banzuke found for basho:{tournament.id_str()}')
+            return
+
+        max_days = self._set_banzuke(tournament, division, banzuke, forceUpdate)
 
         # For each day of the tournament, add the torikumi
         for day in range(1, max_days+1):
@@ -788,7 +1161,52 @@ class SumoData:
 
         return
 
-    def _add_rikishi_banzuke_record(self, r: BanzukeRikishi, tournament: SumoTournament, force_update=False):
+    async def _add_banzuke_async(self, api: AsyncSumoAPI, tournament: SumoTournament, division: SumoDivision, \
+                                 banzuke: Banzuke, forceUpdate = False):
+        sys.stdout.write(f'Query Banzuke for {division} (in {tournament.id_str()})\n')
+        if not banzuke:
+            if SumoData._VERBOSE > 1:
+                sys.stderr.write(f'    ERROR: No {division} banzuke found for basho:{tournament.id_str()}')
+            return
+
+        # fetch every wrestler (and opponent) we haven't seen yet, concurrently
+        rikishi = {}
+        for r in banzuke.east + banzuke.west:
+            rikishi[r.rikishiId] = r.shikonaEn
+            for record in r.record:
+                rikishi[record.opponentID] = record.opponentShikonaEn
+        await self._add_rikishi_list_async(api, rikishi)
+
+        # re-fetch the (stale) match lists of wrestlers loaded from a previous run, concurrently
+        stale = [r.rikishiId for r in banzuke.east + banzuke.west if self._stale_matches(r, forceUpdate)]
+        stale = list(dict.fromkeys(stale))
+        matchlists = await SumoData._gather(*[self._fetch_matches_async(api, rId) for rId in stale])
+        rikishi_matches = dict(zip(stale, matchlists))
+
+        max_days = self._set_banzuke(tournament, division, banzuke, forceUpdate, rikishi_matches)
+
+        # fetch every day of the tournament at once, then add each torikumi in order
+        days = range(1, max_days+1)
+        torikumi_list = await SumoData._gather(*[api.basho_torikumi(tournament.id_str(), division, day) for day in days])
+        rikishi = {}
+        for torikumi in torikumi_list:
+            if torikumi:
+                for match in torikumi.torikumi:
+                    rikishi[match.eastId] = match.eastShikona
+                    rikishi[match.westId] = match.westShikona
+        await self._add_rikishi_list_async(api, rikishi)
+        for day, torikumi in zip(days, torikumi_list):
+            self._set_torikumi(tournament, division, day, torikumi)
+        sys.stdout.write('\n')
+
+        return
+
+    def _add_rikishi_banzuke_record(self, r: BanzukeRikishi, tournament: SumoTournament, force_update=False, \
+                                    rikishi_matches = None):
+        """
+        Add a wrestler's banzuke record to the tournament. The 'rikishi_matches'
+        dict can supply already fetched match lists (keyed by rikishiId)
+        """
         # Check if we've seen this wrestler before
         if not r.rikishiId in self.rikishi:
             if not self._add_rikishi(r.rikishiId, r.shikonaEn, r.desc()):
@@ -802,118 +1220,241 @@ class SumoData:
 
         w = self.rikishi[r.rikishiId]
 
+        # Add the opponents if we haven't seen them before
+        for record in r.record:
+            if not record.opponentID in self.rikishi:
+                if not self._add_rikishi(record.opponentID, record.opponentShikonaEn, f'{record.opponentShikonaEn}({record.opponentID})'):
+                    sys.stderr.write(f'ERROR: Could not add opponent ({record.opponentShikonaEn}[{record.opponentID}]) of {r.desc()}\n')
+
         #
         # Update the rikishi record with bouts-by-opponent
         # (if we don't already have it)
         #
+        if not any(record.opponentID > 0 and (force_update or not record.opponentID in w.matches_by_opponent) \
+                   for record in r.record):
+            return
+
+        # every bout vs. every opponent is already in "all_matches" (from the
+        # _add_rikishi() call above): only a wrestler loaded from a previous
+        # run needs their match list refreshed
+        if self._stale_matches(r, force_update):
+            if rikishi_matches is not None and r.rikishiId in rikishi_matches:
+                matchlist = rikishi_matches.pop(r.rikishiId)
+            else:
+                matchlist = self._fetch_matches(r.rikishiId)
+            self._set_rikishi_matches(r.rikishiId, matchlist)
+
+        w.matches_by_opponent = self._index_matches(r.rikishiId)
         for record in r.record:
-            # Add the opponent if we haven't seen them before
-            if not record.opponentID in self.rikishi:
-                if not self._add_rikishi(record.opponentID, record.opponentShikonaEn, f'{record.opponentShikonaEn}({record.opponentID})'):
-                    sys.stderr.write(f'ERROR: Could not add opponent ({record.opponentShikonaEn}[{record.opponentID}]) of {r.desc()}\n')
-            # Add this wrestler's record vs. the opponent
-            if record.opponentID > 0 and (force_update or not record.opponentID in w.matches_by_opponent):
-                w.matches_by_opponent[record.opponentID] = []
-                skip = 0
-                limit = 1000
-                while True:
-                    matches, matchup = self.api.rikishi_matches(r.rikishiId, opponentId = record.opponentID, limit = limit, skip = skip)
-                    for m in matches:
-                        # assume the match is already in the "all_matches" list
-                        # (from the _add_rikishi() call above)
-                        # and just keep track of the matchId here
-                        w.matches_by_opponent[record.opponentID].append(m.matchId)
-                    sys.stdout.write(f'    Adding wrestler:{r.desc()} +{len(matches)} matches vs. {record.opponentID}{" "*40}\r')
-                    if len(matches) < limit:
-                        break;
-                    skip += limit
+            if record.opponentID > 0 and not record.opponentID in w.matches_by_opponent:
+                # no bouts vs. this opponent in the API's match list
+                w.matches_by_opponent[record.opponentID] = array('i')
+            if SumoData._VERIFY_OPPONENT_MATCHES and record.opponentID > 0:
+                self._verify_opponent_matches(r.rikishiId, record.opponentID)
+        sys.stdout.write(f'    Adding wrestler:{r.desc()} {len(w.matches_by_opponent)} opponents{" "*40}\r')
 
         return
 
-    def _add_rikishi(self, rikishiId, shikonaEn, desc):
-        # Create the SumoWrestler object
-        # find the wrestler
-        rikishi = self.api.rikishi(rikishiId, measurements=True, ranks=True, shikonas=True)
+    def _stale_matches(self, r: BanzukeRikishi, force_update = False) -> bool:
+        """
+        True if the wrestler's all_matches list (saved in a previous run, or
+        downloaded before the banzuke listed new bouts) has to be downloaded
+        again before indexing their bouts by opponent
+        """
+        w = self.get_rikishi(r.rikishiId)
+        if not w:
+            return False
+        if r.rikishiId in self._matches_stale:
+            return True
+        if r.rikishiId in self._matches_fetched:
+            # (e.g. a basho in progress updated again): stale if the banzuke
+            # has a bout vs. an opponent the downloaded list doesn't have
+            opponents = set(self.matches.opponent_id(row, r.rikishiId) for row in w.all_matches)
+            return any(record.opponentID > 0 and not record.opponentID in opponents \
+                       for record in r.record)
+        if force_update:
+            return True
+        return any(record.opponentID > 0 and not record.opponentID in w.matches_by_opponent \
+                   for record in r.record)
+
+    def _index_matches(self, rikishiId) -> dict[int, array]:
+        """ build the match row list vs. each opponent from a wrestler's all_matches """
+        by_opponent: dict[int, array] = {}
+        for row in self.rikishi[rikishiId].all_matches:
+            opponentId = self.matches.opponent_id(row, rikishiId)
+            if opponentId not in by_opponent:
+                by_opponent[opponentId] = array('i')
+            by_opponent[opponentId].append(row)
+        return by_opponent
+
+    def _verify_opponent_matches(self, rikishiId, opponentId) -> bool:
+        """ compare a locally derived opponent match list with the API's """
+        w = self.rikishi[rikishiId]
+        matches = self._fetch_matches(rikishiId, opponentId = opponentId, decode = True)
+        expected = set(self.matches.match_key(m.matchId) for m in matches)
+        derived = set(self.matches.matchKey[row] for row in w.matches_by_opponent.get(opponentId, []))
+        if expected == derived:
+            return True
+        # download the wrestler's match list again on the next update
+        self._matches_fetched.discard(rikishiId)
+        self._matches_stale.add(rikishiId)
+        matchIds = lambda keys: sorted(self.matches.key_match_id(k) if k is not None else '?' for k in keys)
+        sys.stderr.write(f'WARNING: {w} vs. {opponentId}: {len(derived)} derived matches, ' + \
+                         f'{len(expected)} from API (missing:{matchIds(expected - derived)}, ' + \
+                         f'extra:{matchIds(derived - expected)})\n')
+        return False
+
+    def _fetch_matches(self, rikishiId, opponentId = None, decode = False) -> list:
+        """
+        every match a wrestler has fought (optionally vs. a single opponent),
+        as json dicts for _set_match() unless 'decode' asks for BashoMatch objects
+        """
+        all_matches, _ = self.api.rikishi_matches(rikishiId, opponentId = opponentId, limit = 1000, all_pages = True, \
+                                                  decode = decode)
+        return all_matches
+
+    async def _fetch_matches_async(self, api: AsyncSumoAPI, rikishiId, opponentId = None, decode = False) -> list:
+        """ every match a wrestler has fought (optionally vs. a single opponent), see _fetch_matches() """
+        all_matches, _ = await api.rikishi_matches(rikishiId, opponentId = opponentId, limit = 1000, all_pages = True, \
+                                                   decode = decode)
+        return all_matches
+
+    def _set_rikishi_profiles(self, profiles: list[Rikishi]) -> int:
+        """ keep prefetched profiles of new wrestlers, and update the ones we know """
+        for rikishi in profiles:
+            if rikishi.id in self.rikishi:
+                self.rikishi[rikishi.id].rikishi = rikishi
+            else:
+                self._rikishi_profiles[rikishi.id] = rikishi
+        if SumoData._VERBOSE > 0:
+            sys.stderr.write(f'Prefetched {len(profiles)} rikishi profiles ({len(self._rikishi_profiles)} new)\n')
+        return len(profiles)
+
+    def _fetch_rikishi(self, rikishiId, shikonaEn, desc) -> {Rikishi, RikishiStats, list[BashoMatch]}:
+        # find the wrestler (only a gap in the prefetched profiles needs a request)
+        rikishi = self._rikishi_profiles.get(rikishiId)
+        if not rikishi:
+            rikishi = self.api.rikishi(rikishiId, measurements=True, ranks=True, shikonas=True)
         if not rikishi:
             # Try to find the rikishi in a list of retired rikishi, searching
             # by shikonaEn
             rikishi_list = self.api.rikishis(limit=1, skip=0, retired=True, \
                                              measurements=True, ranks=True, shikonas=True, \
                                              shikonaEn=shikonaEn )
-            if len(rikishi_list) >= 1:
-                rikishi = rikishi_list[0]
-                if SumoData._VERBOSE > 1:
-                    sys.stderr.write(f'Found possibly retired Rikishi "{desc}": {rikishi.short_desc()}\n')
-            else:
-                if SumoData._VERBOSE > 2:
-                    sys.stderr.write(f'No Rikishi data for "{desc}" from API: creating blank entry\n')
-                rikishi = Rikishi(id=rikishiId, shikonaEn=shikonaEn)
-
-        sys.stdout.write(f'    Adding wrestler:{desc}...{" "*50}\n')
+            rikishi = self._retired_rikishi(rikishiId, shikonaEn, desc, rikishi_list)
 
         # get some extra stats
         stats = self.api.rikishi_stats(rikishiId)
+
+        # Grab _all_ matches this wrestler has ever fought
+        return rikishi, stats, self._fetch_matches(rikishiId)
+
+    async def _fetch_rikishi_async(self, api: AsyncSumoAPI, rikishiId, shikonaEn, desc) -> {Rikishi, RikishiStats, list[BashoMatch]}:
+        # find the wrestler, their stats, and all their matches at the same time
+        rikishi = self._rikishi_profiles.get(rikishiId)
+        if rikishi:
+            stats, matchlist = await SumoData._gather( \
+                    api.rikishi_stats(rikishiId), \
+                    self._fetch_matches_async(api, rikishiId))
+        else:
+            rikishi, stats, matchlist = await SumoData._gather( \
+                    api.rikishi(rikishiId, measurements=True, ranks=True, shikonas=True), \
+                    api.rikishi_stats(rikishiId), \
+                    self._fetch_matches_async(api, rikishiId))
+        if not rikishi:
+            rikishi_list = await api.rikishis(limit=1, skip=0, retired=True, \
+                                              measurements=True, ranks=True, shikonas=True, \
+                                              shikonaEn=shikonaEn )
+            rikishi = self._retired_rikishi(rikishiId, shikonaEn, desc, rikishi_list)
+        return rikishi, stats, matchlist
+
+    def _retired_rikishi(self, rikishiId, shikonaEn, desc, rikishi_list: list[Rikishi]) -> Rikishi:
+        """ pick the wrestler out of a (retired) rikishi search by shikonaEn """
+        if len(rikishi_list) >= 1:
+            rikishi = rikishi_list[0]
+            if SumoData._VERBOSE > 1:
+                sys.stderr.write(f'Found possibly retired Rikishi "{desc}": {rikishi.short_desc()}\n')
+        else:
+            if SumoData._VERBOSE > 2:
+                sys.stderr.write(f'No Rikishi data for "{desc}" from API: creating blank entry\n')
+            rikishi = Rikishi(id=rikishiId, shikonaEn=shikonaEn)
+        return rikishi
+
+    def _add_rikishi(self, rikishiId, shikonaEn, desc):
+        # Create the SumoWrestler object
+        rikishi, stats, matchlist = self._fetch_rikishi(rikishiId, shikonaEn, desc)
+        return self._set_rikishi(rikishiId, desc, rikishi, stats, matchlist)
+
+    async def _add_rikishi_list_async(self, api: AsyncSumoAPI, rikishi: dict[int, str]):
+        """ concurrently fetch and add each (unknown) rikishiId:shikonaEn in the dict """
+        rikishi = { rId: shikona for rId, shikona in rikishi.items() if not rId in self.rikishi }
+        fetched = await SumoData._gather(*[self._fetch_rikishi_async(api, rId, shikona, f'{shikona}({rId})') \
+                                         for rId, shikona in rikishi.items()])
+        for (rId, shikona), (r, stats, matchlist) in zip(rikishi.items(), fetched):
+            self._set_rikishi(rId, f'{shikona}({rId})', r, stats, matchlist)
+        return
+
+    def _set_rikishi(self, rikishiId, desc, rikishi: Rikishi, stats: RikishiStats, matchlist: list):
+        sys.stdout.write(f'    Adding wrestler:{desc}...{" "*50}\n')
+
         if not stats:
             # sys.stderr.write(f'Cannot find stats for {desc}: creating blank entry')
             stats = RikishiStats()
 
-        all_matches = []
-
-        # Grab _all_ matches this wrestler has ever fought
-        limit = 1000
-        skip = 0
-        while True:
-            matchlist, _ = self.api.rikishi_matches(rikishiId, limit = limit, skip = skip)
-            # iterate over the match list and add each one to "all_matches"
-            # (the list() is needed to actually invoke the map lambda for each object)
-            list(map(lambda m: self._set_match(m), matchlist))
-            for m in matchlist:
-                all_matches.append(m.matchId)
-            sys.stdout.write(f'    Adding wrestler:{desc} +{len(matchlist)} matches{" "*45}\r')
-            if len(matchlist) < limit:
-                break
-            skip += limit
-
         self.rikishi[rikishiId] = SumoWrestler(rikishi, stats)
-        self.rikishi[rikishiId].all_matches = all_matches
+        self._rikishi_profiles.pop(rikishiId, None)
+        self._set_rikishi_matches(rikishiId, matchlist)
+        sys.stdout.write(f'    Adding wrestler:{desc} +{len(matchlist)} matches{" "*45}\r')
 
         return True
 
+    def _set_rikishi_matches(self, rikishiId, matchlist: list):
+        """ add each match to the table, and replace the wrestler's "all_matches" list """
+        self.rikishi[rikishiId].all_matches = array('i', map(self._set_match, matchlist))
+        self._matches_fetched.add(rikishiId)
+        self._matches_stale.discard(rikishiId)
+        return
+
     def _add_torikumi(self, t: SumoTournament, division: SumoDivision, day):
         sys.stdout.write(f'    Add Day {day} Torikumi for {division}{" "*50}\r')
 
         # grab the day's torikumi in the givin division
         torikumi = self.api.basho_torikumi(t.id_str(), division, day)
+        if torikumi:
+            for match in torikumi.torikumi:
+                if not match.eastId in self.rikishi:
+                    self._add_rikishi(match.eastId, match.eastShikona, f'E:{match.eastShikona}({match.eastId})')
+                if not match.westId in self.rikishi:
+                    self._add_rikishi(match.westId, match.westShikona, f'W:{match.westShikona}({match.westId})')
+        self._set_torikumi(t, division, day, torikumi)
+        return
 
+    def _set_torikumi(self, t: SumoTournament, division: SumoDivision, day, torikumi: BashoTorikumi):
         if not day in t.torikumi_by_day:
             t.torikumi_by_day[day] = {}
         if not division in t.torikumi_by_division:
             t.torikumi_by_division[division] = {}
 
         if torikumi:
-            t.torikumi_by_day[day][division] = torikumi.torikumi
-            t.torikumi_by_division[division][day] = torikumi.torikumi
-            for match in torikumi.torikumi:
-                if not match.eastId in self.rikishi:
-                    self._add_rikishi(match.eastId, match.eastShikona, f'E:{match.eastShikona}({match.eastId})')
-                if not match.westId in self.rikishi:
-                    self._add_rikishi(match.westId, match.westShikona, f'W:{match.westShikona}({match.westId})')
+            matches = list(map(CompactBashoMatch.from_match, torikumi.torikumi))
+            t.torikumi_by_day[day][division] = matches
+            t.torikumi_by_division[division][day] = matches
             # Add the torikumi to the banzuke object
             # (assume the banzuke object exists)
-            t.banzuke[SumoDivision(division)].add_torikumi(day, torikumi.torikumi)
+            t.banzuke[SumoDivision(division)].add_torikumi(day, matches)
         else:
             t.torikumi_by_day[day][SumoDivision(division)] = []
             t.torikumi_by_division[SumoDivision(division)][day] = []
 
         return
 
-    def _set_match(self, m: BashoMatch):
-        self.matches[m.matchId] = m
-        return m
+    def _set_match(self, m) -> int:
+        """ add (or update) a match (a BashoMatch or its API json) in the table, returns its row """
+        if isinstance(m, dict):
+            return self.matches.add_record(m)
+        return self.matches.add(m)
 
-    def _get_match(self, mID: str):
-        if mID in self.matches:
-            return self.matches[mID]
-        return None
+    def _get_match(self, mID: str) -> SumoMatchView:
+        return self.matches.get(mID)
 
 
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+import typing
+from dataclasses import fields, is_dataclass, MISSING
+from enum import Enum
+from dataclasses_json.undefined import UndefinedParameterError
+
+class SumoDecoder:
+    """
+    Fast json -> dataclass decoding for the sumoclasses, used by the API in
+    place of the dataclasses_json from_dict() methods.
+
+    from_dict() inspects the class (fields, type hints, overrides) again for
+    every object it decodes. SumoDecoder instead generates a decode function
+    once per class, with the field names, renames ('field_name'), custom
+    decoders and type conversions written out, e.g.:
+
+        decode = SumoDecoder.decoder(BashoMatch)
+        matches = [decode(m) for m in j['records']]
+
+    The objects are identical to the ones from_dict() returns. A strict
+    decoder (the default, like Undefined.RAISE) raises UndefinedParameterError
+    on unknown keys in the json; SumoDecoder.set_strict(False) ignores them
+    instead (e.g. if the API adds fields before the classes catch up).
+    """
+    _STRICT = True
+
+    # (class, strict) -> generated decode function
+    _decoders = {}
+    # class -> json keys the decoder knows
+    _keys = {}
+
+    # Static method
+    def set_strict(strict = True):
+        """ raise (True) or ignore (False) unknown keys in decoded json """
+        SumoDecoder._STRICT = strict
+        return
+
+    # Static method
+    def decoder(cls, strict = None):
+        """ the (generated, cached) function decoding a json dict into a 'cls' object """
+        if strict is None:
+            strict = SumoDecoder._STRICT
+        decode = SumoDecoder._decoders.get((cls, strict))
+        if not decode:
+            decode = SumoDecoder._generate(cls, strict)
+            SumoDecoder._decoders[(cls, strict)] = decode
+        return decode
+
+    # Static method
+    def decode(cls, kvs: dict, strict = None):
+        """ decode a single json dict, like cls.from_dict(kvs) """
+        return SumoDecoder.decoder(cls, strict)(kvs)
+
+    # Static method
+    def decode_list(cls, records: list, strict = None) -> list:
+        """ decode a list of json dicts """
+        decode = SumoDecoder.decoder(cls, strict)
+        return [decode(r) for r in records]
+
+    # Static method
+    def check_keys(cls, records: list, strict = None):
+        """
+        raise UndefinedParameterError (like a strict decoder) if a json dict
+        in 'records' has a key 'cls' doesn't know, without decoding them
+        """
+        if strict is None:
+            strict = SumoDecoder._STRICT
+        if not strict:
+            return
+        known = SumoDecoder._keys.get(cls)
+        if known is None:
+            known = SumoDecoder._keys[cls] = frozenset(SumoDecoder._known_keys(cls))
+        for r in records:
+            if isinstance(r, dict) and not known.issuperset(r):
+                SumoDecoder._undefined(known, r)
+        return
+
+    # Static method
+    def source(cls, strict = None) -> str:
+        """ the generated python source of a decoder (for debugging) """
+        if strict is None:
+            strict = SumoDecoder._STRICT
+        return SumoDecoder._generate(cls, strict).__source__
+
+    # Static method
+    def _generate(cls, strict):
+        hints = typing.get_type_hints(cls)
+        ns = { '_cls': cls, '_MISSING': MISSING }
+        known = SumoDecoder._known_keys(cls)
+        body = []
+        for f in fields(cls):
+            if not f.init:
+                continue
+            meta = f.metadata.get('dataclasses_json', {})
+            name = SumoDecoder._json_name(f)
+            expr = SumoDecoder._convert(hints[f.name], meta.get('decoder'), 'v', ns, strict, 0)
+            body.append(f'    v = kvs.get({name!r}, _MISSING)')
+            if name != f.name:
+                body.append(f'    if v is _MISSING:')
+                body.append(f'        v = kvs.get({f.name!r}, _MISSING)')
+            body.append(f'    if v is not _MISSING:')
+            body.append(f'        kw[{f.name!r}] = v if v is None else {expr}')
+            if f.default is MISSING and f.default_factory is MISSING:
+                body.append(f'    else:')
+                body.append(f'        raise KeyError({f.name!r})')
+
+        lines = [f'def decode_{cls.__name__}(kvs):']
+        if strict:
+            ns['_known'] = frozenset(known)
+            ns['_undefined'] = SumoDecoder._undefined
+            lines.append('    if not _known.issuperset(kvs):')
+            lines.append('        _undefined(_known, kvs)')
+        lines.append('    kw = {}')
+        lines += body
+        lines.append('    return _cls(**kw)')
+        src = '\n'.join(lines) + '\n'
+        exec(compile(src, f'<SumoDecoder {cls.__name__}>', 'exec'), ns)
+        decode = ns[f'decode_{cls.__name__}']
+        decode.__source__ = src
+        return decode
+
+    # Static method
+    def _json_name(f) -> str:
+        """ the json key of a dataclass field """
+        meta = f.metadata.get('dataclasses_json', {})
+        # dcjson_config(field_name=...) is kept as a 'letter_case' function
+        return meta['letter_case'](f.name) if meta.get('letter_case') else f.name
+
+    # Static method
+    def _known_keys(cls) -> set:
+        """ the json keys of 'cls' (each field's json name, and its field name) """
+        known = set()
+        for f in fields(cls):
+            if f.init:
+                known.update((SumoDecoder._json_name(f), f.name))
+        return known
+
+    # Static method
+    def _convert(tp, decoder, var, ns, strict, depth) -> str:
+        """
+        python expression converting the json value in 'var' to type 'tp',
+        with the same rules as dataclasses_json (without the None check)
+        """
+        n = len(ns)
+        if decoder:
+            ns[f'_t{n}'] = tp
+            ns[f'_d{n}'] = decoder
+            return f'({var} if type({var}) is _t{n} else _d{n}({var}))'
+        if is_dataclass(tp):
+            ns[f'_d{n}'] = SumoDecoder.decoder(tp, strict)
+            return f'(_d{n}({var}) if type({var}) is dict else {var})'
+        origin = typing.get_origin(tp)
+        args = typing.get_args(tp)
+        if origin is list and args:
+            x = f'x{depth}'
+            return f'[{SumoDecoder._convert(args[0], None, x, ns, strict, depth+1)} for {x} in {var}]'
+        if origin is dict and len(args) == 2:
+            k, x = f'k{depth}', f'x{depth}'
+            kexpr = SumoDecoder._convert(args[0], None, k, ns, strict, depth+1)
+            xexpr = SumoDecoder._convert(args[1], None, x, ns, strict, depth+1)
+            return f'{{{kexpr}: {xexpr} for {k}, {x} in {var}.items()}}'
+        if isinstance(tp, type) and issubclass(tp, Enum):
+            ns[f'_t{n}'] = tp
+            return f'_t{n}({var})'
+        if tp in (int, float, str, bool):
+            ns[f'_t{n}'] = tp
+            return f'({var} if isinstance({var}, _t{n}) else _t{n}({var}))'
+        # anything else (e.g. Optional / Union) is passed through as is
+        return var
+
+    # Static method
+    def _undefined(known, kvs):
+        unknown = { k: v for k, v in kvs.items() if not k in known }
+        raise UndefinedParameterError(f'Received undefined initialization arguments {unknown}')
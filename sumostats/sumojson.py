@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import json
+
+class SumoJSON:
+    """
+    Pluggable json decoder used for API responses (and cached / recorded
+    responses). The fastest installed backend is used by default:
+
+        orjson -> ujson -> json (standard library)
+
+    Select a specific backend with SumoJSON.set_backend('json'). The optional
+    backends are not required: 'pip3 install orjson' to enable the fastest.
+    """
+    _BACKENDS = ['orjson', 'ujson', 'json']
+
+    _backend = None
+    _loads = None
+
+    # Static method
+    def _loader(name):
+        """ the loads() function of a backend, or None if it is not installed """
+        if name == 'json':
+            return json.loads
+        try:
+            if name == 'orjson':
+                import orjson
+                return orjson.loads
+            if name == 'ujson':
+                import ujson
+                return ujson.loads
+        except ImportError:
+            pass
+        return None
+
+    # Static method
+    def available() -> list[str]:
+        """ names of the installed backends, fastest first """
+        return [name for name in SumoJSON._BACKENDS if SumoJSON._loader(name)]
+
+    # Static method
+    def backend() -> str:
+        """ name of the backend in use """
+        if not SumoJSON._loads:
+            SumoJSON.set_backend()
+        return SumoJSON._backend
+
+    # Static method
+    def set_backend(name = None) -> str:
+        """
+        Use the named backend (None: the fastest one installed). Raises
+        ValueError if the backend is unknown or not installed.
+        """
+        names = [name] if name else SumoJSON._BACKENDS
+        for n in names:
+            loads = SumoJSON._loader(n)
+            if loads:
+                SumoJSON._backend = n
+                SumoJSON._loads = loads
+                return n
+        raise ValueError(f'json backend "{name}" is not available (installed: {SumoJSON.available()})')
+
+    # Static method
+    def loads(data):
+        """ decode a json document (str or utf-8 bytes) """
+        if not SumoJSON._loads:
+            SumoJSON.set_backend()
+        return SumoJSON._loads(data)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import json
+from collections.abc import MutableSequence
+from .sumodecode import SumoDecoder
+from .sumojson import SumoJSON
+
+class SumoLazyList(MutableSequence):
+    """
+    A list of 'cls' objects (e.g. a wrestler's rankHistory) which is kept as
+    compact json until it's used: the objects are decoded (with SumoDecoder)
+    the first time an entry is read or the list is changed. Until then it
+    costs a single bytes object, and pickles (and loads) as one.
+
+    It works like a list (len(), iteration, indexing, append(), sorted(),
+    == with a list, ...). Use as a dataclasses_json field decoder:
+
+        rankHistory: list[RikishiRank] = field(default_factory=list, \\
+                     metadata=dcjson_config(decoder=SumoLazyList.decoder(RikishiRank)))
+    """
+    __slots__ = ('cls', '_raw', '_size', '_items')
+
+    def __init__(self, cls, records: list = None, raw: bytes = None, size: int = 0):
+        self.cls = cls
+        self._items = None
+        if raw is None:
+            records = records or []
+            raw = json.dumps(records, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            size = len(records)
+        self._raw = raw
+        self._size = size
+
+    # Static method
+    def decoder(cls):
+        """ a field decoder wrapping the json list of a 'cls' field in a SumoLazyList """
+        def _decode(records):
+            # (an empty list is as small as it gets)
+            if not isinstance(records, list) or not records:
+                return records
+            # unknown keys are reported now, not when the list is first used
+            SumoDecoder.check_keys(cls, records)
+            return SumoLazyList(cls, records)
+        return _decode
+
+    def decoded(self) -> bool:
+        return self._items is not None
+
+    def items(self) -> list:
+        """ the (decoded) list of objects """
+        if self._items is None:
+            self._items = SumoDecoder.decode_list(self.cls, SumoJSON.loads(self._raw))
+            self._raw = None
+        return self._items
+
+    def __len__(self):
+        if self._items is None:
+            return self._size
+        return len(self._items)
+
+    def __getitem__(self, i):
+        return self.items()[i]
+
+    def __setitem__(self, i, value):
+        self.items()[i] = value
+
+    def __delitem__(self, i):
+        del self.items()[i]
+
+    def insert(self, i, value):
+        self.items().insert(i, value)
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (list, SumoLazyList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.items())
+
+    def __reduce__(self):
+        if self._items is None:
+            return (SumoLazyList, (self.cls, None, self._raw, self._size))
+        return (SumoLazyList._from_items, (self.cls, self._items))
+
+    # Static method
+    def _from_items(cls, items: list):
+        lazy = SumoLazyList(cls, raw = b'', size = 0)
+        lazy._items = items
+        lazy._raw = None
+        return lazy
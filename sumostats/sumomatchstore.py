@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+from array import array
+from collections import Counter
+from .sumoclasses import *
+from .sumodecode import SumoDecoder
+
+class SumoMatchKey:
+    """
+    Reversible 64 bit int form of a matchId string
+    ('YYYYMM-day-[matchNo - 1]-eastId-westId'), the primary key of matches in
+    SumoData. The fields are packed from the high bits:
+
+        year (11 bits), month (4), day + 1 (5), matchNo + 1 (11),
+        eastId + 1 (16), westId + 1 (16)
+
+    so keys are positive int64 values, and sort like the matches (by basho,
+    day and match number):
+
+        key = SumoMatchKey.from_match_id('202501-1-0-19-45')
+        SumoMatchKey.to_match_id(key)   -> '202501-1-0-19-45'
+
+    A matchId in another format, or with values that don't fit, has no key
+    (None).
+    """
+    _MATCH_ID_RE = re.compile(r'(\d{4})(\d{2})-(0|-?[1-9]\d*)-(0|-?[1-9]\d*)-(0|-?[1-9]\d*)-(0|-?[1-9]\d*)$')
+
+    _YEAR_SHIFT = 52
+    _MONTH_SHIFT = 48
+    _DAY_SHIFT = 43
+    _MATCHNO_SHIFT = 32
+    _EAST_SHIFT = 16
+
+    # Static method
+    def pack(year: int, month: int, day: int, matchNo: int, eastId: int, westId: int) -> int:
+        """ the key of a match, None if a value doesn't fit """
+        if not (0 < year < 2048 and 0 < month <= 12 and -1 <= day < 31 and -1 <= matchNo < 2047 \
+                and -1 <= eastId < 65535 and -1 <= westId < 65535):
+            return None
+        return (year << SumoMatchKey._YEAR_SHIFT) | (month << SumoMatchKey._MONTH_SHIFT) | \
+               ((day + 1) << SumoMatchKey._DAY_SHIFT) | ((matchNo + 1) << SumoMatchKey._MATCHNO_SHIFT) | \
+               ((eastId + 1) << SumoMatchKey._EAST_SHIFT) | (westId + 1)
+
+    # Static method
+    def unpack(key: int) -> tuple:
+        """ (year, month, day, matchNo, eastId, westId) of a key """
+        return (key >> SumoMatchKey._YEAR_SHIFT, \
+                (key >> SumoMatchKey._MONTH_SHIFT) & 0xf, \
+                ((key >> SumoMatchKey._DAY_SHIFT) & 0x1f) - 1, \
+                ((key >> SumoMatchKey._MATCHNO_SHIFT) & 0x7ff) - 1, \
+                ((key >> SumoMatchKey._EAST_SHIFT) & 0xffff) - 1, \
+                (key & 0xffff) - 1)
+
+    # Static method
+    def from_match_id(matchId: str) -> int:
+        """ the key of a matchId string, None if it can't be packed """
+        m = SumoMatchKey._MATCH_ID_RE.match(matchId) if type(matchId) is str else None
+        if not m:
+            return None
+        year, month, day, matchNo, eastId, westId = map(int, m.groups())
+        return SumoMatchKey.pack(year, month, day, matchNo + 1, eastId, westId)
+
+    # Static method
+    def to_match_id(key: int) -> str:
+        """ the matchId string of a key """
+        year, month, day, matchNo, eastId, westId = SumoMatchKey.unpack(key)
+        return f'{year:04}{month:02}-{day}-{matchNo - 1}-{eastId}-{westId}'
+
+    # Static method
+    def from_match(m) -> int:
+        """ the key of a match's matchId, None if it can't be packed """
+        return SumoMatchKey.from_match_id(m.matchId)
+
+
+class SumoMatchStore:
+    """
+    Columnar table of matches, used for the match table of SumoData. Each
+    match is a row number, and each field a typed array indexed by row:
+
+        matchKey                SumoMatchKey of the matchId
+        basho                   date ordinal (see SumoBashoCalendar.basho_ordinal)
+        day, matchNo            day of the basho, match number
+        division                SumoDivision.ordinal
+        eastId, westId,
+        winnerId                rikishi ids
+        eastRankValue,
+        westRankValue           RikishiRank.RankValue() of the ranks
+        kimarite, eastRank, ... code of the string in 'strings'
+
+    so a query (e.g. a wrestler's Makuuchi matches before a basho, see
+    select()) compares ints in a few arrays instead of walking objects. For
+    compatibility, the store also works like the { matchId: match } dict it
+    replaces, handing out read-only SumoMatchView objects, e.g.:
+
+        row = store.add(m)
+        store.view(row).kimarite == store[m.matchId].kimarite == m.kimarite
+
+    Matches are keyed by their SumoMatchKey (the 'matchKey' column), and
+    can be looked up by key or matchId string. A matchId without a packed
+    key gets a negative key from the store.
+    """
+    # indexed by SumoDivision.ordinal
+    _DIVISIONS = tuple(SumoDivision)
+    _DIVISION_NAMES = { d.value: d for d in SumoDivision }
+
+    # json key -> type of each value of an API match record (a BashoMatch)
+    _RECORD_TYPES = { 'id': str, 'bashoId': str, 'division': str, 'day': int, 'matchNo': int, \
+                      'eastId': int, 'eastShikona': str, 'eastRank': str, \
+                      'westId': int, 'westShikona': str, 'westRank': str, \
+                      'kimarite': str, 'winnerId': int, 'winnerEn': str, 'winnerJp': str }
+
+    # (column name, array type code)
+    _COLUMNS = (('matchKey', 'q'), ('basho', 'I'), ('day', 'b'), ('matchNo', 'h'), ('division', 'b'), \
+                ('eastId', 'i'), ('westId', 'i'), ('winnerId', 'i'), ('kimarite', 'I'), \
+                ('eastRankValue', 'i'), ('westRankValue', 'i'), ('eastRank', 'I'), ('westRank', 'I'), \
+                ('eastShikona', 'I'), ('westShikona', 'I'), ('winnerEn', 'I'), ('winnerJp', 'I'))
+    # the columns holding codes into 'strings'
+    _STRING_COLUMNS = ('kimarite', 'eastRank', 'westRank', 'eastShikona', 'westShikona', 'winnerEn', 'winnerJp')
+
+    def __init__(self):
+        for name, typecode in SumoMatchStore._COLUMNS:
+            setattr(self, name, array(typecode))
+        # every distinct (interned) string of the string columns, by code
+        self.strings: list[str] = ['']
+        self._codes: dict[str, int] = { '': 0 }
+        # match key -> row (not saved: rebuilt from the matchKey column)
+        self._rows: dict[int, int] = {}
+        # matchIds without a packed key: matchId <-> (negative) key
+        self._unpacked_keys: dict[str, int] = {}
+        self._unpacked_ids: dict[int, str] = {}
+        return
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_rows']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rows = dict(zip(self.matchKey, range(len(self.matchKey))))
+        # share the strings with the rest of the tables (see SumoInterned)
+        self.strings = list(map(sys.intern, self.strings))
+        self._codes = dict(zip(self.strings, range(len(self.strings))))
+
+    def __len__(self):
+        return len(self.basho)
+
+    def __contains__(self, matchId):
+        return self.row(matchId) is not None
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, matchId):
+        row = self.row(matchId)
+        if row is None:
+            raise KeyError(matchId)
+        return self.view(row)
+
+    def get(self, matchId, default = None):
+        row = self.row(matchId)
+        if row is None:
+            return default
+        return self.view(row)
+
+    def keys(self):
+        """ the match keys """
+        return self._rows.keys()
+
+    def values(self):
+        for row in range(len(self)):
+            yield self.view(row)
+
+    def items(self):
+        """ (match key, view) pairs """
+        for key, row in self._rows.items():
+            yield key, self.view(row)
+
+    def add(self, m) -> int:
+        """
+        Add a match (BashoMatch, CompactBashoMatch or view), or update the
+        row of a match with the same matchId. Returns the row.
+        """
+        key = self.match_key(m.matchId, add = True)
+        division = m.division
+        if not isinstance(division, SumoDivision):
+            division = SumoDivision(division) if division else SumoDivision.UNKNOWN
+        _str = self._code
+        return self._set_row(key, (key, m.bashoId.toordinal(), m.day, m.matchNo, division.ordinal, \
+                                   m.eastId, m.westId, m.winnerId, _str(m.kimarite), \
+                                   RikishiRank.RankValue(m.eastRank), RikishiRank.RankValue(m.westRank), \
+                                   _str(m.eastRank), _str(m.westRank), _str(m.eastShikona), _str(m.westShikona), \
+                                   _str(m.winnerEn), _str(m.winnerJp)))
+
+    def add_record(self, r: dict) -> int:
+        """
+        Add a match straight from its API json (e.g. a /rikishi/:id/matches
+        record) without decoding a BashoMatch object first: the values only
+        become objects when a view reads them. A record that needs more than
+        that (a missing, None or differently typed value, an unknown key) is
+        decoded into a BashoMatch, so the result is the same as add().
+        """
+        types = SumoMatchStore._RECORD_TYPES
+        if len(r) != len(types) or not r.get('id') or r.get('division') not in SumoMatchStore._DIVISION_NAMES or \
+           any(type(r.get(k)) is not t for k, t in types.items()):
+            return self.add(SumoDecoder.decode(BashoMatch, r))
+        key = self.match_key(r['id'], add = True)
+        _str = self._code
+        eastRank, westRank = r['eastRank'], r['westRank']
+        return self._set_row(key, (key, SumoBashoCalendar.basho_ordinal(r['bashoId']), r['day'], r['matchNo'], \
+                                   SumoMatchStore._DIVISION_NAMES[r['division']].ordinal, \
+                                   r['eastId'], r['westId'], r['winnerId'], _str(r['kimarite']), \
+                                   RikishiRank.RankValue(eastRank), RikishiRank.RankValue(westRank), \
+                                   _str(eastRank), _str(westRank), _str(r['eastShikona']), _str(r['westShikona']), \
+                                   _str(r['winnerEn']), _str(r['winnerJp'])))
+
+    def _set_row(self, key: int, values: tuple) -> int:
+        """ append a row of column values, or replace the row of 'key' """
+        columns = [getattr(self, name) for name, _ in SumoMatchStore._COLUMNS]
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self)
+            for column, v in zip(columns, values):
+                column.append(v)
+            self._rows[key] = row
+        else:
+            for column, v in zip(columns, values):
+                column[row] = v
+        return row
+
+    def match_key(self, matchId, add = False) -> int:
+        """
+        the key of a matchId string (or key), None if the store doesn't know
+        the (unpackable) matchId. 'add' gives a new matchId a key.
+        """
+        if type(matchId) is int:
+            return matchId
+        key = SumoMatchKey.from_match_id(matchId)
+        if key is None:
+            key = self._unpacked_keys.get(matchId)
+            if key is None and add:
+                key = -1 - len(self._unpacked_keys)
+                self._unpacked_keys[matchId] = key
+                self._unpacked_ids[key] = matchId
+        return key
+
+    def key_match_id(self, key: int) -> str:
+        """ the matchId string of a key """
+        if key < 0:
+            return self._unpacked_ids[key]
+        return SumoMatchKey.to_match_id(key)
+
+    def row(self, matchId) -> int:
+        """ the row of a matchId string or key, None if it's not in the store """
+        return self._rows.get(self.match_key(matchId))
+
+    def rows(self, matchIds) -> array:
+        """ the rows of a list of matchId strings or keys (skipping unknown ones) """
+        rows = array('i')
+        for matchId in matchIds:
+            row = self.row(matchId)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def view(self, row: int):
+        if row < 0 or row >= len(self):
+            raise IndexError(f'match row {row} out of range')
+        return SumoMatchView(self, row)
+
+    def match_id(self, row: int) -> str:
+        return self.key_match_id(self.matchKey[row])
+
+    def basho_date(self, row: int) -> date:
+        return SumoBashoCalendar.ordinal_date(self.basho[row])
+
+    def opponent_id(self, row: int, rikishiId: int) -> int:
+        """ the other wrestler of a match """
+        eastId = self.eastId[row]
+        return self.westId[row] if eastId == rikishiId else eastId
+
+    def select(self, rows = None, rikishiId = None, opponentId = None, division = None, \
+               before = None, since = None) -> list[int]:
+        """
+        The rows (in order) of the matches passing every given filter:
+            rows        only look at these rows (e.g. a wrestler's all_matches)
+            rikishiId   matches of a wrestler...
+            opponentId  ...or between two wrestlers (with rikishiId)
+            division    SumoDivision of the match
+            before      basho id string / date: only earlier basho
+            since       basho id string / date: only this and later basho
+        e.g. a wrestler's Makuuchi matches before the 2025 Hatsu basho:
+            store.select(w.all_matches, rikishiId=w.id(), division=SumoDivision.Makuuchi, before='202501')
+        """
+        selected = range(len(self)) if rows is None else rows
+        if rikishiId is not None:
+            east, west = self.eastId, self.westId
+            if rows is None:
+                # scanning every row: search the id columns (as bytes) instead of looping over them
+                selected = sorted(set(SumoMatchStore._find(east, rikishiId)) | \
+                                  set(SumoMatchStore._find(west, rikishiId)))
+            elif opponentId is None:
+                selected = [r for r in selected if east[r] == rikishiId or west[r] == rikishiId]
+            if opponentId is not None:
+                pair = (rikishiId, opponentId)
+                selected = [r for r in selected if (east[r], west[r]) == pair or (west[r], east[r]) == pair]
+        if division is not None:
+            code = SumoDivision(division).ordinal
+            column = self.division
+            selected = [r for r in selected if column[r] == code]
+        if before is not None:
+            ordinal = SumoBashoCalendar.basho_ordinal(before)
+            column = self.basho
+            selected = [r for r in selected if column[r] < ordinal]
+        if since is not None:
+            ordinal = SumoBashoCalendar.basho_ordinal(since)
+            column = self.basho
+            selected = [r for r in selected if column[r] >= ordinal]
+        return list(selected)
+
+    # Static method
+    def _find(column: array, value: int) -> list[int]:
+        """ the rows of a column equal to 'value', found with bytes.find() """
+        try:
+            pattern = array(column.typecode, (value,)).tobytes()
+        except OverflowError:
+            return []
+        data = column.tobytes()
+        size = column.itemsize
+        found = []
+        i = data.find(pattern)
+        while i >= 0:
+            if i % size == 0:
+                found.append(i // size)
+                i = data.find(pattern, i + size)
+            else:
+                # a match straddling two values
+                i = data.find(pattern, i + 1)
+        return found
+
+    def count_strings(self, counts: dict):
+        """ add the number of uses of each string (by the rows) to 'counts' ({ str: count }) """
+        uses = Counter()
+        for name in SumoMatchStore._STRING_COLUMNS:
+            uses.update(getattr(self, name))
+        for code, n in uses.items():
+            s = self.strings[code]
+            counts[s] = counts.get(s, 0) + n
+        return
+
+    def _code(self, s: str) -> int:
+        code = self._codes.get(s)
+        if code is None:
+            code = len(self.strings)
+            if type(s) is str:
+                s = sys.intern(s)
+            self.strings.append(s)
+            self._codes[s] = code
+        return code
+
+
+class SumoMatchView:
+    """
+    A (read-only) row of a SumoMatchStore, with the attributes and methods
+    of a BashoMatch. Change a match by adding it to the store again.
+    """
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store: SumoMatchStore, row: int):
+        self.store = store
+        self.row = row
+
+    @property
+    def bashoId(self) -> date:
+        return self.store.basho_date(self.row)
+
+    @property
+    def division(self) -> SumoDivision:
+        return SumoMatchStore._DIVISIONS[self.store.division[self.row]]
+
+    @property
+    def day(self) -> int:
+        return self.store.day[self.row]
+
+    @property
+    def matchNo(self) -> int:
+        return self.store.matchNo[self.row]
+
+    @property
+    def eastId(self) -> int:
+        return self.store.eastId[self.row]
+
+    @property
+    def eastShikona(self) -> str:
+        return self.store.strings[self.store.eastShikona[self.row]]
+
+    @property
+    def westId(self) -> int:
+        return self.store.westId[self.row]
+
+    @property
+    def westShikona(self) -> str:
+        return self.store.strings[self.store.westShikona[self.row]]
+
+    @property
+    def winnerId(self) -> int:
+        return self.store.winnerId[self.row]
+
+    @property
+    def winnerEn(self) -> str:
+        return self.store.strings[self.store.winnerEn[self.row]]
+
+    @property
+    def winnerJp(self) -> str:
+        return self.store.strings[self.store.winnerJp[self.row]]
+
+    @property
+    def matchId(self) -> str:
+        return self.store.match_id(self.row)
+
+    @property
+    def matchKey(self) -> int:
+        return self.store.matchKey[self.row]
+
+    @property
+    def eastRank(self) -> str:
+        return self.store.strings[self.store.eastRank[self.row]]
+
+    @property
+    def westRank(self) -> str:
+        return self.store.strings[self.store.westRank[self.row]]
+
+    @property
+    def kimarite(self) -> str:
+        return self.store.strings[self.store.kimarite[self.row]]
+
+    def _values(self) -> tuple:
+        """ the BashoMatch field values, in order """
+        return tuple(getattr(self, f) for f in BashoMatch.__dataclass_fields__)
+
+    def __eq__(self, other):
+        if isinstance(other, (SumoMatchView, CompactBashoMatch, BashoMatch)):
+            return self._values() == tuple(getattr(other, f) for f in BashoMatch.__dataclass_fields__)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'SumoMatchView[{self.row}](' + \
+               ', '.join(f'{k}={v!r}' for k, v in zip(BashoMatch.__dataclass_fields__, self._values())) + ')'
+
+    def to_match(self) -> BashoMatch:
+        return BashoMatch(*self._values())
+
+    def isValid(self):
+        return self.bashoId.year > 1000
+
+    def upcoming(self):
+        if self.winnerId <= 0:
+            return True
+        return False
+
+    def to_dict(self, encode_json = False) -> dict:
+        return self.to_match().to_dict(encode_json=encode_json)
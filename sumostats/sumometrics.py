@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+
+class SumoEndpointMetrics:
+    """
+    Counters and a latency histogram for a single API endpoint (e.g.
+    'rikishi_matches'). Latencies are kept in geometric buckets, so the
+    histogram has a fixed size no matter how many requests are made, and
+    percentiles are accurate to about 10%.
+    """
+    # bucket i holds latencies up to 1ms * 1.2^i (the last one: ~1.6 hours)
+    _BUCKETS = 80
+    _BOUNDS = [0.001 * 1.2**i for i in range(80)]
+
+    def __init__(self, endpoint = ''):
+        self.endpoint = endpoint
+        # requests that reached the server (every attempt, including retries)
+        self.requests = 0
+        # API calls answered from the response cache, without a request
+        self.cached = 0
+        # cached responses confirmed with a 304 Not Modified
+        self.not_modified = 0
+        # 204 / empty responses
+        self.empty = 0
+        # failed requests (network errors and HTTP error responses)
+        self.errors = 0
+        self.retries = 0
+        # duplicate requests sent for slow requests (see SumoHedgePolicy),
+        # and how many of them answered first
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.histogram = [0] * SumoEndpointMetrics._BUCKETS
+
+    def calls(self) -> int:
+        """ number of API calls made (not counting retries and hedged requests) """
+        return self.requests - self.retries - self.hedges + self.cached
+
+    def samples(self) -> int:
+        """ number of latencies in the histogram """
+        return sum(self.histogram)
+
+    def add_latency(self, elapsed: float):
+        self.latency_total += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+        bounds = SumoEndpointMetrics._BOUNDS
+        lo, hi = 0, len(bounds) - 1
+        # binary search for the first bucket bound >= elapsed
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bounds[mid] < elapsed:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.histogram[lo] += 1
+        return
+
+    def percentile(self, p: float) -> float:
+        """ the latency (seconds) below which 'p' percent of requests completed """
+        count = sum(self.histogram)
+        if count == 0:
+            return 0.0
+        rank = p / 100.0 * count
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank and n > 0:
+                return min(SumoEndpointMetrics._BOUNDS[i], self.latency_max)
+        return self.latency_max
+
+    def mean(self) -> float:
+        count = sum(self.histogram)
+        return self.latency_total / count if count > 0 else 0.0
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.cached += other.cached
+        self.not_modified += other.not_modified
+        self.empty += other.empty
+        self.errors += other.errors
+        self.retries += other.retries
+        self.hedges += other.hedges
+        self.hedge_wins += other.hedge_wins
+        self.bytes += other.bytes
+        self.latency_total += other.latency_total
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls(),
+            'requests': self.requests,
+            'cached': self.cached,
+            'not_modified': self.not_modified,
+            'empty': self.empty,
+            'errors': self.errors,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'bytes': self.bytes,
+            'latency': {
+                'mean': round(self.mean(), 6),
+                'p50': round(self.percentile(50), 6),
+                'p95': round(self.percentile(95), 6),
+                'p99': round(self.percentile(99), 6),
+                'max': round(self.latency_max, 6),
+                'total': round(self.latency_total, 6),
+            },
+        }
+
+    def __str__(self):
+        return f'{self.endpoint:<16} {self.calls():>8} {self.requests:>8} {self.cached:>7} ' + \
+               f'{self.empty:>6} {self.errors:>6} {self.retries:>7} {self.hedges:>6} {self.bytes/(1024*1024):>9.1f} ' + \
+               f'{self.percentile(50)*1000:>8.1f} {self.percentile(95)*1000:>8.1f} {self.percentile(99)*1000:>8.1f}'
+
+
+class SumoAPIMetrics:
+    """
+    Per-endpoint request metrics of an API object (see SumoAPI.stats()),
+    and gauges: values like the concurrency window, which go up and down.
+    Can be shared by several API objects and threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, SumoEndpointMetrics] = {}
+        # name -> { 'value': current, 'min': lowest, 'max': highest }
+        self.gauges: dict[str, dict] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if not 'gauges' in state:
+            self.gauges = {}
+
+    def _endpoint(self, endpoint) -> SumoEndpointMetrics:
+        if not endpoint in self.endpoints:
+            self.endpoints[endpoint] = SumoEndpointMetrics(endpoint)
+        return self.endpoints[endpoint]
+
+    def response(self, endpoint, elapsed: float, nbytes: int, empty = False, not_modified = False):
+        """ a request completed with a (successful) response """
+        with self._lock:
+            m = self._endpoint(endpoint)
+            m.requests += 1
+            m.bytes += nbytes
+            m.add_latency(elapsed)
+            if empty:
+                m.empty += 1
+            if not_modified:
+                m.not_modified += 1
+        return
+
+    def error(self, endpoint, elapsed: float, nbytes = 0):
+        """ a request failed (network error or HTTP error response) """
+        with self._lock:
+            m = self._endpoint(endpoint)
+            m.requests += 1
+            m.errors += 1
+            m.bytes += nbytes
+            m.add_latency(elapsed)
+        return
+
+    def cancelled(self, endpoint):
+        """ a request was abandoned before its response arrived (e.g. a hedged request which lost) """
+        with self._lock:
+            self._endpoint(endpoint).requests += 1
+        return
+
+    def retry(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+        return
+
+    def hedge(self, endpoint, won = False):
+        """ a duplicate request was sent ('won': a duplicate answered first) """
+        with self._lock:
+            m = self._endpoint(endpoint)
+            if won:
+                m.hedge_wins += 1
+            else:
+                m.hedges += 1
+        return
+
+    def cached(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).cached += 1
+        return
+
+    def gauge(self, name, value):
+        """ set the current value of a gauge, e.g. 'concurrency_window' """
+        with self._lock:
+            g = self.gauges.get(name)
+            if g is None:
+                self.gauges[name] = { 'value': value, 'min': value, 'max': value }
+            else:
+                g['value'] = value
+                g['min'] = min(g['min'], value)
+                g['max'] = max(g['max'], value)
+        return
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.gauges = {}
+        return
+
+    def endpoint(self, endpoint) -> SumoEndpointMetrics:
+        """ a copy of the current metrics of one endpoint """
+        with self._lock:
+            m = SumoEndpointMetrics(endpoint)
+            if endpoint in self.endpoints:
+                m.merge(self.endpoints[endpoint])
+        return m
+
+    def total(self) -> SumoEndpointMetrics:
+        """ the metrics of every endpoint combined """
+        with self._lock:
+            total = SumoEndpointMetrics('total')
+            for m in self.endpoints.values():
+                total.merge(m)
+        return total
+
+    def stats(self) -> dict:
+        """
+        machine readable metrics:
+            { endpoint: { counter: value, ... }, 'total': {...}, 'gauges': { name: {...} } }
+        """
+        with self._lock:
+            stats = { name: m.to_dict() for name, m in sorted(self.endpoints.items()) }
+            gauges = { name: dict(g) for name, g in sorted(self.gauges.items()) }
+        stats['total'] = self.total().to_dict()
+        if gauges:
+            stats['gauges'] = gauges
+        return stats
+
+    def dump(self, path):
+        """ write stats() to a json file """
+        with open(path, 'w') as f:
+            json.dump(self.stats(), f, indent=2)
+        return
+
+    def __str__(self):
+        s = f'{"endpoint":<16} {"calls":>8} {"requests":>8} {"cached":>7} {"empty":>6} {"errors":>6} ' + \
+            f'{"retries":>7} {"hedges":>6} {"MB":>9} {"p50(ms)":>8} {"p95(ms)":>8} {"p99(ms)":>8}'
+        with self._lock:
+            endpoints = [m for _, m in sorted(self.endpoints.items())]
+            gauges = [(name, dict(g)) for name, g in sorted(self.gauges.items())]
+        for m in endpoints:
+            s += f'\n{m}'
+        s += f'\n{self.total()}'
+        for name, g in gauges:
+            s += f'\n{name}: {g["value"]} (min {g["min"]}, max {g["max"]})'
+        return s
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import asyncio
+import gzip
+import httpx
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+from .sumojson import SumoJSON
+
+class SumoAPIArchive:
+    """
+    A compact archive of API request/response pairs: a gzip'd file with one
+    json object per line. Requests are identified by their URL with sorted
+    query parameters (the last recorded response for a request wins).
+    """
+    # response headers worth keeping
+    _HEADERS = ['content-type', 'etag', 'last-modified', 'retry-after']
+
+    def __init__(self, path):
+        self.path = path
+        self.responses: dict[str, dict] = {}
+        self._out = None
+        self._lock = threading.Lock()
+
+    # Static method
+    def key(url: httpx.URL) -> str:
+        base = str(url.copy_with(query=None))
+        params = sorted(url.params.multi_items())
+        if not params:
+            return base
+        return base + '?' + urlencode(params)
+
+    def load(self):
+        """ read every recorded response in the archive """
+        self.responses = {}
+        if not os.path.exists(self.path):
+            return self
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = SumoJSON.loads(line)
+                self.responses[entry['key']] = entry
+        return self
+
+    def __len__(self):
+        return len(self.responses)
+
+    def get(self, request: httpx.Request) -> dict:
+        return self.responses.get(SumoAPIArchive.key(request.url))
+
+    def add(self, request: httpx.Request, response: httpx.Response, elapsed: float):
+        """ record a request/response pair (appended to the archive file immediately) """
+        entry = {
+            'key': SumoAPIArchive.key(request.url),
+            'status': response.status_code,
+            'headers': { h: response.headers[h] for h in SumoAPIArchive._HEADERS if h in response.headers },
+            'elapsed': round(elapsed, 4),
+            'body': response.text,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        # requests may be recorded from several threads at once
+        with self._lock:
+            self.responses[entry['key']] = entry
+            if not self._out:
+                # gzip members can be appended to an existing archive
+                self._out = gzip.open(self.path, 'at', encoding='utf-8')
+            self._out.write(line)
+        return
+
+    def close(self):
+        with self._lock:
+            if self._out:
+                self._out.close()
+                self._out = None
+        return
+
+
+class SumoRecordTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport which talks to the real server and records every
+    request/response pair into a SumoAPIArchive. Works for both SumoAPI and
+    AsyncSumoAPI, e.g.:
+
+        api = SumoAPI(transport=SumoRecordTransport('run.jsonl.gz'))
+    """
+    def __init__(self, path, **transport_kwargs):
+        self.archive = SumoAPIArchive(path)
+        # keyword arguments for the real httpx transports (limits, http2, ...)
+        self._transport_kwargs = transport_kwargs
+        self._transport = None
+        self._async_transport = None
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            if not self._transport:
+                self._transport = httpx.HTTPTransport(**self._transport_kwargs)
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        response.read()
+        self.archive.add(request, response, time.perf_counter() - start)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._async_transport:
+            self._async_transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        start = time.perf_counter()
+        response = await self._async_transport.handle_async_request(request)
+        await response.aread()
+        self.archive.add(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        self.archive.close()
+
+    async def aclose(self):
+        if self._async_transport:
+            await self._async_transport.aclose()
+            self._async_transport = None
+        self.archive.close()
+
+
+class SumoReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport which answers every request from a SumoAPIArchive,
+    without any network access. Requests that were not recorded get a 404.
+
+    The simulated latency of each request is:
+        latency + random(0, jitter) + recorded_latency * (recorded time of the request)
+    so 'recorded_latency=1.0' replays the original timing, and the defaults
+    replay as fast as possible.
+    """
+    _VERBOSE = 0
+
+    def __init__(self, path, latency = 0.0, jitter = 0.0, recorded_latency = 0.0, seed = None):
+        self.archive = SumoAPIArchive(path).load()
+        self.latency = latency
+        self.jitter = jitter
+        self.recorded_latency = recorded_latency
+        self._random = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f'SumoReplayTransport[{self.archive.path}: {len(self.archive)} responses, hits={self.hits}, misses={self.misses}]'
+
+    def _delay(self, entry: dict) -> float:
+        delay = self.latency
+        if self.jitter > 0.0:
+            delay += self._random.uniform(0.0, self.jitter)
+        if entry and self.recorded_latency > 0.0:
+            delay += self.recorded_latency * entry.get('elapsed', 0.0)
+        return delay
+
+    def _response(self, request: httpx.Request, entry: dict) -> httpx.Response:
+        if not entry:
+            self.misses += 1
+            if SumoReplayTransport._VERBOSE > 0:
+                sys.stderr.write(f'Replay: no recorded response for {request.url}\n')
+            return httpx.Response(404, request=request)
+        self.hits += 1
+        return httpx.Response(entry['status'], headers=entry['headers'], \
+                              content=entry['body'].encode('utf-8'), request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.archive.get(request)
+        delay = self._delay(entry)
+        if delay > 0.0:
+            time.sleep(delay)
+        return self._response(request, entry)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.archive.get(request)
+        delay = self._delay(entry)
+        if delay > 0.0:
+            await asyncio.sleep(delay)
+        return self._response(request, entry)
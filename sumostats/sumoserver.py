@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from .sumoreplay import SumoAPIArchive
+
+class SumoAPIFixture:
+    """
+    The dataset served by SumoAPIServer: the responses in a SumoAPIArchive
+    (recorded with SumoAPI.record() or build_db.py --record).
+
+    Requests are matched on their path and query parameters. Paged list
+    endpoints (/rikishis and /rikishi/:id/matches) also answer any other
+    'limit'/'skip' combination by merging every recorded page of the same
+    query and slicing it. The history endpoints (/ranks, /measurements,
+    /shikonas) answer any rikishiId/bashoId query from every history entry
+    in the archive, including the histories in recorded rikishi profiles.
+    """
+    _PAGE_PARAMS = ('limit', 'skip')
+    _HISTORY_RE = re.compile(r'/(ranks|measurements|shikonas)$')
+    # history endpoint -> the Rikishi field with the same entries
+    _HISTORY_FIELDS = { 'ranks': 'rankHistory', 'measurements': 'measurementHistory', 'shikonas': 'shikonaHistory' }
+
+    def __init__(self, path):
+        self.path = path
+        self.responses: dict[str, dict] = {}
+        # full record lists of paged queries: key (without limit/skip) -> (list name, records, first page json)
+        self.lists: dict[str, tuple[str, list, dict]] = {}
+        # every recorded history entry: endpoint name -> { (rikishiId, bashoId): entry }
+        self.histories: dict[str, dict[tuple, dict]] = { name: {} for name in SumoAPIFixture._HISTORY_FIELDS }
+        self._load(SumoAPIArchive(path).load())
+
+    def __len__(self):
+        return len(self.responses)
+
+    # Static method
+    def key(path: str, params: list) -> str:
+        # strip the host and any prefix before '/api'
+        i = path.find('/api/')
+        if i >= 0:
+            path = path[i+4:]
+        params = sorted(params)
+        if not params:
+            return path
+        return path + '?' + urlencode(params)
+
+    def _load(self, archive: SumoAPIArchive):
+        pages: dict[str, list] = {}
+        for entry in archive.responses.values():
+            url = urlsplit(entry['key'])
+            params = parse_qsl(url.query, keep_blank_values=True)
+            self.responses[SumoAPIFixture.key(url.path, params)] = entry
+            if entry['status'] != 200:
+                continue
+            try:
+                j = json.loads(entry['body'])
+            except ValueError:
+                continue
+            self._add_histories(url.path, j)
+            if not isinstance(j, dict) or not 'total' in j:
+                continue
+            listname = 'records' if 'records' in j else 'matches' if 'matches' in j else None
+            if not listname or not isinstance(j[listname], list):
+                continue
+            skip = int(dict(params).get('skip', 0) or 0)
+            listkey = SumoAPIFixture.key(url.path, [p for p in params if not p[0] in SumoAPIFixture._PAGE_PARAMS])
+            pages.setdefault(listkey, []).append((skip, listname, j))
+
+        # merge the recorded pages of each query into a single list
+        for listkey, recorded in pages.items():
+            records = {}
+            listname = recorded[0][1]
+            for skip, _, j in recorded:
+                for i, r in enumerate(j[listname]):
+                    records[skip + i] = r
+            # only use lists that are complete
+            if len(records) == recorded[0][2]['total'] and sorted(records) == list(range(len(records))):
+                self.lists[listkey] = (listname, [records[i] for i in range(len(records))], recorded[0][2])
+        return
+
+    def _add_histories(self, path: str, j):
+        """ keep the history entries of a /ranks, /measurements, /shikonas or rikishi profile response """
+        m = SumoAPIFixture._HISTORY_RE.search(path)
+        if m:
+            entries = { m.group(1): j if isinstance(j, list) else [] }
+        else:
+            profiles = j.get('records') if isinstance(j, dict) and '/rikishis' in path else [j]
+            entries = {}
+            for r in profiles or []:
+                if not isinstance(r, dict):
+                    continue
+                for name, field in SumoAPIFixture._HISTORY_FIELDS.items():
+                    if isinstance(r.get(field), list):
+                        entries.setdefault(name, []).extend(r[field])
+        for name, history in entries.items():
+            for h in history:
+                if isinstance(h, dict) and 'rikishiId' in h and 'bashoId' in h:
+                    self.histories[name][(int(h['rikishiId']), str(h['bashoId']))] = h
+        return
+
+    def _history(self, name: str, params: list) -> tuple[int, dict, str]:
+        """ a /ranks, /measurements or /shikonas response made from the recorded history entries """
+        p = dict(params)
+        rikishiId = int(p['rikishiId']) if p.get('rikishiId') else None
+        bashoId = p.get('bashoId') or None
+        if rikishiId is None and bashoId is None:
+            return 400, {}, '{"error":"rikishiId or bashoId is required"}'
+        entries = [h for (rId, bId), h in self.histories[name].items() \
+                   if (rikishiId is None or rId == rikishiId) and (bashoId is None or bId == bashoId)]
+        entries.sort(key=lambda h: (str(h['bashoId']), int(h['rikishiId'])), reverse=p.get('sortOrder') == 'desc')
+        return 200, { 'content-type': 'application/json' }, json.dumps(entries)
+
+    def get(self, path: str, params: list) -> tuple[int, dict, str]:
+        """ find the response for a request: returns (status, headers, body) """
+        entry = self.responses.get(SumoAPIFixture.key(path, params))
+        if entry:
+            return entry['status'], entry['headers'], entry['body']
+
+        # try a different page of a recorded list
+        listkey = SumoAPIFixture.key(path, [p for p in params if not p[0] in SumoAPIFixture._PAGE_PARAMS])
+        if listkey in self.lists:
+            listname, records, template = self.lists[listkey]
+            p = dict(params)
+            skip = int(p.get('skip', 0) or 0)
+            limit = int(p.get('limit', 0) or 0)
+            page = records[skip:skip+limit] if limit > 0 else records[skip:]
+            j = dict(template)
+            j[listname] = page
+            if 'limit' in j:
+                j['limit'] = limit
+            if 'skip' in j:
+                j['skip'] = skip
+            return 200, { 'content-type': 'application/json' }, json.dumps(j)
+
+        m = SumoAPIFixture._HISTORY_RE.search(path)
+        if m:
+            return self._history(m.group(1), params)
+        return 404, {}, ''
+
+
+class SumoAPIServer(ThreadingHTTPServer):
+    """
+    A local stand-in for sumo-api.com, for load-testing the ingestion code
+    without hammering the real service. Point SumoAPI at it with:
+
+        SumoAPI(apiurl=f'http://localhost:{port}/api')
+
+    Fault injection:
+      latency, jitter: delay every response by latency + random(0, jitter) seconds
+      slow_rate, slow_latency: delay this fraction of responses by another
+                               slow_latency seconds (a long latency tail)
+      error_rate: fraction of requests answered with a 500/503 error
+      throttle_rate: fraction of requests answered with a 429 (Too Many Requests)
+      rate_limit: answer 429 when more than this many requests/second arrive
+      retry_after: value of the 'Retry-After' header sent with each 429
+    """
+    # the API endpoints SumoAPI uses
+    _ROUTES = [
+        re.compile(r'^/api/rikishis$'),
+        re.compile(r'^/api/rikishi/\d+$'),
+        re.compile(r'^/api/rikishi/\d+/stats$'),
+        re.compile(r'^/api/rikishi/\d+/matches(/\d+)?$'),
+        re.compile(r'^/api/basho/\d{6}$'),
+        re.compile(r'^/api/basho/\d{6}/banzuke/[\w-]+$'),
+        re.compile(r'^/api/basho/\d{6}/torikumi/[\w-]+/\d+$'),
+        re.compile(r'^/api/(ranks|measurements|shikonas)$'),
+    ]
+
+    def __init__(self, fixture: SumoAPIFixture, host = 'localhost', port = 8088, \
+                 latency = 0.0, jitter = 0.0, error_rate = 0.0, throttle_rate = 0.0, \
+                 rate_limit = 0.0, retry_after = 1, slow_rate = 0.0, slow_latency = 1.0, \
+                 seed = None, verbose = 0):
+        super().__init__((host, port), SumoAPIRequestHandler)
+        self.fixture = fixture
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.verbose = verbose
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.counters = { 'requests': 0, 'ok': 0, 'not_modified': 0, 'not_found': 0, 'errors': 0, 'throttled': 0 }
+
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/api'
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def fault(self) -> int:
+        """ decide if a request gets an injected error: returns the status code (or 0) """
+        with self._lock:
+            self.counters['requests'] += 1
+            if self.rate_limit > 0.0:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > self.rate_limit:
+                    return 429
+            r = self._random.random()
+            if r < self.throttle_rate:
+                return 429
+            if r < self.throttle_rate + self.error_rate:
+                return self._random.choice([500, 503])
+        return 0
+
+    def delay(self) -> float:
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0.0, self.jitter) if self.jitter > 0.0 else 0.0)
+            if self.slow_rate > 0.0 and self._random.random() < self.slow_rate:
+                delay += self.slow_latency
+            return delay
+
+
+class SumoAPIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are sent separately: don't let Nagle's algorithm
+    # (and the client's delayed ACK) add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose > 0:
+            sys.stderr.write(f'{self.address_string()} - {format % args}\n')
+
+    def _send(self, status, headers = {}, body = ''):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        if not 'content-type' in headers and data:
+            self.send_header('content-type', 'application/json; charset=utf-8')
+        self.send_header('content-length', str(len(data)))
+        self.end_headers()
+        if data and self.command != 'HEAD':
+            self.wfile.write(data)
+        return
+
+    def do_GET(self):
+        server: SumoAPIServer = self.server
+        url = urlsplit(self.path)
+        params = parse_qsl(url.query, keep_blank_values=True)
+
+        delay = server.delay()
+        if delay > 0.0:
+            time.sleep(delay)
+
+        if not any(route.match(url.path) for route in SumoAPIServer._ROUTES):
+            server.count('not_found')
+            return self._send(404, body='{"error":"unknown endpoint"}')
+
+        fault = server.fault()
+        if fault == 429:
+            server.count('throttled')
+            return self._send(429, { 'retry-after': str(server.retry_after) }, '{"error":"too many requests"}')
+        if fault:
+            server.count('errors')
+            return self._send(fault, body='{"error":"injected error"}')
+
+        status, headers, body = server.fixture.get(url.path, params)
+        if status == 404:
+            server.count('not_found')
+        etag = headers.get('etag')
+        if status == 200 and etag and self.headers.get('if-none-match') == etag:
+            server.count('not_modified')
+            return self._send(304, { 'etag': etag })
+        if status == 200:
+            server.count('ok')
+        return self._send(status, headers, body)
+
+    do_HEAD = do_GET
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+from array import array
+from bisect import bisect_left, bisect_right
+from .sumocalendar import SumoBashoCalendar
+
+class SumoTimeline:
+    """
+    A wrestler's history (rankHistory, shikonaHistory, ...) sorted by basho
+    once, answering "the value as of basho B" with a binary search:
+
+        ranks = SumoTimeline(rikishi.rankHistory, lambda r: r.rank)
+        ranks.before('202501', rikishi.currentRank)
+
+    'value' picks what to keep of each entry (the entry itself by default).
+    The timeline remembers the list it was built from: is_current() is
+    False once that list is replaced, or has grown or shrunk (an entry
+    replaced in place has to be reported by the owner, see
+    SumoWrestler.invalidate_timelines()).
+    """
+    __slots__ = ('source', 'size', 'ordinals', 'values')
+
+    def __init__(self, history: list, value = None):
+        entries = sorted(history, key=lambda h: SumoTimeline._ordinal(h.bashoId))
+        self.source = history
+        self.size = len(history)
+        self.ordinals = array('i', (SumoTimeline._ordinal(h.bashoId) for h in entries))
+        self.values = [value(h) for h in entries] if value else entries
+
+    def __len__(self):
+        return len(self.values)
+
+    def is_current(self, history: list) -> bool:
+        return history is self.source and len(history) == self.size
+
+    def before(self, bashoId, default = None):
+        """ the value of the latest entry before basho 'bashoId' (a basho id string, int or date) """
+        i = bisect_left(self.ordinals, SumoTimeline._ordinal(bashoId))
+        return self.values[i - 1] if i > 0 else default
+
+    def as_of(self, bashoId, default = None):
+        """ the value of the latest entry up to (and including) basho 'bashoId' """
+        i = bisect_right(self.ordinals, SumoTimeline._ordinal(bashoId))
+        return self.values[i - 1] if i > 0 else default
+
+    def latest(self, default = None):
+        return self.values[-1] if self.values else default
+
+    # Static method
+    def _ordinal(bashoId) -> int:
+        # measurements have int (YYYYMM) basho ids
+        if isinstance(bashoId, int):
+            bashoId = str(bashoId)
+        return SumoBashoCalendar.basho_ordinal(bashoId)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+#
+# Compare dataclasses_json from_dict() with the generated decoders (see
+# sumostats/sumodecode.py) on recorded torikumi and match history pages.
+# Record a full basho first, e.g.:
+#
+#   ./build_db.py --start 202501 --end 202502 --db /tmp/bench.pickle --record basho.jsonl.gz
+#   ./test/benchmark-decode.py basho.jsonl.gz
+#
+
+import os
+import sys
+
+cdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(cdir+'/../')
+
+import argparse
+import dataclasses
+import time
+from sumostats.sumoapi import *
+from sumostats.sumoreplay import SumoAPIArchive
+
+def LoadPages(path):
+    """ decoded json of every recorded torikumi and /rikishi/:id/matches response """
+    archive = SumoAPIArchive(path).load()
+    torikumi, matches = [], []
+    for key, entry in archive.responses.items():
+        if entry['status'] != 200 or len(entry['body']) < 2:
+            continue
+        url = key.split('?')[0]
+        if '/torikumi/' in url:
+            torikumi.append(SumoJSON.loads(entry['body']))
+        elif url.endswith('/matches'):
+            matches.append(SumoJSON.loads(entry['body']).get('records') or [])
+    return torikumi, matches
+
+def Decode(torikumi, matches, decode_torikumi, decode_match):
+    """ decode every page, returns (objects, seconds) """
+    start = time.perf_counter()
+    objs = [decode_torikumi(t) for t in torikumi]
+    for records in matches:
+        objs += [decode_match(m) for m in records]
+    return objs, time.perf_counter() - start
+
+def Same(a, b) -> bool:
+    """ field by field (and type by type) comparison of decoded objects """
+    if dataclasses.is_dataclass(a):
+        return type(a) is type(b) and \
+               all(Same(getattr(a, f.name), getattr(b, f.name)) for f in dataclasses.fields(a))
+    if isinstance(a, list):
+        return len(a) == len(b) and all(Same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return list(a.keys()) == list(b.keys()) and all(Same(a[k], b[k]) for k in a)
+    return type(a) is type(b) and a == b
+
+parser = argparse.ArgumentParser()
+parser.add_argument('archive', type=str, help='API archive made with --record')
+parser.add_argument('--repeat', type=int, default=3, help='Decode every page this many times (best time wins)')
+args = parser.parse_args()
+
+torikumi, matches = LoadPages(args.archive)
+nmatches = sum(len(t.get('torikumi') or []) for t in torikumi) + sum(len(m) for m in matches)
+if nmatches == 0:
+    sys.stderr.write(f'No recorded torikumi or match pages in {args.archive}\n')
+    sys.exit(-1)
+print(f'{len(torikumi)} torikumi pages, {len(matches)} match history pages, {nmatches} matches')
+
+decoders = [
+    ('from_dict', BashoTorikumi.from_dict, BashoMatch.from_dict),
+    ('strict', SumoDecoder.decoder(BashoTorikumi, strict=True), SumoDecoder.decoder(BashoMatch, strict=True)),
+    ('lenient', SumoDecoder.decoder(BashoTorikumi, strict=False), SumoDecoder.decoder(BashoMatch, strict=False)),
+]
+
+print(f'{"decoder":<10} {"seconds":>8} {"us/match":>9} {"speedup":>8} {"identical":>9}')
+reference, baseline = None, None
+for name, decode_torikumi, decode_match in decoders:
+    best = None
+    for _ in range(args.repeat):
+        objs, elapsed = Decode(torikumi, matches, decode_torikumi, decode_match)
+        best = elapsed if best is None else min(best, elapsed)
+    if reference is None:
+        reference, baseline = objs, best
+    print(f'{name:<10} {best:>8.3f} {best/nmatches*1e6:>9.1f} {baseline/best:>7.1f}x {str(Same(reference, objs)):>9}')
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+#
+# Compare the json backends (see sumostats/sumojson.py) on recorded match
+# history pages. Record some API traffic first, e.g.:
+#
+#   ./build_db.py --start 202301 --end 202401 --db /tmp/bench.pickle --record matches.jsonl.gz
+#   ./test/benchmark-json.py matches.jsonl.gz
+#
+
+import os
+import sys
+
+cdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(cdir+'/../')
+
+import argparse
+import time
+from sumostats.sumoapi import *
+from sumostats.sumoreplay import SumoAPIArchive
+
+def LoadMatchPages(path):
+    """ the (successful) bodies of every recorded /rikishi/:id/matches response """
+    archive = SumoAPIArchive(path).load()
+    pages = []
+    for key, entry in archive.responses.items():
+        if '/matches' in key and entry['status'] == 200 and len(entry['body']) > 2:
+            pages.append(entry['body'].encode('utf-8'))
+    return pages
+
+def Benchmark(pages, backend, repeat):
+    SumoJSON.set_backend(backend)
+    # decode only
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for body in pages:
+            SumoJSON.loads(body)
+    decode = (time.perf_counter() - start) / repeat
+
+    # decode + build BashoMatch objects (what SumoAPI.rikishi_matches() does)
+    start = time.perf_counter()
+    nmatches = 0
+    for body in pages:
+        j = SumoJSON.loads(body)
+        records = j.get('records', j.get('matches', [])) or []
+        nmatches += len(list(map(BashoMatch.from_dict, records)))
+    total = time.perf_counter() - start
+    return decode, total, nmatches
+
+parser = argparse.ArgumentParser()
+parser.add_argument('archive', type=str, help='API archive made with --record')
+parser.add_argument('--repeat', type=int, default=5, help='Decode every page this many times')
+args = parser.parse_args()
+
+pages = LoadMatchPages(args.archive)
+if not pages:
+    sys.stderr.write(f'No recorded match pages in {args.archive}\n')
+    sys.exit(-1)
+mbytes = sum(len(p) for p in pages) / (1024*1024)
+print(f'{len(pages)} match pages, {mbytes:.1f}MB (backends installed: {SumoJSON.available()})')
+
+print(f'{"backend":<8} {"decode(s)":>10} {"MB/s":>8} {"+from_dict(s)":>14} {"matches":>8}')
+for backend in SumoJSON.available():
+    decode, total, nmatches = Benchmark(pages, backend, args.repeat)
+    print(f'{backend:<8} {decode:>10.4f} {mbytes/decode if decode > 0 else 0.0:>8.1f} {total:>14.4f} {nmatches:>8}')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# Compare the memory (and pickle size) of a match table made of BashoMatch
+# objects, one made of CompactBashoMatch objects, and a (columnar)
+# SumoMatchStore. The matches are made up, but decoded from json like API
+# responses, e.g.:
+#
+#   ./test/benchmark-match-memory.py --matches 500000
+#
+
+import os
+import sys
+
+cdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(cdir+'/../')
+
+import argparse
+import gc
+import json
+import pickle
+import random
+import time
+import tracemalloc
+from sumostats.sumoapi import *
+from sumostats.sumomatchstore import SumoMatchStore
+
+KIMARITE = ['oshidashi', 'yorikiri', 'hatakikomi', 'hikiotoshi', 'uwatenage', 'tsukiotoshi', 'okuridashi', 'fusen']
+RANKS = ['Yokozuna', 'Ozeki', 'Sekiwake', 'Komusubi', 'Maegashira', 'Juryo', 'Makushita', 'Sandanme', 'Jonidan', 'Jonokuchi']
+
+def MatchPages(nmatches, nrikishi, seed):
+    """ json pages (bytes) of made up /rikishi/:id/matches records """
+    rnd = random.Random(seed)
+    pages, records = [], []
+    for i in range(nmatches):
+        year, month = 1960 + (i // 20000) % 65, 1 + 2 * ((i // 3000) % 6)
+        east, west = rnd.sample(range(1, nrikishi + 1), 2)
+        winner = rnd.choice((east, west))
+        records.append({
+            'bashoId': f'{year:04}{month:02}', 'division': rnd.choice(list(SumoDivision)[:6]).value,
+            'day': 1 + i % 15, 'matchNo': 1 + i % 60,
+            'eastId': east, 'eastShikona': f'Shikona{east}', 'eastRank': f'{rnd.choice(RANKS)} {1 + east % 15} East',
+            'westId': west, 'westShikona': f'Shikona{west}', 'westRank': f'{rnd.choice(RANKS)} {1 + west % 15} West',
+            'kimarite': rnd.choice(KIMARITE), 'winnerId': winner, 'winnerEn': f'Shikona{winner}', 'winnerJp': f'力士{winner}',
+        })
+        if len(records) == 1000:
+            pages.append(json.dumps({'records': records}).encode('utf-8'))
+            records = []
+    if records:
+        pages.append(json.dumps({'records': records}).encode('utf-8'))
+    return pages
+
+def BuildTable(pages, kind):
+    """ decode the pages into a { matchId: match } table, or a SumoMatchStore """
+    decode = SumoDecoder.decoder(BashoMatch)
+    table = SumoMatchStore() if kind is SumoMatchStore else {}
+    for body in pages:
+        for r in SumoJSON.loads(body)['records']:
+            m = decode(r)
+            if kind is SumoMatchStore:
+                table.add(m)
+                continue
+            if kind is CompactBashoMatch:
+                m = CompactBashoMatch.from_match(m)
+            table[m.matchId] = m
+    return table
+
+def Query(table, rikishiId, before):
+    """ seconds to find a wrestler's Makuuchi matches before a basho """
+    start = time.perf_counter()
+    if isinstance(table, SumoMatchStore):
+        found = table.select(rikishiId=rikishiId, division=SumoDivision.Makuuchi, before=before)
+    else:
+        bashoDate = BashoDate(before)
+        found = [mId for mId, m in table.items() if (m.eastId == rikishiId or m.westId == rikishiId) and \
+                 m.division == SumoDivision.Makuuchi and m.bashoId < bashoDate]
+    return time.perf_counter() - start, len(found)
+
+def Measure(pages, kind):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = BuildTable(pages, kind)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    data = pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL)
+    dump = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(data)
+    load = time.perf_counter() - start
+    query, found = Query(table, 1, '200001')
+    return len(table), size, elapsed, len(data), dump, load, query, found
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--matches', type=int, default=200000, help='Number of matches in the table')
+parser.add_argument('--rikishi', type=int, default=3000, help='Number of distinct wrestlers')
+parser.add_argument('--seed', type=int, default=1, help='Random seed')
+args = parser.parse_args()
+
+pages = MatchPages(args.matches, args.rikishi, args.seed)
+print(f'{args.matches} matches between {args.rikishi} rikishi')
+print(f'{"class":<18} {"MB":>8} {"bytes/match":>12} {"build(s)":>9} {"pickle MB":>10} {"dump(s)":>8} {"load(s)":>8} {"query(ms)":>10}')
+for kind in (BashoMatch, CompactBashoMatch, SumoMatchStore):
+    n, size, elapsed, psize, dump, load, query, found = Measure(pages, kind)
+    print(f'{kind.__name__:<18} {size/(1024*1024):>8.1f} {size/n:>12.0f} {elapsed:>9.2f} ' + \
+          f'{psize/(1024*1024):>10.1f} {dump:>8.2f} {load:>8.2f} {query*1000:>10.1f}')
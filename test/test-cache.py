@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+#
+# Check the size accounting of the API response cache: store and replace
+# entries under a tight max_bytes, and compare the running total with the
+# table, in a fresh and in a re-opened cache.
+#
+
+import os
+import sys
+
+cdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(cdir+'/../')
+
+import tempfile
+from sumostats.sumocache import SumoResponseCache
+
+def TableSize(cache: SumoResponseCache) -> int:
+    row = cache.db().execute('SELECT SUM(size) FROM response').fetchone()
+    return row[0] if row[0] else 0
+
+def Check(cache: SumoResponseCache, expected: int, evictions: int):
+    assert cache.size() == TableSize(cache) == expected, (cache.size(), TableSize(cache), expected)
+    assert cache.evictions == evictions, (cache.evictions, evictions)
+
+def TestCacheSize():
+    path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+
+    cache = SumoResponseCache(path, max_bytes=250)
+    cache.store('/rikishi/1', {}, 'x'*100)
+    Check(cache, 100, 0)
+    # 200 bytes fit under the limit: nothing is evicted
+    cache.store('/rikishi/2', {}, 'x'*100)
+    Check(cache, 200, 0)
+    # replacing an entry only counts the difference
+    cache.store('/rikishi/2', {}, 'x'*120)
+    Check(cache, 220, 0)
+    # over the limit: the least recently used entry goes
+    cache.store('/rikishi/3', {}, 'x'*100)
+    Check(cache, 220, 1)
+    cache.close()
+
+    # replace an entry first thing after re-opening
+    cache = SumoResponseCache(path, max_bytes=250)
+    cache.store('/rikishi/3', {}, 'x'*50)
+    Check(cache, 170, 0)
+    # sizes are in bytes, not characters
+    cache.store('/rikishi/4', {}, '力'*20)
+    Check(cache, 230, 0)
+    cache.close()
+    print('cache size accounting ok')
+
+TestCacheSize()